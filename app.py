@@ -1,60 +1,175 @@
 import os
-from flask import Flask, jsonify, redirect, session
-
-from database import get_db, init_db
-from routes.candidate_routes import bp_candidate
-from routes.hr_routes import bp_hr
-from routes.interview_routes import bp_interview
-
-# Read from Azure Environment Variables (safe defaults for local)
-BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:5000")
-
-app = Flask(__name__)
-app.secret_key = os.getenv("SECRET_KEY", "supersecretkey")
-app.config["BASE_URL"] = BASE_URL
-
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-
-init_db()
-
-app.register_blueprint(bp_hr)
-app.register_blueprint(bp_candidate)
-app.register_blueprint(bp_interview)
-
 
-@app.route("/")
-def home():
-    if not session.get("user_id"):
-        return redirect("/login")
-    if session.get("role") == "hr":
-        return redirect("/hr/dashboard")
-    return redirect("/candidate/home")
-
-
-@app.route("/debug/db")
-def debug_db():
-    db = get_db()
-    tables = [r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
-    db.close()
-    return jsonify({"tables": tables})
-
-
-@app.route("/debug/candidates_columns")
-def debug_columns():
-    db = get_db()
-    cur = db.execute("PRAGMA table_info(candidates)")
-    cols = cur.fetchall()
-    db.close()
-    return jsonify(cols)
-
-
-@app.route("/debug/routes")
-def debug_routes():
-    return "<br>".join(sorted([str(r) for r in app.url_map.iter_rules()]))
+from flask import Flask, jsonify, redirect, session
+from jinja2 import FileSystemBytecodeCache
+
+import database
+from config import load_config
+
+
+def _cache_metrics():
+    from interview_cache import session_cache
+    from jd_config_cache import jd_config_cache
+    from shared_cache import shared_cache
+
+    caches = {"interview_session": session_cache.stats(), "jd_config": jd_config_cache.stats()}
+    for ns, counters in shared_cache.counters().items():
+        caches[f"shared:{ns}"] = counters
+    for cache, stats in caches.items():
+        for metric in ("hits", "misses", "evictions"):
+            if metric in stats:
+                yield f"cache_{metric}_total", f"Cache {metric}.", ["cache"], [cache], stats[metric]
+
+
+def apply_config(config=None):
+    """
+    Hands the secrets and file locations from load_config() to the modules
+    that use them. create_app() calls it; standalone workers call it first.
+    """
+    if config is None:
+        config = load_config()
+    import interview_tokens
+    import mailer
+    import metrics
+    import profiling
+    import shared_cache
+    import slow_query
+    import tracing
+
+    if config["DB_PATH"]:
+        database.DB_PATH = config["DB_PATH"]
+    interview_tokens.set_signing_keys(config["INTERVIEW_TOKEN_KEYS"], config["SECRET_KEY"])
+    mailer.configure_smtp(config["SMTP"])
+    shared_cache.configure_backend(config["SHARED_CACHE_URL"], config["SHARED_CACHE_PATH"])
+    metrics.METRICS_DIR = config["METRICS_DIR"]
+    profiling.PROFILE_DIR = config["PROFILE_DIR"]
+    profiling.PROFILE_SECRET = config["PROFILE_SECRET"]
+    tracing.TRACE_LOG_PATH = config["TRACE_LOG_PATH"]
+    slow_query.SLOW_QUERY_LOG_PATH = config["SLOW_QUERY_LOG_PATH"]
+
+
+def create_app(overrides=None):
+    """
+    Builds the app without touching the database schema; run `flask --app app
+    init-db` once per deploy (or set INIT_DB_ON_START=1) to create and migrate it.
+    """
+    from event_bus import bus
+    from interview_cache import session_cache
+    from jd_config_cache import jd_config_cache
+    from metrics import init_metrics, registry
+    from outbox import outbox_stats, wake_outbox
+    from profiling import init_profiling
+    from routes.candidate_routes import bp_candidate
+    from routes.hr_routes import bp_hr
+    from routes.interview_routes import bp_interview, interview_limiter, monitoring_coalescer
+    from routes.shared import login_required
+    from shared_cache import shared_cache
+    from tracing import init_tracing
+
+    app = Flask(__name__)
+    app.config.update(load_config(overrides))
+    apply_config(app.config)
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    if app.config["JINJA_CACHE_DIR"]:
+        os.makedirs(app.config["JINJA_CACHE_DIR"], exist_ok=True)
+        app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(app.config["JINJA_CACHE_DIR"])}
+
+    if app.config["INIT_DB_ON_START"]:
+        database.init_db()
+    init_metrics(app)
+    init_profiling(app)
+    init_tracing(app, app.config["TRACED_ENDPOINTS"])
+
+    registry.register_collector(_cache_metrics)
+    if app.config["OUTBOX_SENDER"]:
+        # Deferred reminders and retries are due without any new request, so
+        # the sender runs from startup rather than on the first enqueue.
+        wake_outbox()
+
+    app.register_blueprint(bp_hr)
+    app.register_blueprint(bp_candidate)
+    app.register_blueprint(bp_interview)
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create the schema, run migrations and seed the HR user."""
+        database.init_db()
+
+    @app.route("/")
+    def home():
+        if not session.get("user_id"):
+            return redirect("/login")
+        if session.get("role") == "hr":
+            return redirect("/hr/dashboard")
+        return redirect("/candidate/home")
+
+    # Internal stats (per-candidate throttling, mail queue); HR only, like /hr/db.
+    @app.route("/debug/interview_cache")
+    @login_required(role="hr")
+    def debug_interview_cache():
+        return jsonify(session_cache.stats())
+
+    @app.route("/debug/jd_cache")
+    @login_required(role="hr")
+    def debug_jd_cache():
+        return jsonify(jd_config_cache.stats())
+
+    @app.route("/debug/shared_cache")
+    @login_required(role="hr")
+    def debug_shared_cache():
+        return jsonify(shared_cache.stats())
+
+    @app.route("/debug/outbox")
+    @login_required(role="hr")
+    def debug_outbox():
+        db = database.get_db()
+        stats = outbox_stats(db)
+        db.close()
+        return jsonify(stats)
+
+    @app.route("/debug/events")
+    @login_required(role="hr")
+    def debug_events():
+        return jsonify(bus.stats())
+
+    @app.route("/debug/rate_limits")
+    @login_required(role="hr")
+    def debug_rate_limits():
+        stats = interview_limiter.stats()
+        stats["monitoring_coalesced"] = monitoring_coalescer.coalesced
+        stats["monitoring_flushed"] = monitoring_coalescer.flushed
+        return jsonify(stats)
+
+    @app.route("/debug/routes")
+    @login_required(role="hr")
+    def debug_routes():
+        return "<br>".join(sorted([str(r) for r in app.url_map.iter_rules()]))
+
+    return app
+
+
+def warm_templates(app):
+    """Compiles every template now (e.g. in a preloading master, so forked workers share them)."""
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+
+_app = None
+
+
+def __getattr__(name):
+    # `gunicorn app:app` and `flask --app app` still find a module-level app,
+    # but importing this module (tests, create_app() callers) builds nothing.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    # local only
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # local only; build first so DB_PATH from the config is the file initialised.
+    local_app = create_app()
+    database.init_db()
+    local_app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+
+from cold_storage import decompress
+from database import get_db
+
+EXPORT_CHUNK_SIZE = 1000
+
+DOMAIN_SCORE_KEYS = ["programming", "domain_skills", "projects", "knowledge_confidence", "jd_domain_match", "experience"]
+MATCHED_KEYS = ["programming", "domain_skills", "jd_domain_match"]
+SUMMARY_KEYS = [
+    "total_questions",
+    "answered_count",
+    "avg_answer_length",
+    "total_time_seconds",
+    "tab_switch_count",
+    "camera_granted",
+    "mic_granted",
+    "communication_score",
+]
+
+EXPORT_COLUMNS = (
+    ["id", "name", "email", "status", "jd_config_id", "created_at", "interview_date"]
+    + ["candidate_type", "final_score", "decision", "strength", "weakness"]
+    + [f"score_{k}" for k in DOMAIN_SCORE_KEYS]
+    + [f"matched_{k}" for k in MATCHED_KEYS]
+    + [f"interview_{k}" for k in SUMMARY_KEYS]
+    + ["evaluation_overall_score"]
+)
+
+
+def _loads(raw):
+    if not raw:
+        return {}
+    try:
+        value = json.loads(raw)
+        return value if isinstance(value, dict) else {}
+    except:
+        return {}
+
+
+def iter_candidate_chunks(db, chunk_size=EXPORT_CHUNK_SIZE, jd_config_id=None, status=None):
+    """
+    Keyset walk over candidates.id: each chunk is a short indexed query, so
+    memory stays at one chunk and no read transaction is held open across
+    the whole export.
+    """
+    clauses = ["c.id > ?"]
+    filters = []
+    if jd_config_id is not None:
+        clauses.append("c.jd_config_id=?")
+        filters.append(int(jd_config_id))
+    if status:
+        clauses.append("c.status=?")
+        filters.append(status)
+    sql = f"""
+        SELECT c.id, c.name, c.email, c.status, c.jd_config_id, c.created_at, c.interview_date,
+               c.phase1_result_json, c.interview_summary_json, c.evaluation_json,
+               a.codec, a.payload
+        FROM candidates c
+        LEFT JOIN candidate_archive a ON a.candidate_id = c.id AND c.archived_at IS NOT NULL
+        WHERE {' AND '.join(clauses)}
+        ORDER BY c.id
+        LIMIT ?
+    """
+
+    last_id = 0
+    while True:
+        rows = db.execute(sql, [last_id] + filters + [chunk_size]).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def flatten_candidate(row):
+    if row[11] is not None:
+        archived = json.loads(decompress(row[11], row[10]).decode("utf-8"))
+        phase1 = _loads(archived.get("phase1_result_json"))
+        summary = _loads(archived.get("interview_summary_json"))
+        evaluation = _loads(archived.get("evaluation_json"))
+    else:
+        phase1 = _loads(row[7])
+        summary = _loads(row[8])
+        evaluation = _loads(row[9])
+    domain_scores = phase1.get("domain_scores") or {}
+    matched = phase1.get("matched_details") or {}
+
+    out = {
+        "id": row[0],
+        "name": row[1],
+        "email": row[2],
+        "status": row[3],
+        "jd_config_id": row[4],
+        "created_at": row[5],
+        "interview_date": row[6],
+        "candidate_type": phase1.get("candidate_type"),
+        "final_score": phase1.get("final_score"),
+        "decision": phase1.get("decision"),
+        "strength": phase1.get("strength"),
+        "weakness": phase1.get("weakness"),
+    }
+    for k in DOMAIN_SCORE_KEYS:
+        out[f"score_{k}"] = domain_scores.get(k)
+    for k in MATCHED_KEYS:
+        out[f"matched_{k}"] = ";".join(str(x) for x in (matched.get(k) or []))
+    for k in SUMMARY_KEYS:
+        out[f"interview_{k}"] = summary.get(k)
+    out["evaluation_overall_score"] = evaluation.get("overall_score") if evaluation.get("status") == "done" else None
+    return out
+
+
+def iter_export(db, fmt="csv", chunk_size=EXPORT_CHUNK_SIZE, jd_config_id=None, status=None):
+    """Yields one text block per chunk (CSV with a header first, or JSONL)."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        yield buf.getvalue()
+        for rows in iter_candidate_chunks(db, chunk_size, jd_config_id, status):
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(flatten_candidate(r) for r in rows)
+            yield buf.getvalue()
+    else:
+        for rows in iter_candidate_chunks(db, chunk_size, jd_config_id, status):
+            yield "".join(json.dumps(flatten_candidate(r)) + "\n" for r in rows)
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(fmt="csv", gzip=False, jd_config_id=None, status=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Generator for a streaming response; owns (and closes) its own connection."""
+    db = get_db()
+    try:
+        chunks = iter_export(db, fmt, chunk_size, jd_config_id, status)
+        if gzip:
+            yield from gzip_stream(chunks)
+        else:
+            for chunk in chunks:
+                yield chunk.encode("utf-8")
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export candidates with scores and interview summaries.")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    parser.add_argument("--jd-id", type=int, default=None)
+    parser.add_argument("--status", default=None)
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+    from app import apply_config
+
+    apply_config()
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for block in stream_export(args.format, args.gzip, args.jd_id, args.status, args.chunk_size):
+            out.write(block)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import base64
+import json
+import threading
+import time
+
+# Sort key -> SQL expression. Each expression has a matching (expr, id) index
+# in init_db so ORDER BY and the keyset predicate are index range scans.
+SORT_COLUMNS = {
+    "id": "id",
+    "created_at": "created_at",
+    "status": "COALESCE(status, '')",
+    "final_score": "COALESCE(final_score, -1)",
+}
+CANDIDATE_STATUSES = ["new", "shortlisted", "rejected", "scheduled", "interview_completed"]
+MAX_PAGE_SIZE = 100
+COUNT_CACHE_TTL_SECONDS = 30
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def encode_cursor(sort_value, candidate_id):
+    raw = json.dumps([sort_value, candidate_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if isinstance(value, list) and len(value) == 2 and isinstance(value[1], int):
+            return value
+    except Exception:
+        pass
+    return None
+
+
+def _filters_sql(jd_config_id=None, status=None):
+    clauses = []
+    params = []
+    if jd_config_id is not None:
+        clauses.append("jd_config_id=?")
+        params.append(int(jd_config_id))
+    if status:
+        clauses.append("COALESCE(status, '')=?")
+        params.append(status)
+    return clauses, params
+
+
+def count_candidates(db, jd_config_id=None, status=None):
+    key = (jd_config_id, status)
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    clauses, params = _filters_sql(jd_config_id, status)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    total = db.execute(f"SELECT COUNT(*) FROM candidates {where}", params).fetchone()[0]
+
+    with _count_lock:
+        _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, total)
+    return total
+
+
+def invalidate_counts():
+    with _count_lock:
+        _count_cache.clear()
+
+
+def list_candidates(db, sort="id", direction="desc", limit=25, cursor=None, offset=0, jd_config_id=None, status=None):
+    """
+    Returns (rows, next_cursor). With a cursor the page is fetched by keyset
+    (constant cost at any depth); without one it falls back to OFFSET, which
+    is only used for the first page or a direct jump.
+    """
+    sort_expr = SORT_COLUMNS.get(sort, "id")
+    descending = str(direction).lower() != "asc"
+    limit = max(1, min(MAX_PAGE_SIZE, int(limit)))
+
+    clauses, params = _filters_sql(jd_config_id, status)
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        op = "<" if descending else ">"
+        if sort_expr == "id":
+            clauses.append(f"id {op} ?")
+            params.append(position[1])
+        else:
+            # Spelled out instead of a row-value compare so SQLite can seek the expression index.
+            clauses.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR id {op} ?)")
+            params.extend([position[0], position[0], position[1]])
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = "DESC" if descending else "ASC"
+    sql = f"""
+        SELECT id, name, email, status, final_score, created_at, {sort_expr}
+        FROM candidates
+        {where}
+        ORDER BY {sort_expr} {order}, id {order}
+        LIMIT ?
+    """
+    params.append(limit + 1)
+    if position is None and offset:
+        sql += " OFFSET ?"
+        params.append(max(0, int(offset)))
+
+    rows = db.execute(sql, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][6], rows[-1][0]) if has_more and rows else None
+    return [r[:6] for r in rows], next_cursor
+
+
+LEADERBOARD_MAX = 500
+
+
+def jd_leaderboard(db, jd_config_id, limit=20):
+    """Top shortlisted candidates for a JD: one range scan of idx_candidates_leaderboard."""
+    limit = max(1, min(LEADERBOARD_MAX, int(limit)))
+    rows = db.execute(
+        """
+        SELECT id, name, email, final_score, candidate_type, status
+        FROM candidates
+        WHERE jd_config_id=? AND decision='Shortlisted'
+        ORDER BY final_score DESC, id
+        LIMIT ?
+        """,
+        (int(jd_config_id), limit),
+    ).fetchall()
+    return [
+        {
+            "rank": idx + 1,
+            "id": r[0],
+            "name": r[1],
+            "email": r[2],
+            "final_score": r[3],
+            "candidate_type": r[4],
+            "status": r[5],
+        }
+        for idx, r in enumerate(rows)
+    ]
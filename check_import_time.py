@@ -0,0 +1,76 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "300"))
+# Heavy libraries that must only load on first use, never at worker boot.
+LAZY_MODULES = ("PyPDF2", "docx", "requests", "redis", "zstandard")
+# Built like the gunicorn master does; a started outbox sender would open (and create) the default database.
+BOOT = "from app import create_app; create_app({'OUTBOX_SENDER': False})"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _own_module_names():
+    names = {f[:-3] for f in os.listdir(BASE_DIR) if f.endswith(".py")}
+    names |= {f"routes.{f[:-3]}" for f in os.listdir(os.path.join(BASE_DIR, "routes")) if f.endswith(".py")}
+    names.add("routes")
+    return names
+
+
+def measure():
+    """Runs a fresh interpreter that boots the app under -X importtime; returns [(name, self_us, cumulative_us, depth)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("app failed to boot")
+    rows = []
+    for line in result.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if booting the app imports too slowly or too eagerly.")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    measure()  # first run writes bytecode; time the warm one
+    rows = measure()
+    own = _own_module_names()
+    total_ms = sum(r[1] for r in rows) / 1000
+    own_ms = sum(r[1] for r in rows if r[0] in own) / 1000
+    eager = sorted({r[0].split(".")[0] for r in rows if r[0].split(".")[0] in LAZY_MODULES})
+
+    print(f"imports: {total_ms:.1f} ms total, {own_ms:.1f} ms in this repo's modules (budget {args.budget_ms:.0f} ms)")
+    print("slowest top-level imports (cumulative):")
+    for name, _self_us, cumulative, _depth in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print("slowest repo modules (self):")
+    for name, self_us, _cumulative, _depth in sorted((r for r in rows if r[0] in own), key=lambda r: -r[1])[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at boot but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: boot imports took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import importlib.util
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+from database import get_db
+
+# zstandard is optional and only imported when a zstd payload is (de)compressed.
+HAVE_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+ARCHIVED_COLUMNS = [
+    "phase1_result_json",
+    "questions_json",
+    "answers_json",
+    "monitoring_json",
+    "interview_summary_json",
+    "evaluation_json",
+    "proctoring_json",
+]
+ARCHIVABLE_STATUSES = ("interview_completed", "rejected")
+# Rejected, or interview completed and evaluated, and idle since the cutoff
+# (one parameter). Written against `candidates` so the archiving UPDATE can
+# repeat it.
+_ARCHIVABLE_SQL = f"""
+    candidates.archived_at IS NULL
+    AND candidates.status IN ({", ".join(repr(s) for s in ARCHIVABLE_STATUSES)})
+    AND (candidates.status != 'interview_completed'
+         OR (json_valid(candidates.evaluation_json)
+             AND json_extract(candidates.evaluation_json, '$.status') IN ('done', 'failed')))
+    AND datetime(COALESCE(
+        (SELECT s.completed_at FROM interview_summaries s WHERE s.candidate_id = candidates.id),
+        candidates.created_at)) < datetime(?)
+"""
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "7"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+DEFAULT_CODEC = os.getenv("COLD_STORAGE_CODEC", "zstd" if HAVE_ZSTD else "zlib")
+
+
+def compress(raw, codec=DEFAULT_CODEC):
+    if codec == "zstd":
+        if not HAVE_ZSTD:
+            raise RuntimeError("zstd codec requested but the zstandard package is not installed")
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return zlib.compress(raw, 9)
+
+
+def decompress(blob, codec):
+    if codec == "zstd":
+        if not HAVE_ZSTD:
+            raise RuntimeError("zstd-compressed archive found but the zstandard package is not installed")
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def archive_candidate(db, candidate_id, codec=DEFAULT_CODEC, cutoff=None):
+    """
+    Move the JSON blobs into candidate_archive. With cutoff (compact()), the
+    row is only archived if it is still eligible. Call inside BEGIN IMMEDIATE.
+    Returns (original_bytes, compressed_bytes), (0, 0) if nothing was archived.
+    """
+    cols = ", ".join(ARCHIVED_COLUMNS)
+    where = _ARCHIVABLE_SQL if cutoff else "archived_at IS NULL"
+    params = [cutoff] if cutoff else []
+    row = db.execute(f"SELECT {cols} FROM candidates WHERE id=? AND {where}", [candidate_id] + params).fetchone()
+    if not row:
+        return 0, 0
+
+    blobs = dict(zip(ARCHIVED_COLUMNS, row))
+    original_bytes = sum(len(v.encode("utf-8")) for v in blobs.values() if v)
+    payload = compress(json.dumps(blobs).encode("utf-8"), codec)
+    now = datetime.utcnow().isoformat()
+
+    cleared = ", ".join(f"{c}=NULL" for c in ARCHIVED_COLUMNS)
+    cur = db.execute(
+        f"UPDATE candidates SET {cleared}, archived_at=? WHERE id=? AND {where}",
+        [now, candidate_id] + params,
+    )
+    if cur.rowcount != 1:
+        return 0, 0
+    db.execute(
+        """
+        INSERT OR REPLACE INTO candidate_archive
+        (candidate_id, codec, payload, original_bytes, compressed_bytes, archived_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (candidate_id, codec, payload, original_bytes, len(payload), now),
+    )
+    return original_bytes, len(payload)
+
+
+def load_archived_blobs(db, candidate_id):
+    row = db.execute(
+        "SELECT codec, payload FROM candidate_archive WHERE candidate_id=?",
+        (candidate_id,),
+    ).fetchone()
+    if not row:
+        return {}
+    return json.loads(decompress(row[1], row[0]).decode("utf-8"))
+
+
+def restore_candidate(db, candidate_id):
+    """
+    Move an archived candidate's blobs back into the hot table. Any code
+    path that writes one of ARCHIVED_COLUMNS calls this first.
+    The caller commits.
+    """
+    blobs = load_archived_blobs(db, candidate_id)
+    if not blobs:
+        db.execute("UPDATE candidates SET archived_at=NULL WHERE id=? AND archived_at IS NOT NULL", (candidate_id,))
+        return False
+
+    assignments = ", ".join(f"{c}=?" for c in ARCHIVED_COLUMNS)
+    db.execute(
+        f"UPDATE candidates SET {assignments}, archived_at=NULL WHERE id=?",
+        [blobs.get(c) for c in ARCHIVED_COLUMNS] + [candidate_id],
+    )
+    db.execute("DELETE FROM candidate_archive WHERE candidate_id=?", (candidate_id,))
+    return True
+
+
+def restore_if_archived(db, candidate_id):
+    row = db.execute("SELECT archived_at FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    if row and row[0]:
+        restore_candidate(db, candidate_id)
+        return True
+    return False
+
+
+def with_archived_blobs(db, candidate_id, archived_at, values):
+    """
+    values: {column: hot value} for the ARCHIVED_COLUMNS a reader selected.
+    Returns the same dict filled from the archive when the row is archived.
+    """
+    if not archived_at:
+        return values
+    blobs = load_archived_blobs(db, candidate_id)
+    return {c: blobs.get(c, v) for c, v in values.items()}
+
+
+def _database_size(db):
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    freelist = db.execute("PRAGMA freelist_count").fetchone()[0]
+    return page_size * page_count, page_size * freelist
+
+
+def compact(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, codec=DEFAULT_CODEC, vacuum=False, max_batches=None):
+    """
+    Online compaction: archives eligible candidates in small transactions so
+    interview writes keep flowing. Eligible = rejected, or interview
+    completed, and idle for older_than_days (well past the link window).
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+    db = get_db()
+    size_before, _free_before = _database_size(db)
+    archived = 0
+    original_total = 0
+    compressed_total = 0
+    batches = 0
+    last_id = 0
+
+    try:
+        while max_batches is None or batches < max_batches:
+            rows = db.execute(
+                f"SELECT id FROM candidates WHERE id > ? AND {_ARCHIVABLE_SQL} ORDER BY id LIMIT ?",
+                (last_id, cutoff, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            # A candidate may have resumed since the SELECT; archive_candidate re-checks under the write lock.
+            db.execute("BEGIN IMMEDIATE")
+            for (candidate_id,) in rows:
+                original_bytes, compressed_bytes = archive_candidate(db, candidate_id, codec, cutoff=cutoff)
+                if not compressed_bytes:
+                    continue
+                original_total += original_bytes
+                compressed_total += compressed_bytes
+                archived += 1
+            db.commit()
+            batches += 1
+
+        if vacuum and archived:
+            db.execute("VACUUM")
+        size_after, free_after = _database_size(db)
+    finally:
+        db.close()
+
+    return {
+        "archived": archived,
+        "batches": batches,
+        "codec": codec,
+        "json_bytes_moved": original_total,
+        "compressed_bytes": compressed_total,
+        "bytes_saved": original_total - compressed_total,
+        "compression_ratio": round(original_total / compressed_total, 2) if compressed_total else 0,
+        "db_bytes_before": size_before,
+        "db_bytes_after": size_after,
+        "free_bytes_reusable": free_after,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive finished candidates' JSON blobs into compressed cold storage.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default=DEFAULT_CODEC)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return freed pages to the OS (locks the DB)")
+    args = parser.parse_args(argv)
+    from app import apply_config
+
+    apply_config()
+    report = compact(args.older_than_days, args.batch_size, args.codec, args.vacuum)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
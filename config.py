@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Everything the app takes from the environment that is a secret, a file or
+# directory location or an external service address (Azure app settings in
+# production, safe defaults for local). create_app() hands these to the
+# modules that use them; nothing else reads them from the environment.
+# Tuning knobs (batch sizes, timeouts, thresholds) stay next to their code;
+# see the README.
+TRACED_ENDPOINTS = [
+    "candidate.candidate_upload",
+    "interview.interview",
+    "interview.interview_save_answer",
+    "interview.interview_save_answers_batch",
+    "interview.interview_monitoring",
+    "interview.interview_complete",
+    "hr.hr_dashboard",
+]
+
+
+def _tmp(name):
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def smtp_from_env():
+    user = os.getenv("SMTP_USER", "").strip()
+    return {
+        "host": os.getenv("SMTP_HOST", "").strip(),
+        "port": int(os.getenv("SMTP_PORT", "587")),
+        "user": user,
+        "password": os.getenv("SMTP_PASSWORD", "").strip(),
+        "from_email": os.getenv("SMTP_FROM", user).strip(),
+        # SMTP_STARTTLS=0 for a local relay or test server without TLS.
+        "starttls": os.getenv("SMTP_STARTTLS", "1") != "0",
+        "timeout": int(os.getenv("SMTP_TIMEOUT", "20")),
+    }
+
+
+def load_config(overrides=None):
+    config = {
+        # Secrets
+        "SECRET_KEY": os.getenv("SECRET_KEY", "supersecretkey"),
+        # "kid:secret,..."; empty derives a single key from SECRET_KEY.
+        "INTERVIEW_TOKEN_KEYS": os.getenv("INTERVIEW_TOKEN_KEYS", "").strip(),
+        # Empty disables the X-Profile header trigger.
+        "PROFILE_SECRET": os.getenv("PROFILE_SECRET", "").strip(),
+        "SMTP": smtp_from_env(),
+        # Locations
+        "BASE_URL": os.getenv("BASE_URL", "http://127.0.0.1:5000"),
+        "UPLOAD_FOLDER": os.getenv("UPLOAD_FOLDER", "uploads"),
+        # Unset keeps database.DB_PATH (database.db next to the code).
+        "DB_PATH": os.getenv("DB_PATH", "").strip() or None,
+        # Compiled templates are kept here so each worker loads bytecode instead of
+        # recompiling; empty disables the on-disk cache.
+        "JINJA_CACHE_DIR": os.getenv("JINJA_CACHE_DIR", _tmp("interview_bot_jinja")),
+        # redis://... uses Redis; otherwise the SQLite file at SHARED_CACHE_PATH.
+        "SHARED_CACHE_URL": os.getenv("SHARED_CACHE_URL", "").strip(),
+        "SHARED_CACHE_PATH": os.getenv("SHARED_CACHE_PATH", os.path.join(BASE_DIR, "cache.db")),
+        "METRICS_DIR": os.getenv("METRICS_DIR", _tmp("interview_bot_metrics")),
+        "PROFILE_DIR": os.getenv("PROFILE_DIR", _tmp("interview_bot_profiles")),
+        # Empty disables the JSONL file.
+        "TRACE_LOG_PATH": os.getenv("TRACE_LOG_PATH", os.path.join(BASE_DIR, "traces.jsonl")),
+        "SLOW_QUERY_LOG_PATH": os.getenv("SLOW_QUERY_LOG_PATH", os.path.join(BASE_DIR, "slow_queries.jsonl")),
+        # App
+        # Schema setup is normally `flask --app app init-db`; 1 runs it at startup instead.
+        "INIT_DB_ON_START": os.getenv("INIT_DB_ON_START", "0") == "1",
+        "TRACED_ENDPOINTS": TRACED_ENDPOINTS,
+        # Each app process runs an outbox sender thread; 0 when `python outbox.py --loop`
+        # runs as its own process instead.
+        "OUTBOX_SENDER": os.getenv("OUTBOX_SENDER", "1") == "1",
+    }
+    if overrides:
+        config.update(overrides)
+    return config
@@ -1,14 +1,169 @@
 import os
 import sqlite3
+import time
 
 from werkzeug.security import generate_password_hash
 
+from metrics import record_db
+from slow_query import SLOW_QUERY_SECONDS, log_slow_query
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "database.db")
 
 
+class _TimedCursor(sqlite3.Cursor):
+    # Feeds per-request query counts and SQLite time into metrics, and hands
+    # statements whose execute + fetch time reaches the threshold to the slow-query log.
+
+    def _start_statement(self, sql, parameters):
+        self._sql = sql
+        self._parameters = parameters
+        self._seconds = 0.0
+        self._logged = False
+
+    def _record(self, elapsed, statements=0):
+        record_db(elapsed, statements=statements)
+        self._seconds += elapsed
+        if self._seconds >= SLOW_QUERY_SECONDS and not self._logged:
+            self._logged = True
+            log_slow_query(self.connection, self._sql, self._parameters, self._seconds)
+
+    def execute(self, sql, parameters=()):
+        self._start_statement(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(time.perf_counter() - start, statements=1)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start_statement(sql, None)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(time.perf_counter() - start, statements=1)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._record(time.perf_counter() - start)
+
+    def fetchmany(self, size=1):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(size)
+        finally:
+            self._record(time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._record(time.perf_counter() - start)
+
+
+class _TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            record_db(time.perf_counter() - start, statements=0)
+
+
+def connect(path=None, **kwargs):
+    return sqlite3.connect(path or DB_PATH, factory=_TimedConnection, **kwargs)
+
+
 def get_db():
-    return sqlite3.connect(DB_PATH)
+    return connect()
+
+
+def _score_bucket(ref):
+    return f"'score:' || MIN(9, MAX(0, CAST({ref}.final_score / 10 AS INTEGER)))"
+
+
+def _bump_jd_stat(jd_expr, stat_expr, count, total="0", where="1"):
+    return f"""
+        INSERT INTO jd_stats (jd_config_id, stat, count, total)
+        SELECT {jd_expr}, {stat_expr}, {count}, {total}
+        WHERE {jd_expr} IS NOT NULL AND {stat_expr} IS NOT NULL AND {where}
+        ON CONFLICT(jd_config_id, stat) DO UPDATE SET
+            count = count + excluded.count,
+            total = total + excluded.total;
+    """
+
+
+_CANDIDATE_JD = "(SELECT jd_config_id FROM candidates WHERE id = {ref}.candidate_id)"
+
+JD_STATS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_candidate_insert
+    AFTER INSERT ON candidates
+    BEGIN
+        {_bump_jd_stat("new.jd_config_id", "'status:' || COALESCE(new.status, 'new')", 1)}
+        {_bump_jd_stat("new.jd_config_id", _score_bucket("new"), 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_candidate_update
+    AFTER UPDATE OF status, jd_config_id, final_score ON candidates
+    WHEN old.status IS NOT new.status
+      OR old.jd_config_id IS NOT new.jd_config_id
+      OR old.final_score IS NOT new.final_score
+    BEGIN
+        {_bump_jd_stat("old.jd_config_id", "'status:' || COALESCE(old.status, 'new')", -1)}
+        {_bump_jd_stat("old.jd_config_id", _score_bucket("old"), -1)}
+        {_bump_jd_stat("new.jd_config_id", "'status:' || COALESCE(new.status, 'new')", 1)}
+        {_bump_jd_stat("new.jd_config_id", _score_bucket("new"), 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_candidate_delete
+    AFTER DELETE ON candidates
+    BEGIN
+        {_bump_jd_stat("old.jd_config_id", "'status:' || COALESCE(old.status, 'new')", -1)}
+        {_bump_jd_stat("old.jd_config_id", _score_bucket("old"), -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_answer_insert
+    AFTER INSERT ON interview_question_stats
+    WHEN new.answered
+    BEGIN
+        {_bump_jd_stat(_CANDIDATE_JD.format(ref="new"), "'answer_time'", 1, "new.time_taken_seconds")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_answer_update
+    AFTER UPDATE OF answered, time_taken_seconds ON interview_question_stats
+    BEGIN
+        {_bump_jd_stat(_CANDIDATE_JD.format(ref="old"), "'answer_time'", -1, "-old.time_taken_seconds", "old.answered")}
+        {_bump_jd_stat(_CANDIDATE_JD.format(ref="new"), "'answer_time'", 1, "new.time_taken_seconds", "new.answered")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_jd_stats_answer_delete
+    AFTER DELETE ON interview_question_stats
+    WHEN old.answered
+    BEGIN
+        {_bump_jd_stat(_CANDIDATE_JD.format(ref="old"), "'answer_time'", -1, "-old.time_taken_seconds")}
+    END
+    """,
+]
 
 
 def init_db():
@@ -53,6 +208,11 @@ def init_db():
         monitoring_json TEXT,
         interview_summary_json TEXT,
         evaluation_json TEXT,
+        answers_seq INTEGER DEFAULT 0,
+        final_score REAL,
+        decision TEXT,
+        candidate_type TEXT,
+        archived_at TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """
@@ -93,6 +253,211 @@ def init_db():
     except:
         pass
 
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN answers_seq INTEGER DEFAULT 0")
+    except:
+        pass
+
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN final_score REAL")
+    except:
+        pass
+
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN decision TEXT")
+    except:
+        pass
+
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN candidate_type TEXT")
+    except:
+        pass
+
+    # Backfill the scoring columns that are denormalized out of phase1_result_json.
+    db.execute(
+        """
+    UPDATE candidates
+    SET final_score = json_extract(phase1_result_json, '$.final_score'),
+        decision = json_extract(phase1_result_json, '$.decision'),
+        candidate_type = json_extract(phase1_result_json, '$.candidate_type')
+    WHERE (final_score IS NULL OR decision IS NULL OR candidate_type IS NULL)
+      AND json_valid(phase1_result_json)
+    """
+    )
+
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN archived_at TEXT")
+    except:
+        pass
+
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_interview_token ON candidates(interview_token)")
+    # Listing indexes: one (sort expression, id) index per sortable column (see candidate_listing.SORT_COLUMNS).
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at, id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates(COALESCE(status, ''), id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates(COALESCE(final_score, -1), id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_jd ON candidates(jd_config_id, id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_jd_score ON candidates(jd_config_id, COALESCE(final_score, -1), id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_jd_created ON candidates(jd_config_id, created_at, id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_jd_status ON candidates(jd_config_id, COALESCE(status, ''), id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status_score ON candidates(COALESCE(status, ''), COALESCE(final_score, -1), id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status_created ON candidates(COALESCE(status, ''), created_at, id)")
+    # Covering index for the per-JD leaderboard: the query never touches the table rows.
+    db.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_candidates_leaderboard
+    ON candidates(jd_config_id, decision, final_score DESC, id, candidate_type, status, name, email)
+    """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_decision_score ON candidates(decision, final_score DESC, id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_type_score ON candidates(candidate_type, final_score DESC, id)")
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS interview_summaries (
+        candidate_id INTEGER PRIMARY KEY,
+        total_questions INTEGER DEFAULT 0,
+        answered_count INTEGER DEFAULT 0,
+        total_words INTEGER DEFAULT 0,
+        total_time_seconds REAL DEFAULT 0,
+        updated_at TEXT,
+        completed_at TEXT
+    )
+    """
+    )
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS interview_question_stats (
+        candidate_id INTEGER NOT NULL,
+        question_index INTEGER NOT NULL,
+        answered INTEGER DEFAULT 0,
+        word_count INTEGER DEFAULT 0,
+        time_taken_seconds REAL DEFAULT 0,
+        submitted_at TEXT,
+        PRIMARY KEY (candidate_id, question_index)
+    )
+    """
+    )
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS candidate_reports (
+        candidate_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        dirty INTEGER NOT NULL DEFAULT 0,
+        view_model_json TEXT,
+        built_at TEXT
+    )
+    """
+    )
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS candidate_archive (
+        candidate_id INTEGER PRIMARY KEY,
+        codec TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        original_bytes INTEGER,
+        compressed_bytes INTEGER,
+        archived_at TEXT
+    )
+    """
+    )
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS mail_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        to_email TEXT NOT NULL,
+        subject TEXT,
+        body TEXT,
+        status TEXT CHECK(status IN ('pending','sending','sent','dead')) NOT NULL DEFAULT 'pending',
+        attempts INTEGER DEFAULT 0,
+        next_attempt_at TEXT,
+        claimed_at TEXT,
+        last_error TEXT,
+        created_at TEXT,
+        sent_at TEXT,
+        kind TEXT,
+        candidate_id INTEGER,
+        campaign_id INTEGER
+    )
+    """
+    )
+
+    for column in ["kind TEXT", "candidate_id INTEGER", "campaign_id INTEGER"]:
+        try:
+            db.execute(f"ALTER TABLE mail_outbox ADD COLUMN {column}")
+        except:
+            pass
+
+    db.execute("CREATE INDEX IF NOT EXISTS idx_mail_outbox_due ON mail_outbox(status, next_attempt_at)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_mail_outbox_candidate ON mail_outbox(candidate_id, kind)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_mail_outbox_campaign ON mail_outbox(campaign_id)")
+
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS invite_campaigns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        jd_config_id INTEGER,
+        created_by TEXT,
+        candidate_count INTEGER DEFAULT 0,
+        first_slot TEXT,
+        slot_minutes INTEGER,
+        per_slot INTEGER,
+        created_at TEXT
+    )
+    """
+    )
+
+    # Bookable interview slots (see slots.py). booked is only changed by
+    # conditional UPDATEs, and the CHECK is the last line against overbooking.
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS interview_slots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        starts_at TEXT NOT NULL UNIQUE,
+        minutes INTEGER NOT NULL DEFAULT 30,
+        capacity INTEGER NOT NULL,
+        booked INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT,
+        CHECK (booked >= 0 AND booked <= capacity)
+    )
+    """
+    )
+
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN slot_id INTEGER")
+    except:
+        pass
+
+    # Set on the first in-window load of the interview page; lets a started
+    # interview keep saving after its link's window has closed.
+    try:
+        db.execute("ALTER TABLE candidates ADD COLUMN interview_started_at TEXT")
+    except:
+        pass
+
+    db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_slot ON candidates(slot_id)")
+
+    # Per-JD counters kept current by the triggers below: 'status:<status>'
+    # (funnel), 'score:<0-9>' (final_score decile) and 'answer_time'
+    # (answered questions / total seconds). jd_stats.py rebuilds them.
+    db.execute(
+        """
+    CREATE TABLE IF NOT EXISTS jd_stats (
+        jd_config_id INTEGER NOT NULL,
+        stat TEXT NOT NULL,
+        count INTEGER DEFAULT 0,
+        total REAL DEFAULT 0,
+        PRIMARY KEY (jd_config_id, stat)
+    )
+    """
+    )
+
+    for trigger in JD_STATS_TRIGGERS:
+        db.execute(trigger)
+
     db.execute(
         """
     CREATE TABLE IF NOT EXISTS jd_configs (
@@ -125,6 +490,12 @@ def init_db():
     except:
         pass
 
+    if db.execute("SELECT 1 FROM jd_stats LIMIT 1").fetchone() is None:
+        # First run with the stats table (or an empty one): backfill from existing rows.
+        from jd_stats import rebuild_jd_stats
+
+        rebuild_jd_stats(db)
+
     db.commit()
     db.close()
 
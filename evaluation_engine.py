@@ -0,0 +1,295 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database import get_db
+from event_bus import publish_interview_event
+from question_engine import _collect_jd_skills
+from reports import refresh_report
+from routes.shared import (
+    _normalize_questions,
+    _parse_json_list,
+    get_jd_config_by_id,
+    get_latest_jd_config,
+)
+
+EVALUATION_VERSION = 1
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "2"))
+EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "20"))
+# A "running" claim older than this is assumed to belong to a dead worker.
+CLAIM_TIMEOUT_SECONDS = 600
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "for", "from", "how", "i", "in",
+    "is", "it", "its", "me", "my", "of", "on", "or", "that", "the", "this", "to", "was", "we",
+    "what", "where", "which", "with", "you", "your", "explain", "describe",
+}
+
+# Score weights (sum to 1.0)
+KEYWORD_WEIGHT = 0.45
+SIMILARITY_WEIGHT = 0.35
+LENGTH_WEIGHT = 0.20
+# Cosine similarity of a good free-text answer to its reference rarely exceeds this.
+SIMILARITY_CEILING = 0.4
+TARGET_ANSWER_WORDS = 40
+
+
+def _tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*", (text or "").lower()) if t not in STOPWORDS]
+
+
+def _contains_skill(text_lower, skill):
+    pattern = r"(?<![a-z0-9])" + re.escape(skill.lower()) + r"(?![a-z0-9])"
+    return re.search(pattern, text_lower) is not None
+
+
+def _idf(docs_tokens):
+    n = len(docs_tokens)
+    df = Counter()
+    for tokens in docs_tokens:
+        df.update(set(tokens))
+    return {term: math.log((1 + n) / (1 + count)) + 1.0 for term, count in df.items()}
+
+
+def _tfidf(tokens, idf):
+    if not tokens:
+        return {}
+    counts = Counter(tokens)
+    total = float(len(tokens))
+    return {term: (count / total) * idf.get(term, 1.0) for term, count in counts.items()}
+
+
+def _cosine(a, b):
+    if not a or not b:
+        return 0.0
+    dot = sum(weight * b.get(term, 0.0) for term, weight in a.items())
+    norm_a = math.sqrt(sum(w * w for w in a.values()))
+    norm_b = math.sqrt(sum(w * w for w in b.values()))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def _skill_reference(skill, jd_sentences):
+    # No curated skill descriptions exist; the JD sentences naming the skill stand in for one.
+    related = [s for s in jd_sentences if _contains_skill(s.lower(), skill)]
+    return " ".join([skill] + related)
+
+
+def evaluate_interview(questions, answers, jd_dict, jd_text=""):
+    jd_skills = []
+    seen = set()
+    for skill in _collect_jd_skills(jd_dict):
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            jd_skills.append(skill)
+
+    jd_sentences = [s.strip() for s in re.split(r"[.\n;]+", jd_text or "") if s.strip()]
+    answers_by_index = {}
+    for item in answers or []:
+        if isinstance(item, dict):
+            try:
+                answers_by_index[int(item.get("question_index", -1))] = str(item.get("answer", "")).strip()
+            except:
+                continue
+
+    references = []
+    for question in questions:
+        targeted = [s for s in jd_skills if _contains_skill(question.lower(), s)]
+        reference = " ".join([question] + [_skill_reference(s, jd_sentences) for s in (targeted or jd_skills)])
+        references.append((targeted, reference))
+
+    answer_tokens = [_tokenize(answers_by_index.get(i, "")) for i in range(len(questions))]
+    reference_tokens = [_tokenize(ref) for _targeted, ref in references]
+    idf = _idf(answer_tokens + reference_tokens)
+
+    per_question = []
+    demonstrated = set()
+    for idx, question in enumerate(questions):
+        answer = answers_by_index.get(idx, "")
+        targeted, _reference = references[idx]
+        answer_lower = answer.lower()
+
+        if not answer:
+            per_question.append(
+                {
+                    "question_index": idx,
+                    "question": question,
+                    "answered": False,
+                    "score": 0.0,
+                    "keyword_coverage": 0.0,
+                    "similarity": 0.0,
+                    "matched_keywords": [],
+                }
+            )
+            continue
+
+        matched = [s for s in jd_skills if _contains_skill(answer_lower, s)]
+        demonstrated.update(matched)
+        if targeted:
+            coverage = len([s for s in targeted if s in matched]) / len(targeted)
+        elif jd_skills:
+            coverage = min(1.0, len(matched) / 3.0)
+        else:
+            coverage = 0.0
+
+        similarity = _cosine(_tfidf(answer_tokens[idx], idf), _tfidf(reference_tokens[idx], idf))
+        length_factor = min(1.0, len(answer.split()) / float(TARGET_ANSWER_WORDS))
+        score = 10.0 * (
+            KEYWORD_WEIGHT * coverage
+            + SIMILARITY_WEIGHT * min(1.0, similarity / SIMILARITY_CEILING)
+            + LENGTH_WEIGHT * length_factor
+        )
+
+        per_question.append(
+            {
+                "question_index": idx,
+                "question": question,
+                "answered": True,
+                "score": round(score, 2),
+                "keyword_coverage": round(coverage, 3),
+                "similarity": round(similarity, 3),
+                "matched_keywords": matched,
+            }
+        )
+
+    total_questions = len(questions)
+    overall = sum(q["score"] for q in per_question) / total_questions if total_questions else 0.0
+    return {
+        "status": "done",
+        "version": EVALUATION_VERSION,
+        "evaluated_at": datetime.utcnow().isoformat(),
+        "overall_score": round(overall, 2),
+        "total_questions": total_questions,
+        "answered_count": len([q for q in per_question if q["answered"]]),
+        "skills_demonstrated": [s for s in jd_skills if s in demonstrated],
+        "skills_missing": [s for s in jd_skills if s not in demonstrated],
+        "questions": per_question,
+    }
+
+
+def _claim_batch(db, batch_size):
+    stale_before = (datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)).isoformat()
+    rows = db.execute(
+        """
+        SELECT id FROM candidates
+        WHERE status='interview_completed'
+          AND archived_at IS NULL
+          AND (evaluation_json IS NULL
+               OR (json_valid(evaluation_json)
+                   AND json_extract(evaluation_json, '$.status')='running'
+                   AND json_extract(evaluation_json, '$.claimed_at') < ?))
+        ORDER BY id
+        LIMIT ?
+        """,
+        (stale_before, batch_size),
+    ).fetchall()
+
+    claimed = []
+    claim = json.dumps({"status": "running", "claimed_at": datetime.utcnow().isoformat()})
+    for (candidate_id,) in rows:
+        # Conditional update so two workers never evaluate the same interview.
+        cur = db.execute(
+            """
+            UPDATE candidates SET evaluation_json=?
+            WHERE id=? AND archived_at IS NULL AND (evaluation_json IS NULL
+                            OR (json_valid(evaluation_json)
+                                AND json_extract(evaluation_json, '$.status')='running'
+                                AND json_extract(evaluation_json, '$.claimed_at') < ?))
+            """,
+            (claim, candidate_id, stale_before),
+        )
+        if cur.rowcount == 1:
+            claimed.append(candidate_id)
+    db.commit()
+    return claimed
+
+
+def evaluate_candidate(db, candidate_id):
+    row = db.execute(
+        "SELECT questions_json, answers_json, jd_config_id FROM candidates WHERE id=?",
+        (candidate_id,),
+    ).fetchone()
+    if not row:
+        return None
+
+    config = get_jd_config_by_id(int(row[2])) if row[2] else None
+    if not config:
+        config = get_latest_jd_config() or {}
+
+    evaluation = evaluate_interview(
+        questions=_normalize_questions(_parse_json_list(row[0])),
+        answers=_parse_json_list(row[1]),
+        jd_dict=config.get("jd_dict", {}),
+        jd_text=config.get("jd_text", ""),
+    )
+    db.execute(
+        "UPDATE candidates SET evaluation_json=? WHERE id=?",
+        (json.dumps(evaluation), candidate_id),
+    )
+    db.commit()
+    refresh_report(db, candidate_id)
+    publish_interview_event(
+        candidate_id,
+        row[2],
+        "evaluated",
+        {"overall_score": evaluation["overall_score"], "answered_count": evaluation["answered_count"]},
+    )
+    return evaluation
+
+
+def run_pending_evaluations(batch_size=EVALUATION_BATCH_SIZE):
+    evaluated = 0
+    db = get_db()
+    try:
+        while True:
+            claimed = _claim_batch(db, batch_size)
+            if not claimed:
+                break
+            for candidate_id in claimed:
+                try:
+                    evaluate_candidate(db, candidate_id)
+                    evaluated += 1
+                except Exception as e:
+                    print(f"[EVALUATION] candidate {candidate_id} failed: {e}")
+                    db.execute(
+                        "UPDATE candidates SET evaluation_json=? WHERE id=?",
+                        (json.dumps({"status": "failed", "error": str(e)}), candidate_id),
+                    )
+                    db.commit()
+                    refresh_report(db, candidate_id)
+    finally:
+        db.close()
+    return evaluated
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def schedule_evaluation():
+    """Fire-and-forget: drain pending evaluations on the background pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EVALUATION_WORKERS, thread_name_prefix="evaluation")
+        return _executor.submit(run_pending_evaluations)
+
+
+def reset_after_fork():
+    """A forked child inherits the pool object but none of its threads."""
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if __name__ == "__main__":
+    from app import apply_config
+
+    apply_config()
+    print(f"Evaluated {run_pending_evaluations()} interview(s).")
@@ -0,0 +1,110 @@
+import json
+import os
+import queue
+import threading
+import time
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+HEARTBEAT_SECONDS = int(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+
+class Subscription:
+    def __init__(self, bus, topics, maxsize):
+        self.bus = bus
+        self.topics = tuple(topics)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event):
+        # Never block the publisher: a slow viewer loses its oldest events instead.
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process pub/sub. Interview endpoints publish to topics such as
+    "candidate:<id>" and "jd:<id>"; each SSE connection owns one bounded
+    Subscription. Only events published by the same worker process are seen.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, *topics):
+        sub = Subscription(self, topics, self.queue_size)
+        with self._lock:
+            for topic in sub.topics:
+                self._subscribers.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for topic in sub.topics:
+                subs = self._subscribers.get(topic)
+                if subs is None:
+                    continue
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[topic]
+
+    def publish(self, topic, event_type, data=None):
+        event = {"type": event_type, "topic": topic, "ts": time.time(), "data": data or {}}
+        with self._lock:
+            subs = list(self._subscribers.get(topic, ()))
+            self.published += 1
+        for sub in subs:
+            sub.offer(event)
+        return len(subs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "topics": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+            }
+
+
+bus = EventBus()
+
+
+def publish_interview_event(candidate_id, jd_config_id, event_type, data=None):
+    payload = dict(data or {})
+    payload["candidate_id"] = candidate_id
+    bus.publish(f"candidate:{candidate_id}", event_type, payload)
+    if jd_config_id:
+        bus.publish(f"jd:{jd_config_id}", event_type, payload)
+
+
+def sse_stream(sub, heartbeat_seconds=HEARTBEAT_SECONDS):
+    try:
+        yield "retry: 5000\n: connected\n\n"
+        while True:
+            event = sub.get(timeout=heartbeat_seconds)
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        sub.close()
@@ -0,0 +1,103 @@
+# Production server profile; gunicorn reads this file from the working
+# directory, so `flask --app app init-db && gunicorn` is enough. Every setting
+# can be overridden with the env vars below or on the command line.
+import glob
+import multiprocessing
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")  # gthread | gevent | sync
+
+if worker_class == "gevent":
+    # With preload_app the app is imported in the master, before gevent's worker
+    # would patch; patch first so locks and sockets created at import are green.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+# The preloading master must not run the outbox sender (threads do not survive
+# fork); each worker starts its own in post_fork.
+wsgi_app = "app:create_app({'OUTBOX_SENDER': False})"
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# SSE viewers only see events published in their own worker (see "Live HR
+# views"), so keep this small and scale with threads / gevent instead.
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+threads = int(os.getenv("GUNICORN_THREADS", "32"))  # gthread only
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "500"))  # gevent only
+
+# Import the app, taxonomy and compiled templates once in the master; workers
+# share those pages copy-on-write.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Recycle workers to cap slow memory growth; jitter keeps them from all restarting together.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# gthread/gevent heartbeats continue during long SSE streams, so this only
+# catches a truly stuck worker.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+
+
+def on_starting(server):
+    # Per-worker metric files of a previous run would be summed into /metrics.
+    from config import load_config
+
+    for path in glob.glob(os.path.join(load_config()["METRICS_DIR"], "*.json")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import warm_templates
+
+    warm_templates(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    # A child inherits the master's objects but not its threads. Drop anything
+    # that refers to threads or counts recorded before the fork. The JD config
+    # cache and shared cache key their SQLite connections by pid, so they reopen
+    # on their own.
+    import evaluation_engine
+    import outbox
+    from app import apply_config
+    from config import load_config
+    from interview_cache import session_cache
+    from metrics import registry
+
+    outbox.reset_after_fork()
+    evaluation_engine.reset_after_fork()
+    session_cache.clear()
+    registry.reset()
+
+    # Without preload the app is built after this hook, so apply the config
+    # before the sender's first flush.
+    config = load_config()
+    apply_config(config)
+    if config["OUTBOX_SENDER"]:
+        outbox.wake_outbox()
+
+
+def worker_exit(server, worker):
+    # Runs in the worker: write its final counters before it goes away.
+    from metrics import registry
+
+    registry.flush(force=True)
+
+
+def child_exit(server, worker):
+    # Runs in the master once the worker is reaped (also after a timeout kill).
+    # The master may never have built the app, so take the directory from config.
+    import metrics
+    from config import load_config
+
+    metrics.METRICS_DIR = load_config()["METRICS_DIR"]
+    metrics.mark_process_dead(worker.pid)
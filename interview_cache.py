@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class InterviewSessionCache:
+    """
+    Token-keyed cache for the immutable part of an interview session
+    (candidate id, name, date, question list, JD config id).
+    Entries expire after ttl_seconds and the least recently used entry is
+    evicted once max_size is reached.
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=3600):
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, token):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[token]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(token)
+            self.hits += 1
+            return value
+
+    def set(self, token, value):
+        if not token:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._data[token] = (expires_at, value)
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token):
+        if not token:
+            return
+        with self._lock:
+            self._data.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+session_cache = InterviewSessionCache(
+    max_size=int(os.getenv("INTERVIEW_CACHE_SIZE", "1024")),
+    ttl_seconds=int(os.getenv("INTERVIEW_CACHE_TTL", "3600")),
+)
@@ -0,0 +1,196 @@
+import json
+from datetime import datetime
+
+
+def _answer_stats(answer, time_taken):
+    answer = str(answer or "").strip()
+    if not answer:
+        return 0, 0, 0.0
+    try:
+        seconds = round(max(0.0, float(time_taken or 0)), 2)
+    except:
+        seconds = 0.0
+    return 1, len(answer.split()), seconds
+
+
+def record_answer(db, candidate_id, total_questions, question_index, answer, time_taken):
+    """
+    Apply one answer write to the running aggregates. Must run on the same
+    connection / transaction as the answers_json update. A re-answered
+    question replaces its old contribution, so the aggregates always match
+    what a full recompute over answers_json would give.
+    """
+    if db.execute("SELECT 1 FROM interview_summaries WHERE candidate_id=?", (candidate_id,)).fetchone() is None:
+        _backfill_from_answers(db, candidate_id, total_questions)
+
+    answered, words, seconds = _answer_stats(answer, time_taken)
+    old = db.execute(
+        """
+        SELECT answered, word_count, time_taken_seconds
+        FROM interview_question_stats
+        WHERE candidate_id=? AND question_index=?
+        """,
+        (candidate_id, question_index),
+    ).fetchone() or (0, 0, 0.0)
+    now = datetime.utcnow().isoformat()
+
+    db.execute(
+        """
+        INSERT INTO interview_question_stats
+        (candidate_id, question_index, answered, word_count, time_taken_seconds, submitted_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(candidate_id, question_index) DO UPDATE SET
+            answered=excluded.answered,
+            word_count=excluded.word_count,
+            time_taken_seconds=excluded.time_taken_seconds,
+            submitted_at=excluded.submitted_at
+        """,
+        (candidate_id, question_index, answered, words, seconds, now),
+    )
+    db.execute(
+        """
+        INSERT INTO interview_summaries
+        (candidate_id, total_questions, answered_count, total_words, total_time_seconds, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(candidate_id) DO UPDATE SET
+            total_questions=excluded.total_questions,
+            answered_count=answered_count + excluded.answered_count,
+            total_words=total_words + excluded.total_words,
+            total_time_seconds=total_time_seconds + excluded.total_time_seconds,
+            updated_at=excluded.updated_at
+        """,
+        (
+            candidate_id,
+            int(total_questions),
+            answered - int(old[0]),
+            words - int(old[1]),
+            seconds - float(old[2]),
+            now,
+        ),
+    )
+
+
+def _backfill_from_answers(db, candidate_id, total_questions):
+    # First write since the aggregates existed: seed them from the answers
+    # already stored, so the delta below lands on the full totals. If
+    # answers_json already holds this write, its delta comes out as zero.
+    row = db.execute("SELECT answers_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    try:
+        answers = json.loads(row[0]) if row and row[0] else []
+    except ValueError:
+        answers = []
+    if isinstance(answers, list) and answers:
+        rebuild_summary(db, candidate_id, total_questions, answers)
+
+
+def rebuild_summary(db, candidate_id, total_questions, answers):
+    # Backfill for interviews answered before the aggregates existed.
+    db.execute("DELETE FROM interview_question_stats WHERE candidate_id=?", (candidate_id,))
+    db.execute("DELETE FROM interview_summaries WHERE candidate_id=?", (candidate_id,))
+    db.execute(
+        """
+        INSERT INTO interview_summaries
+        (candidate_id, total_questions, answered_count, total_words, total_time_seconds, updated_at)
+        VALUES (?, ?, 0, 0, 0, ?)
+        """,
+        (candidate_id, int(total_questions), datetime.utcnow().isoformat()),
+    )
+    for item in answers or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            question_index = int(item.get("question_index", 0))
+        except:
+            continue
+        record_answer(
+            db,
+            candidate_id,
+            total_questions,
+            question_index,
+            item.get("answer", ""),
+            item.get("time_taken_seconds", 0),
+        )
+
+
+def load_summary(db, candidate_id):
+    row = db.execute(
+        """
+        SELECT total_questions, answered_count, total_words, total_time_seconds, updated_at, completed_at
+        FROM interview_summaries
+        WHERE candidate_id=?
+        """,
+        (candidate_id,),
+    ).fetchone()
+    if not row:
+        return None
+
+    answered_count = int(row[1] or 0)
+    return {
+        "total_questions": int(row[0] or 0),
+        "answered_count": answered_count,
+        "total_words": int(row[2] or 0),
+        "avg_answer_length": round(int(row[2] or 0) / answered_count, 2) if answered_count else 0,
+        "total_time_seconds": round(float(row[3] or 0), 2),
+        "updated_at": row[4],
+        "completed_at": row[5],
+    }
+
+
+def load_question_timings(db, candidate_id):
+    rows = db.execute(
+        """
+        SELECT question_index, answered, word_count, time_taken_seconds, submitted_at
+        FROM interview_question_stats
+        WHERE candidate_id=?
+        ORDER BY question_index
+        """,
+        (candidate_id,),
+    ).fetchall()
+    return [
+        {
+            "question_index": r[0],
+            "answered": bool(r[1]),
+            "word_count": r[2],
+            "time_taken_seconds": r[3],
+            "submitted_at": r[4],
+        }
+        for r in rows
+    ]
+
+
+def communication_score(total_questions, answered_count, avg_answer_length):
+    coverage = answered_count / max(1, total_questions)
+    length_factor = min(1.0, avg_answer_length / 30.0)
+    return int(round(min(10.0, (coverage * 6.0) + (length_factor * 4.0))))
+
+
+def finalize_summary(db, candidate_id, monitoring):
+    """
+    O(1) completion: turns the running aggregates plus monitoring flags into
+    the interview_summary_json payload and stamps completed_at.
+    """
+    aggregates = load_summary(db, candidate_id) or {
+        "total_questions": 0,
+        "answered_count": 0,
+        "avg_answer_length": 0,
+        "total_time_seconds": 0.0,
+    }
+    db.execute(
+        "UPDATE interview_summaries SET completed_at=? WHERE candidate_id=?",
+        (datetime.utcnow().isoformat(), candidate_id),
+    )
+
+    return {
+        "total_questions": aggregates["total_questions"],
+        "answered_count": aggregates["answered_count"],
+        "avg_answer_length": aggregates["avg_answer_length"],
+        "total_time_seconds": aggregates["total_time_seconds"],
+        "tab_switch_count": int(monitoring.get("tab_switch_count", 0)),
+        "camera_granted": bool(monitoring.get("camera_granted", False)),
+        "mic_granted": bool(monitoring.get("mic_granted", False)),
+        "communication_score": communication_score(
+            aggregates["total_questions"],
+            aggregates["answered_count"],
+            aggregates["avg_answer_length"],
+        ),
+    }
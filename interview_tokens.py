@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import time
+from datetime import datetime
+
+TOKEN_VERSION = "v1"
+LEGACY_TOKEN_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$")
+MAX_TOKEN_LENGTH = 256
+
+# How long before / after the scheduled time the link is usable.
+EARLY_ACCESS_SECONDS = int(os.getenv("INTERVIEW_EARLY_MINUTES", "15")) * 60
+WINDOW_SECONDS = int(os.getenv("INTERVIEW_WINDOW_HOURS", "24")) * 3600
+# Used when interview_date cannot be parsed: valid from issue time for this long.
+UNSCHEDULED_VALIDITY_SECONDS = int(os.getenv("INTERVIEW_UNSCHEDULED_DAYS", "30")) * 86400
+ALLOW_LEGACY_TOKENS = os.getenv("INTERVIEW_ALLOW_LEGACY_TOKENS", "1") == "1"
+
+
+def _parse_keys(raw, secret_key):
+    """
+    raw = "k2:new-secret,k1:old-secret" (config INTERVIEW_TOKEN_KEYS)
+    The first key signs new tokens; every listed key is accepted for
+    verification, so rotating is: prepend a new key, drop the old one once
+    its links have expired.
+    """
+    keys = []
+    for part in (raw or "").split(","):
+        kid, sep, secret = part.strip().partition(":")
+        kid = kid.strip()
+        secret = secret.strip()
+        if sep and kid and secret and kid.isalnum():
+            keys.append((kid, secret.encode("utf-8")))
+
+    if not keys:
+        keys.append(("k0", hashlib.sha256(b"interview-token:" + secret_key.encode("utf-8")).digest()))
+    return keys
+
+
+def set_signing_keys(raw, secret_key):
+    """Called by create_app() with INTERVIEW_TOKEN_KEYS and SECRET_KEY from config."""
+    global SIGNING_KEYS, ACTIVE_KEY_ID, _KEYS_BY_ID
+    SIGNING_KEYS = _parse_keys(raw, secret_key)
+    ACTIVE_KEY_ID = SIGNING_KEYS[0][0]
+    _KEYS_BY_ID = dict(SIGNING_KEYS)
+
+
+set_signing_keys("", "supersecretkey")
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    padding = "=" * (-len(text) % 4)
+    return base64.urlsafe_b64decode(text + padding)
+
+
+def _sign(key, signing_input):
+    return hmac.new(key, signing_input.encode("ascii"), hashlib.sha256).digest()
+
+
+def interview_window(interview_date, now=None):
+    now = int(now if now is not None else time.time())
+    try:
+        start = int(datetime.fromisoformat(str(interview_date or "").strip()).timestamp())
+    except ValueError:
+        return now, now + UNSCHEDULED_VALIDITY_SECONDS
+    return start - EARLY_ACCESS_SECONDS, start + WINDOW_SECONDS
+
+
+def issue_interview_token(candidate_id, interview_date, now=None, window=None):
+    # window: explicit (not_before, not_after), e.g. slots.slot_window() for a booked slot.
+    not_before, not_after = window or interview_window(interview_date, now=now)
+    payload = f"{int(candidate_id)}.{not_before}.{not_after}.{secrets.token_hex(4)}"
+    signing_input = f"{TOKEN_VERSION}.{ACTIVE_KEY_ID}.{_b64encode(payload.encode('ascii'))}"
+    signature = _b64encode(_sign(_KEYS_BY_ID[ACTIVE_KEY_ID], signing_input))
+    return f"{signing_input}.{signature}"
+
+
+def verify_interview_token(token, now=None):
+    """
+    Returns (status, claims) without touching the database.
+    status is one of: ok, legacy, malformed, unknown_key, bad_signature,
+    too_early, expired. claims is a dict for ok / too_early / expired.
+    """
+    if not token or len(token) > MAX_TOKEN_LENGTH:
+        return "malformed", None
+
+    if LEGACY_TOKEN_RE.match(token):
+        return ("legacy", None) if ALLOW_LEGACY_TOKENS else ("malformed", None)
+
+    parts = token.split(".")
+    if len(parts) != 4 or parts[0] != TOKEN_VERSION:
+        return "malformed", None
+
+    _version, kid, payload_b64, signature_b64 = parts
+    key = _KEYS_BY_ID.get(kid)
+    if key is None:
+        return "unknown_key", None
+
+    try:
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        return "malformed", None
+
+    expected = _sign(key, f"{TOKEN_VERSION}.{kid}.{payload_b64}")
+    if not hmac.compare_digest(expected, signature):
+        return "bad_signature", None
+
+    try:
+        fields = _b64decode(payload_b64).decode("ascii").split(".")
+        claims = {
+            "candidate_id": int(fields[0]),
+            "not_before": int(fields[1]),
+            "not_after": int(fields[2]),
+            "kid": kid,
+        }
+    except (ValueError, IndexError):
+        return "malformed", None
+
+    now = int(now if now is not None else time.time())
+    if now < claims["not_before"]:
+        return "too_early", claims
+    if now > claims["not_after"]:
+        return "expired", claims
+    return "ok", claims
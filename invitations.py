@@ -0,0 +1,226 @@
+import os
+from datetime import datetime, timedelta
+
+from interview_tokens import issue_interview_token
+from outbox import enqueue_mail
+from reports import mark_report_dirty
+from routes.shared import build_interview_link
+from slots import SLOT_FORMAT, ensure_slot, parse_slot_time, reserve_slot, slot_window
+
+REMINDERS = [
+    ("reminder_24h", timedelta(hours=24), "24 hours"),
+    ("reminder_1h", timedelta(hours=1), "1 hour"),
+]
+BULK_INVITE_MAX = int(os.getenv("BULK_INVITE_MAX", "500"))
+
+
+def _utc_from_local(interview_date):
+    # interview_date is server-local wall time (as entered in the schedule form).
+    try:
+        local = datetime.fromisoformat(str(interview_date).strip())
+    except ValueError:
+        return None
+    return datetime.utcfromtimestamp(local.timestamp())
+
+
+def cancel_reminders(db, candidate_id):
+    """Drops reminders that have not gone out yet (reschedule, completion). The caller commits."""
+    db.execute(
+        f"""
+        DELETE FROM mail_outbox
+        WHERE candidate_id=? AND status='pending'
+          AND kind IN ({", ".join("?" for _ in REMINDERS)})
+        """,
+        [candidate_id] + [kind for kind, _offset, _label in REMINDERS],
+    )
+
+
+def queue_interview_mails(db, candidate_id, to_email, interview_date, interview_link, campaign_id=None):
+    """
+    Queues the invitation plus the T-24h / T-1h reminders that are still in
+    the future, replacing any pending reminders for an earlier schedule.
+    The caller commits and calls wake_outbox().
+    """
+    cancel_reminders(db, candidate_id)
+    enqueue_mail(
+        db,
+        to_email,
+        "Interview scheduled successfully",
+        (
+            "Your interview has been scheduled.\n\n"
+            f"Date and time: {interview_date}\n"
+            f"Interview link: {interview_link}\n"
+        ),
+        kind="invitation",
+        candidate_id=candidate_id,
+        campaign_id=campaign_id,
+    )
+
+    starts_at = _utc_from_local(interview_date)
+    if starts_at is None:
+        return
+    now = datetime.utcnow()
+    for kind, offset, label in REMINDERS:
+        send_at = starts_at - offset
+        if send_at <= now:
+            continue
+        enqueue_mail(
+            db,
+            to_email,
+            f"Reminder: your interview starts in {label}",
+            (
+                f"This is a reminder that your interview starts in {label}.\n\n"
+                f"Date and time: {interview_date}\n"
+                f"Interview link: {interview_link}\n"
+            ),
+            kind=kind,
+            candidate_id=candidate_id,
+            campaign_id=campaign_id,
+            send_after=send_at,
+        )
+
+
+def bulk_invite(db, first_slot, count, slot_minutes=30, per_slot=1, jd_config_id=None, created_by=None):
+    """
+    Schedules up to count shortlisted candidates (best final_score first) into
+    consecutive slots of slot_minutes, per_slot candidates each, and queues
+    their mails, all in one transaction. Slots that do not exist yet are
+    opened with capacity per_slot; slots already partly booked only take
+    what they have left, and the rest roll over into later slots.
+    Returns (campaign_id, assigned).
+    """
+    start = parse_slot_time(first_slot)
+    if start <= datetime.now():
+        raise ValueError("first slot must be in the future")
+    count = max(1, min(BULK_INVITE_MAX, int(count)))
+    slot_minutes = max(1, int(slot_minutes))
+    per_slot = max(1, int(per_slot))
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        params = []
+        jd_filter = ""
+        if jd_config_id is not None:
+            jd_filter = "AND jd_config_id=?"
+            params.append(int(jd_config_id))
+        rows = db.execute(
+            f"""
+            SELECT id, email FROM candidates
+            WHERE status='shortlisted' {jd_filter}
+            ORDER BY COALESCE(final_score, -1) DESC, id
+            LIMIT ?
+            """,
+            params + [count],
+        ).fetchall()
+
+        cur = db.execute(
+            """
+            INSERT INTO invite_campaigns
+            (jd_config_id, created_by, candidate_count, first_slot, slot_minutes, per_slot, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (jd_config_id, created_by, len(rows), start.strftime(SLOT_FORMAT), slot_minutes, per_slot, datetime.utcnow().isoformat()),
+        )
+        campaign_id = cur.lastrowid
+
+        assigned = []
+        slot_start, in_slot = start, 0
+        for candidate_id, email in rows:
+            while True:
+                if in_slot < per_slot:
+                    slot_id = ensure_slot(db, slot_start.strftime(SLOT_FORMAT), slot_minutes, per_slot)
+                    slot = reserve_slot(db, candidate_id, slot_id)
+                    if slot is not None:
+                        in_slot += 1
+                        break
+                slot_start, in_slot = slot_start + timedelta(minutes=slot_minutes), 0
+            interview_date = slot["starts_at"]
+            token = issue_interview_token(candidate_id, interview_date, window=slot_window(slot))
+            link = build_interview_link(token)
+            db.execute(
+                """
+                UPDATE candidates
+                SET interview_date=?, interview_link=?, interview_token=?, interview_started_at=NULL, status='scheduled'
+                WHERE id=?
+                """,
+                (interview_date, link, token, candidate_id),
+            )
+            queue_interview_mails(db, candidate_id, email, interview_date, link, campaign_id=campaign_id)
+            mark_report_dirty(db, candidate_id)
+            assigned.append({"candidate_id": candidate_id, "email": email, "interview_date": interview_date})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return campaign_id, assigned
+
+
+def campaign_report(db, campaign_id):
+    campaign = db.execute(
+        """
+        SELECT id, jd_config_id, created_by, candidate_count, first_slot, slot_minutes, per_slot, created_at
+        FROM invite_campaigns WHERE id=?
+        """,
+        (campaign_id,),
+    ).fetchone()
+    if not campaign:
+        return None
+
+    rows = db.execute(
+        """
+        SELECT o.candidate_id, o.to_email, o.kind, o.status, o.attempts, o.last_error,
+               o.next_attempt_at, o.claimed_at, o.sent_at, c.interview_date
+        FROM mail_outbox o
+        LEFT JOIN candidates c ON c.id = o.candidate_id
+        WHERE o.campaign_id=?
+        ORDER BY o.candidate_id, o.id
+        """,
+        (campaign_id,),
+    ).fetchall()
+
+    recipients = {}
+    counts = {}
+    sent_times = []
+    for candidate_id, email, kind, status, attempts, error, next_at, claimed_at, sent_at, interview_date in rows:
+        entry = recipients.setdefault(
+            candidate_id,
+            {"candidate_id": candidate_id, "email": email, "interview_date": interview_date, "mails": {}},
+        )
+        entry["mails"][kind] = {
+            "status": status,
+            "attempts": attempts,
+            "last_error": error,
+            "scheduled_for": next_at if status == "pending" else None,
+            "sent_at": sent_at,
+        }
+        counts.setdefault(kind, {})
+        counts[kind][status] = counts[kind].get(status, 0) + 1
+        if kind == "invitation" and status == "sent" and sent_at:
+            sent_times.append((claimed_at or sent_at, sent_at))
+
+    throughput = None
+    if sent_times:
+        first = datetime.fromisoformat(min(t[0] for t in sent_times))
+        last = datetime.fromisoformat(max(t[1] for t in sent_times))
+        elapsed = (last - first).total_seconds()
+        throughput = {
+            "sent": len(sent_times),
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(len(sent_times) / elapsed, 2) if elapsed > 0 else None,
+        }
+
+    return {
+        "campaign": {
+            "id": campaign[0],
+            "jd_config_id": campaign[1],
+            "created_by": campaign[2],
+            "candidate_count": campaign[3],
+            "first_slot": campaign[4],
+            "slot_minutes": campaign[5],
+            "per_slot": campaign[6],
+            "created_at": campaign[7],
+        },
+        "counts": counts,
+        "throughput": throughput,
+        "recipients": list(recipients.values()),
+    }
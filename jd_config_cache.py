@@ -0,0 +1,163 @@
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+import database
+
+JD_CONFIG_COLUMNS = """
+    id, COALESCE(title, ''), jd_text, jd_dict_json, skill_weights_json,
+    min_academic_percent, qualify_score, question_count, project_ratio, created_at
+"""
+
+
+@dataclass(frozen=True)
+class JDConfig:
+    id: int
+    title: str
+    jd_text: str
+    jd_dict: dict = field(default_factory=dict)
+    weights: dict = field(default_factory=dict)
+    min_academic_percent: int = 60
+    qualify_score: int = 60
+    question_count: int = 10
+    project_ratio: int = 80
+    created_at: str = None
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            id=row[0],
+            title=row[1] or "",
+            jd_text=row[2] or "",
+            jd_dict=json.loads(row[3] or "{}"),
+            weights=json.loads(row[4] or "{}"),
+            min_academic_percent=int(row[5] or 60),
+            qualify_score=int(row[6] or 60),
+            question_count=int(row[7] or 10),
+            project_ratio=int(row[8] or 80),
+            created_at=row[9],
+        )
+
+    def to_dict(self):
+        # Callers get their own copy, so nothing they do can leak into the cache.
+        return {
+            "id": self.id,
+            "title": self.title,
+            "jd_text": self.jd_text,
+            "jd_dict": copy.deepcopy(self.jd_dict),
+            "weights": copy.deepcopy(self.weights),
+            "min_academic_percent": self.min_academic_percent,
+            "qualify_score": self.qualify_score,
+            "question_count": self.question_count,
+            "project_ratio": self.project_ratio,
+            "created_at": self.created_at,
+        }
+
+
+class JDConfigCache:
+    """
+    Per-process cache of JD configs by id plus a "latest id" pointer.
+
+    JD configs are insert-only (saving a JD adds a row), so a cached config
+    never goes stale. What can change is the set of rows: each lookup reads
+    PRAGMA data_version on a long-lived connection, which moves whenever any
+    other connection (this worker or another process) commits. Only then is
+    the cheap (MAX(id), COUNT(*)) fingerprint of jd_configs re-read, and the
+    cache is dropped if it differs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_key = None
+        self._data_version = None
+        self._fingerprint = None
+        self._by_id = {}
+        self._missing = set()
+        self._latest_id = None
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+        self.invalidations = 0
+
+    def _connection(self):
+        # Reopened after fork (gunicorn preload) or when DB_PATH is switched.
+        key = (os.getpid(), database.DB_PATH)
+        if self._conn is None or self._conn_key != key:
+            self._conn = database.connect(database.DB_PATH, check_same_thread=False)
+            self._conn_key = key
+            self._data_version = None
+            self._fingerprint = None
+            self._reset()
+        return self._conn
+
+    def _reset(self):
+        self._by_id.clear()
+        self._missing.clear()
+        self._latest_id = None
+
+    def _check_version(self, conn):
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        self.version_checks += 1
+        fingerprint = conn.execute("SELECT MAX(id), COUNT(*) FROM jd_configs").fetchone()
+        if fingerprint != self._fingerprint:
+            if self._fingerprint is not None:
+                self.invalidations += 1
+            self._fingerprint = fingerprint
+            self._reset()
+            self._latest_id = fingerprint[0]
+
+    def get(self, jd_id):
+        jd_id = int(jd_id)
+        with self._lock:
+            conn = self._connection()
+            self._check_version(conn)
+            if jd_id in self._by_id:
+                self.hits += 1
+                return self._by_id[jd_id]
+            if jd_id in self._missing:
+                self.hits += 1
+                return None
+
+            self.misses += 1
+            row = conn.execute(f"SELECT {JD_CONFIG_COLUMNS} FROM jd_configs WHERE id=?", (jd_id,)).fetchone()
+            if not row:
+                self._missing.add(jd_id)
+                return None
+            config = JDConfig.from_row(row)
+            self._by_id[jd_id] = config
+            return config
+
+    def latest(self):
+        with self._lock:
+            self._check_version(self._connection())
+            latest_id = self._latest_id
+        if latest_id is None:
+            return None
+        return self.get(latest_id)
+
+    def invalidate(self):
+        """Forces a fingerprint re-read on the next lookup (called after a save)."""
+        with self._lock:
+            self._data_version = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._by_id),
+                "latest_id": self._latest_id,
+                "hits": self.hits,
+                "misses": self.misses,
+                "version_checks": self.version_checks,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+jd_config_cache = JDConfigCache()
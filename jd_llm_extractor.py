@@ -1,7 +1,8 @@
-import requests
 import json
 import re
 
+from metrics import timed_block
+
 class JDKeywordExtractor:
     def __init__(self, model="llama3.2:3b", base_url="http://localhost:11434", timeout=60):
         self.model = model
@@ -60,7 +61,10 @@ JD:
         }
 
         try:
-            r = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
+            import requests
+
+            with timed_block("llm"):
+                r = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
             r.raise_for_status()
             data = r.json()
         except Exception as e:
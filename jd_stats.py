@@ -0,0 +1,106 @@
+import argparse
+
+from database import get_db
+
+SCORE_BUCKETS = 10
+# Statuses in funnel order; each stage also counts candidates that went further.
+FUNNEL_STAGES = ["shortlisted", "scheduled", "interview_completed"]
+
+
+def rebuild_jd_stats(db):
+    """Recomputes jd_stats from candidates and interview_question_stats. The caller commits."""
+    db.execute("DELETE FROM jd_stats")
+    db.execute(
+        """
+        INSERT INTO jd_stats (jd_config_id, stat, count, total)
+        SELECT jd_config_id, 'status:' || COALESCE(status, 'new'), COUNT(*), 0
+        FROM candidates
+        WHERE jd_config_id IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO jd_stats (jd_config_id, stat, count, total)
+        SELECT jd_config_id, 'score:' || MIN(9, MAX(0, CAST(final_score / 10 AS INTEGER))), COUNT(*), 0
+        FROM candidates
+        WHERE jd_config_id IS NOT NULL AND final_score IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO jd_stats (jd_config_id, stat, count, total)
+        SELECT c.jd_config_id, 'answer_time', COUNT(*), COALESCE(SUM(q.time_taken_seconds), 0)
+        FROM interview_question_stats q
+        JOIN candidates c ON c.id = q.candidate_id
+        WHERE q.answered AND c.jd_config_id IS NOT NULL
+        GROUP BY 1
+        """
+    )
+
+
+def empty_jd_stats(jd_config_id):
+    return {
+        "jd_config_id": jd_config_id,
+        "applicants": 0,
+        "status_counts": {},
+        "funnel": {stage: 0 for stage in FUNNEL_STAGES},
+        "score_histogram": [0] * SCORE_BUCKETS,
+        "answered_questions": 0,
+        "avg_time_per_question_seconds": None,
+    }
+
+
+def load_jd_stats(db, jd_config_id=None):
+    """Returns {jd_config_id: stats}; one pass over jd_stats, no candidate rows are read."""
+    sql = "SELECT jd_config_id, stat, count, total FROM jd_stats"
+    params = []
+    if jd_config_id is not None:
+        sql += " WHERE jd_config_id=?"
+        params.append(int(jd_config_id))
+
+    out = {}
+    for jd_id, stat, count, total in db.execute(sql, params).fetchall():
+        stats = out.setdefault(jd_id, empty_jd_stats(jd_id))
+        kind, _, name = stat.partition(":")
+        if kind == "status" and count:
+            stats["status_counts"][name] = count
+            stats["applicants"] += count
+        elif kind == "score":
+            stats["score_histogram"][int(name)] = count
+        elif kind == "answer_time":
+            stats["answered_questions"] = count
+            if count:
+                stats["avg_time_per_question_seconds"] = round(total / count, 1)
+
+    for stats in out.values():
+        reached = 0
+        for stage in reversed(FUNNEL_STAGES):
+            reached += stats["status_counts"].get(stage, 0)
+            stats["funnel"][stage] = reached
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the per-JD funnel and score statistics.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute jd_stats from candidate rows")
+    args = parser.parse_args(argv)
+    from app import apply_config
+
+    apply_config()
+
+    db = get_db()
+    try:
+        if args.rebuild:
+            db.execute("BEGIN IMMEDIATE")
+            rebuild_jd_stats(db)
+            db.commit()
+        for jd_id, stats in sorted(load_jd_stats(db).items()):
+            print(jd_id, stats)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+import argparse
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCK_MARKER = "database is locked"
+SLOT_MINUTES = 5
+SLOT_COUNT = 48
+
+JD_DICT = {
+    "mandatory_programming": ["python", "sql"],
+    "domain_skills": ["flask", "rest api", "machine learning"],
+    "optional_domains": ["docker"],
+    "tools": ["git"],
+    "soft_skills": ["communication"],
+}
+RESUME_LINES = [
+    "Senior software engineer with 5 years of experience.",
+    "Skills: Python, SQL, Flask, REST API, machine learning, Docker, Git.",
+    "Project: developed and deployed a Flask REST API with SQL storage and an ML ranking model.",
+    "Designed, implemented, led and optimized data pipelines; improved latency by 40%.",
+    "Strong communication and mentoring.",
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Latency samples and outcomes per endpoint for one load step."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.throttled = {}
+        self.journeys = {"completed": 0, "rejected": 0, "failed": 0}
+
+    def request(self, session, method, endpoint, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=60, **kwargs)
+        except requests.RequestException:
+            self._add(endpoint, time.perf_counter() - start, error=True)
+            return None
+        elapsed = time.perf_counter() - start
+        if response.status_code == 429:
+            with self._lock:
+                self.throttled[endpoint] = self.throttled.get(endpoint, 0) + 1
+        self._add(endpoint, elapsed, error=response.status_code >= 400 and response.status_code != 429)
+        return response
+
+    def _add(self, endpoint, seconds, error):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if error:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def journey(self, outcome):
+        with self._lock:
+            self.journeys[outcome] += 1
+
+    def summary(self):
+        with self._lock:
+            endpoints = {}
+            all_samples = []
+            for endpoint, samples in sorted(self.samples.items()):
+                ordered = sorted(samples)
+                all_samples.extend(ordered)
+                endpoints[endpoint] = {
+                    "count": len(ordered),
+                    "errors": self.errors.get(endpoint, 0),
+                    "throttled": self.throttled.get(endpoint, 0),
+                    "p50_ms": _ms(percentile(ordered, 50)),
+                    "p95_ms": _ms(percentile(ordered, 95)),
+                    "p99_ms": _ms(percentile(ordered, 99)),
+                    "max_ms": _ms(ordered[-1]),
+                }
+            all_samples.sort()
+            requests_total = len(all_samples)
+            errors_total = sum(self.errors.values())
+            return {
+                "endpoints": endpoints,
+                "requests": requests_total,
+                "errors": errors_total,
+                "error_rate": round(errors_total / requests_total, 4) if requests_total else 0.0,
+                "throttled": sum(self.throttled.values()),
+                "p95_ms": _ms(percentile(all_samples, 95)),
+                "journeys": dict(self.journeys),
+            }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def build_resume():
+    import docx
+
+    doc = docx.Document()
+    for line in RESUME_LINES:
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def setup_jd(base_url, hr_user, hr_password):
+    """
+    Logs in as HR, saves a load-test JD that the generated resume qualifies
+    for and opens interview slots for the run; returns the JD id.
+    """
+    hr = requests.Session()
+    r = hr.post(f"{base_url}/hr/login", data={"username": hr_user, "password": hr_password}, allow_redirects=False)
+    if r.status_code not in (302, 303):
+        raise SystemExit(f"HR login failed ({r.status_code}); pass --hr-user/--hr-password")
+    title = f"loadtest-{uuid.uuid4().hex[:8]}"
+    hr.post(
+        f"{base_url}/hr/dashboard",
+        data={
+            "action": "save",
+            "title": title,
+            "jd_text": " ".join(RESUME_LINES),
+            "jd_dict_json": json.dumps(JD_DICT),
+            "qualify_score": "40",
+            "question_count": "10",
+            "project_ratio": "80",
+            "min_academic_percent": "60",
+        },
+        allow_redirects=False,
+    )
+    # Short slots starting every SLOT_MINUTES keep the earliest open one inside
+    # the early-access window, so every booked link works straight away.
+    # Capacity is effectively unlimited: the run measures the server, not the calendar.
+    hr.post(
+        f"{base_url}/hr/slots",
+        data={
+            "action": "create",
+            "first_start": (datetime.now() + timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M"),
+            "count": str(SLOT_COUNT),
+            "minutes": str(SLOT_MINUTES),
+            "capacity": "100000",
+        },
+        allow_redirects=False,
+    )
+    jds = hr.get(f"{base_url}/hr/api/jd_stats").json()["jds"]
+    ids = [jd["jd_config_id"] for jd in jds if jd.get("title") == title]
+    if not ids:
+        raise SystemExit("could not find the load-test JD after saving it")
+    return ids[0]
+
+
+def candidate_journey(base_url, recorder, jd_id, resume, think_time, monitoring_every, max_questions):
+    """register -> login -> upload -> schedule -> interview -> answers (+ monitoring) -> complete"""
+    s = requests.Session()
+    email = f"load-{uuid.uuid4().hex[:12]}@example.test"
+
+    def pause():
+        time.sleep(random.expovariate(1 / think_time) if think_time > 0 else 0)
+
+    for endpoint, path, form in (
+        ("POST /register", "/register", {"name": "Load Test", "email": email, "password": "load-pass"}),
+        ("POST /login", "/login", {"email": email, "password": "load-pass"}),
+    ):
+        r = recorder.request(s, "POST", endpoint, f"{base_url}{path}", data=form, allow_redirects=False)
+        if r is None or r.status_code >= 400:
+            return recorder.journey("failed")
+
+    r = recorder.request(s, "POST", "POST /candidate/upload", f"{base_url}/candidate/upload",
+                         data={"jd_config_id": str(jd_id)}, files={"resume": (f"{email}.docx", resume)})
+    if r is None or r.status_code >= 400:
+        return recorder.journey("failed")
+    if 'href="/candidate/schedule"' not in r.text:
+        return recorder.journey("rejected")
+
+    pause()
+    r = recorder.request(s, "GET", "GET /candidate/api/slots", f"{base_url}/candidate/api/slots?days=1")
+    days = r.json()["days"] if r is not None and r.status_code == 200 else []
+    if not days:
+        return recorder.journey("failed")
+    r = recorder.request(s, "POST", "POST /candidate/schedule", f"{base_url}/candidate/schedule",
+                         data={"slot_id": str(days[0]["slots"][0]["id"])})
+    match = r is not None and re.search(r"/interview/([A-Za-z0-9._~-]+)", r.text)
+    if not match:
+        return recorder.journey("failed")
+    interview = f"{base_url}/interview/{match.group(1)}"
+
+    r = recorder.request(s, "GET", "GET /interview/<token>", interview)
+    questions = re.search(r"const questions = (.*?);\n", r.text if r is not None else "")
+    if not questions:
+        return recorder.journey("failed")
+    questions = json.loads(questions.group(1))[:max_questions]
+
+    recorder.request(s, "POST", "POST /interview/<token>/monitoring", f"{interview}/monitoring",
+                     json={"camera_granted": True, "mic_granted": True, "tab_switch_count": 0})
+    for idx, question in enumerate(questions):
+        started = time.monotonic()
+        pause()
+        recorder.request(s, "POST", "POST /interview/<token>/save_answer", f"{interview}/save_answer", json={
+            "question_index": idx,
+            "question_text": question,
+            "answer": "I used python and flask with sql to build a rest api, then tuned it with profiling.",
+            "time_taken_seconds": round(time.monotonic() - started, 2),
+        })
+        if monitoring_every and (idx + 1) % monitoring_every == 0:
+            recorder.request(s, "POST", "POST /interview/<token>/monitoring", f"{interview}/monitoring",
+                             json={"camera_granted": True, "mic_granted": True, "tab_switch_count": 0})
+
+    r = recorder.request(s, "POST", "POST /interview/<token>/complete", f"{interview}/complete",
+                         json={"camera_granted": True, "mic_granted": True, "tab_switch_count": 0})
+    recorder.journey("completed" if r is not None and r.status_code == 200 else "failed")
+
+
+def hr_reader(base_url, recorder, stop, think_time, hr_user, hr_password):
+    s = requests.Session()
+    s.post(f"{base_url}/hr/login", data={"username": hr_user, "password": hr_password}, allow_redirects=False)
+    while not stop.is_set():
+        recorder.request(s, "GET", "GET /hr/candidates", f"{base_url}/hr/candidates")
+        recorder.request(s, "GET", "GET /hr/api/candidates", f"{base_url}/hr/api/candidates?page=1")
+        stop.wait(random.expovariate(1 / think_time) if think_time > 0 else 0)
+
+
+def run_step(args, concurrency, jd_id, resume, server_log=None):
+    recorder = Recorder()
+    stop = threading.Event()
+    log_offset = os.path.getsize(server_log) if server_log and os.path.exists(server_log) else 0
+    readers = [
+        threading.Thread(target=hr_reader, args=(args.base_url, recorder, stop, args.hr_think_time, args.hr_user, args.hr_password), daemon=True)
+        for _ in range(args.hr_readers)
+    ]
+    for t in readers:
+        t.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(concurrency):
+            pool.submit(candidate_journey, args.base_url, recorder, jd_id, resume,
+                        args.think_time, args.monitoring_every, args.questions)
+            if args.ramp_seconds:
+                time.sleep(args.ramp_seconds / concurrency)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in readers:
+        t.join()
+
+    result = recorder.summary()
+    result["concurrency"] = concurrency
+    result["seconds"] = round(elapsed, 2)
+    result["requests_per_second"] = round(result["requests"] / elapsed, 2) if elapsed else None
+    if server_log and os.path.exists(server_log):
+        with open(server_log, errors="replace") as f:
+            f.seek(log_offset)
+            result["lock_errors"] = f.read().count(LOCK_MARKER)
+        result["lock_rate"] = round(result["lock_errors"] / result["requests"], 4) if result["requests"] else 0.0
+    result["sustainable"] = (
+        result["error_rate"] <= args.max_error_rate
+        and result["journeys"]["failed"] == 0
+        and (result["p95_ms"] or 0) <= args.p95_slo_ms
+    )
+    return result
+
+
+def print_step(result):
+    locks = f", {result['lock_errors']} lock errors ({result['lock_rate']:.2%})" if "lock_errors" in result else ""
+    print(
+        f"\n== {result['concurrency']} concurrent interviews: {result['seconds']}s, "
+        f"{result['requests']} requests ({result['requests_per_second']}/s), "
+        f"error rate {result['error_rate']:.2%}, {result['throttled']} throttled{locks}, "
+        f"journeys {result['journeys']} -> {'OK' if result['sustainable'] else 'NOT sustainable'}"
+    )
+    print(f"{'endpoint':40} {'count':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, e in result["endpoints"].items():
+        print(
+            f"{endpoint:40} {e['count']:>6} {e['errors']:>5} "
+            f"{e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['max_ms']:>8}"
+        )
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(workdir, workers, worker_class):
+    """Starts gunicorn with gunicorn.conf.py against a fresh database in workdir."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DB_PATH=os.path.join(workdir, "loadtest.db"),
+        UPLOAD_FOLDER=os.path.join(workdir, "uploads"),
+        SHARED_CACHE_PATH=os.path.join(workdir, "cache.db"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        TRACE_LOG_PATH=os.path.join(workdir, "traces.jsonl"),
+        SLOW_QUERY_LOG_PATH=os.path.join(workdir, "slow_queries.jsonl"),
+        BASE_URL=f"http://127.0.0.1:{port}",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_ACCESS_LOG="",
+        SMTP_HOST="",
+    )
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "init-db"], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    log_path = os.path.join(workdir, "server.log")
+    log = open(log_path, "w")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base_url}/login", timeout=1)
+            return proc, base_url, log_path
+        except requests.RequestException:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit(f"server did not start; see {log_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent interview cohorts and report per-endpoint latency."
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start a local gunicorn on a throwaway database")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers with --spawn")
+    parser.add_argument("--worker-class", default="gthread", help="gunicorn worker class with --spawn")
+    parser.add_argument("--steps", default="5,10,25,50", help="concurrent interviews per step, ramped in order")
+    parser.add_argument("--questions", type=int, default=10, help="answers saved per interview (at most)")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds between candidate actions")
+    parser.add_argument("--monitoring-every", type=int, default=3, help="monitoring ping every N answers")
+    parser.add_argument("--ramp-seconds", type=float, default=5.0, help="spread journey starts over this long")
+    parser.add_argument("--hr-readers", type=int, default=2)
+    parser.add_argument("--hr-think-time", type=float, default=3.0)
+    parser.add_argument("--hr-user", default="hr")
+    parser.add_argument("--hr-password", default="hr@123")
+    parser.add_argument("--p95-slo-ms", type=float, default=1000.0, help="step fails if overall p95 exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--keep-going", action="store_true", help="run every step even after one fails")
+    parser.add_argument("--json", help="write all step results to this file")
+    args = parser.parse_args(argv)
+
+    proc = None
+    server_log = None
+    workdir = None
+    if args.spawn:
+        workdir = tempfile.mkdtemp(prefix="interview_bot_load_")
+        proc, args.base_url, server_log = spawn_server(workdir, args.workers, args.worker_class)
+        print(f"started gunicorn at {args.base_url} (data in {workdir})")
+
+    results = []
+    try:
+        jd_id = setup_jd(args.base_url, args.hr_user, args.hr_password)
+        resume = build_resume()
+        for concurrency in [int(x) for x in args.steps.split(",") if x.strip()]:
+            result = run_step(args, concurrency, jd_id, resume, server_log)
+            results.append(result)
+            print_step(result)
+            if not result["sustainable"] and not args.keep_going:
+                break
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    sustainable = [r["concurrency"] for r in results if r["sustainable"]]
+    first_failure = next((r["concurrency"] for r in results if not r["sustainable"]), None)
+    best = max((c for c in sustainable if first_failure is None or c < first_failure), default=None)
+    print(
+        f"\nmax sustainable concurrency: {best if best is not None else 'none of the steps'}"
+        f" (p95 <= {args.p95_slo_ms:.0f} ms, error rate <= {args.max_error_rate:.1%})"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"max_sustainable_concurrency": best, "steps": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
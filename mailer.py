@@ -1,30 +1,102 @@
-import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 
-def send_mail(to_email, subject, body):
-    smtp_host = os.environ.get("SMTP_HOST", "").strip()
-    smtp_port = int(os.environ.get("SMTP_PORT", "587"))
-    smtp_user = os.environ.get("SMTP_USER", "").strip()
-    smtp_password = os.environ.get("SMTP_PASSWORD", "").strip()
-    from_email = os.environ.get("SMTP_FROM", smtp_user).strip()
+# Set from config (SMTP) by create_app().
+_smtp = None
+
+
+def configure_smtp(settings):
+    global _smtp
+    _smtp = dict(settings)
+
+
+def smtp_settings():
+    if _smtp is None:
+        # Used outside the app (scripts): same source as create_app().
+        from config import smtp_from_env
 
-    if not smtp_host or not smtp_user or not smtp_password or not from_email:
+        return smtp_from_env()
+    return dict(_smtp)
+
+
+def smtp_configured(settings=None):
+    settings = settings or smtp_settings()
+    if not settings["host"] or not settings["from_email"]:
         return False
+    # Authentication is optional, but a user without a password is a misconfiguration.
+    return bool(settings["password"]) or not settings["user"]
+
 
+def build_message(from_email, to_email, subject, body):
     msg = MIMEMultipart()
     msg["From"] = from_email
     msg["To"] = to_email
     msg["Subject"] = subject
     msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+class SMTPSession:
+    """
+    One connected (and, if configured, STARTTLS + authenticated) SMTP session
+    reused for many messages. A dropped connection is re-opened once per send.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or smtp_settings()
+        self.server = None
+        self.connects = 0
+
+    def _connect(self):
+        s = self.settings
+        server = smtplib.SMTP(s["host"], s["port"], timeout=s["timeout"])
+        try:
+            if s["starttls"]:
+                server.starttls()
+            if s["user"]:
+                server.login(s["user"], s["password"])
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.connects += 1
+
+    def send(self, to_email, subject, body):
+        msg = build_message(self.settings["from_email"], to_email, subject, body)
+        if self.server is None:
+            self._connect()
+        try:
+            self.server.sendmail(self.settings["from_email"], to_email, msg.as_string())
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            self._connect()
+            self.server.sendmail(self.settings["from_email"], to_email, msg.as_string())
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_mail(to_email, subject, body):
+    settings = smtp_settings()
+    if not smtp_configured(settings):
+        return False
 
     try:
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(from_email, to_email, msg.as_string())
+        with SMTPSession(settings) as session:
+            session.send(to_email, subject, body)
         return True
     except Exception:
         return False
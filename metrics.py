@@ -0,0 +1,371 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; only the gunicorn setup needs the lock
+    fcntl = None
+
+# Each worker writes its counters to <METRICS_DIR>/<pid>.json and /metrics
+# sums every file, so the numbers are correct whichever worker serves the
+# scrape. When a worker exits, gunicorn's child_exit folds its file into
+# dead.json (counters only ever grow); clear the directory when the server
+# starts.
+# Set from config by create_app().
+METRICS_DIR = os.path.join(tempfile.gettempdir(), "interview_bot_metrics")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+NO_ROUTE = "-"
+
+
+class _Histogram:
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        # series value: [per-bucket counts (+Inf last), sum, count]
+        entry = self.series.get(labels)
+        if entry is None:
+            entry = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][idx] += 1
+                break
+        else:
+            entry[0][-1] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def snapshot(self):
+        return {
+            "type": "histogram",
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "buckets": list(self.buckets),
+            "series": [[list(k), v[0], v[1], v[2]] for k, v in self.series.items()],
+        }
+
+
+class _Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.series = {}
+
+    def inc(self, labels, amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def snapshot(self):
+        return {
+            "type": "counter",
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "series": [[list(k), v] for k, v in self.series.items()],
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+        self._last_flush = 0.0
+
+    def histogram(self, name, help_text, labelnames, buckets=LATENCY_BUCKETS):
+        self._metrics[name] = _Histogram(name, help_text, tuple(labelnames), tuple(buckets))
+        return name
+
+    def counter(self, name, help_text, labelnames):
+        self._metrics[name] = _Counter(name, help_text, tuple(labelnames))
+        return name
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            self._metrics[name].observe(tuple(labels), value)
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._metrics[name].inc(tuple(labels), amount)
+
+    def reset(self):
+        """Drops recorded series (after fork, so a child doesn't re-report the parent's counts)."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.series.clear()
+        self._last_flush = 0.0
+
+    def register_collector(self, collector):
+        """
+        collector() -> iterable of (name, help, labelnames, labels, value):
+        cumulative per-process counters. Registering the same collector again
+        (e.g. a second create_app()) is a no-op.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        with self._lock:
+            out = {name: metric.snapshot() for name, metric in self._metrics.items()}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                print(f"[METRICS] collector failed: {e}")
+                continue
+            for name, help_text, labelnames, labels, value in samples:
+                metric = out.setdefault(
+                    name,
+                    {"type": "counter", "help": help_text, "labelnames": list(labelnames), "series": []},
+                )
+                metric["series"].append([list(labels), value])
+        return out
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < METRICS_FLUSH_SECONDS:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[METRICS] flush failed: {e}")
+
+
+registry = MetricsRegistry()
+
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route.", ["route", "method", "status"]
+)
+HTTP_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQLite statements executed per request.", ["route"], QUERY_COUNT_BUCKETS
+)
+HTTP_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQLite per request.", ["route"]
+)
+DB_QUERIES_TOTAL = registry.counter("db_queries_total", "SQLite statements executed.", ["route"])
+DB_SECONDS_TOTAL = registry.counter("db_seconds_total", "Time spent in SQLite.", ["route"])
+FUNCTION_SECONDS = registry.histogram(
+    "function_duration_seconds", "Time spent in expensive helpers.", ["function"]
+)
+
+# [route, queries, seconds] for the request being handled on this thread.
+_request_db = ContextVar("request_db", default=None)
+
+
+def record_db(seconds, statements=1):
+    """Called by database's connection wrapper for every execute/fetch/commit."""
+    current = _request_db.get()
+    if current is not None:
+        current[1] += statements
+        current[2] += seconds
+        route = current[0]
+    else:
+        route = NO_ROUTE
+    if statements:
+        registry.inc(DB_QUERIES_TOTAL, (route,), statements)
+    registry.inc(DB_SECONDS_TOTAL, (route,), seconds)
+
+
+@contextmanager
+def timed_block(function):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(FUNCTION_SECONDS, (function,), time.perf_counter() - start)
+
+
+def timed(function):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with timed_block(function):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(names, values, extra=None):
+    pairs = [f'{n}="{_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def aggregate(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(
+                name,
+                {k: v for k, v in metric.items() if k != "series"} | {"series": {}},
+            )
+            for sample in metric["series"]:
+                key = tuple(sample[0])
+                if metric["type"] == "histogram":
+                    counts, total, count = sample[1], sample[2], sample[3]
+                    entry = target["series"].setdefault(key, [[0] * len(counts), 0.0, 0])
+                    entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                    entry[1] += total
+                    entry[2] += count
+                else:
+                    target["series"][key] = target["series"].get(key, 0) + sample[1]
+    return merged
+
+
+def render_prometheus(merged):
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labelnames"]
+        for labels, value in sorted(metric["series"].items()):
+            if metric["type"] == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric["buckets"]) + [float("inf")], counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_number(float(bound))}"'
+                    lines.append(f"{name}_bucket{_labels_text(names, labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels_text(names, labels)} {_format_number(total)}")
+                lines.append(f"{name}_count{_labels_text(names, labels)} {count}")
+            else:
+                lines.append(f"{name}{_labels_text(names, labels)} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+DEAD_FILE = "dead.json"
+
+
+@contextmanager
+def _dir_lock(exclusive):
+    # Folding a dead worker touches two files; scrapes take the shared lock so
+    # they never see its counts in both (or neither).
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, "metrics.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _to_snapshot(merged):
+    out = {}
+    for name, metric in merged.items():
+        series = []
+        for labels, value in metric["series"].items():
+            if metric["type"] == "histogram":
+                series.append([list(labels), value[0], value[1], value[2]])
+            else:
+                series.append([list(labels), value])
+        out[name] = {k: v for k, v in metric.items() if k != "series"} | {"series": series}
+    return out
+
+
+def mark_process_dead(pid):
+    """
+    Adds an exited worker's counters to dead.json and removes its own file,
+    so the directory does not grow with recycled workers and a reused pid
+    starts from an empty file instead of overwriting the old totals.
+    """
+    path = os.path.join(METRICS_DIR, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    dead_path = os.path.join(METRICS_DIR, DEAD_FILE)
+    with _dir_lock(exclusive=True):
+        snapshots = [s for s in (_read_snapshot(dead_path), _read_snapshot(path)) if s]
+        try:
+            tmp = f"{dead_path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(_to_snapshot(aggregate(snapshots)), f)
+            os.replace(tmp, dead_path)
+            os.remove(path)
+        except OSError as e:
+            print(f"[METRICS] could not fold metrics of worker {pid}: {e}")
+
+
+def collect_all_workers():
+    registry.flush(force=True)
+    with _dir_lock(exclusive=False):
+        snapshots = [_read_snapshot(path) for path in glob.glob(os.path.join(METRICS_DIR, "*.json"))]
+    return aggregate(s for s in snapshots if s)
+
+
+def init_metrics(app):
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        g.metrics_db = [rule, 0, 0.0]
+        g.metrics_db_token = _request_db.set(g.metrics_db)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.pop("metrics_start", None)
+        db_stats = g.pop("metrics_db", None)
+        token = g.pop("metrics_db_token", None)
+        if start is None:
+            return response
+        if token is not None:
+            try:
+                _request_db.reset(token)
+            except ValueError:
+                _request_db.set(None)
+        route = db_stats[0]
+        registry.observe(HTTP_LATENCY, (route, request.method, str(response.status_code)), time.perf_counter() - start)
+        registry.observe(HTTP_DB_QUERIES, (route,), db_stats[1])
+        registry.observe(HTTP_DB_SECONDS, (route,), db_stats[2])
+        registry.flush()
+        return response
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return Response(render_prometheus(collect_all_workers()), mimetype="text/plain; version=0.0.4")
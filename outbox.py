@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+
+from database import get_db
+from mailer import SMTPSession, smtp_configured, smtp_settings
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+OUTBOX_MAX_BACKOFF_SECONDS = 3600
+OUTBOX_POLL_SECONDS = int(os.getenv("OUTBOX_POLL_SECONDS", "15"))
+# Messages per second per sender process (0 = unthrottled), and how many
+# messages one SMTP session carries before it is recycled (relays cap this).
+OUTBOX_SEND_RATE = float(os.getenv("OUTBOX_SEND_RATE", "0"))
+OUTBOX_MESSAGES_PER_CONNECTION = int(os.getenv("OUTBOX_MESSAGES_PER_CONNECTION", "100"))
+# A "sending" claim older than this is assumed to belong to a dead worker.
+CLAIM_TIMEOUT_SECONDS = 300
+
+
+def enqueue_mail(db, to_email, subject, body, kind=None, candidate_id=None, campaign_id=None, send_after=None):
+    """
+    Adds a message to the outbox in the caller's transaction. send_after (a UTC
+    datetime) defers it, e.g. for reminders. The caller commits, then calls wake_outbox().
+    """
+    now = datetime.utcnow().isoformat()
+    cur = db.execute(
+        """
+        INSERT INTO mail_outbox
+        (to_email, subject, body, status, attempts, next_attempt_at, created_at, kind, candidate_id, campaign_id)
+        VALUES (?, ?, ?, 'pending', 0, ?, ?, ?, ?, ?)
+        """,
+        (
+            to_email,
+            subject,
+            body,
+            send_after.isoformat() if send_after else now,
+            now,
+            kind,
+            candidate_id,
+            campaign_id,
+        ),
+    )
+    return cur.lastrowid
+
+
+def _claim_due(db, batch_size):
+    now = datetime.utcnow()
+    stale_before = (now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)).isoformat()
+    rows = db.execute(
+        """
+        SELECT id FROM mail_outbox
+        WHERE (status='pending' AND next_attempt_at <= ?)
+           OR (status='sending' AND claimed_at < ?)
+        ORDER BY next_attempt_at, id
+        LIMIT ?
+        """,
+        (now.isoformat(), stale_before, batch_size),
+    ).fetchall()
+
+    claimed = []
+    for (message_id,) in rows:
+        # Conditional update so two workers never send the same message.
+        cur = db.execute(
+            """
+            UPDATE mail_outbox SET status='sending', claimed_at=?
+            WHERE id=? AND ((status='pending' AND next_attempt_at <= ?)
+                            OR (status='sending' AND claimed_at < ?))
+            """,
+            (now.isoformat(), message_id, now.isoformat(), stale_before),
+        )
+        if cur.rowcount == 1:
+            claimed.append(message_id)
+    db.commit()
+    if not claimed:
+        return []
+    placeholders = ", ".join("?" for _ in claimed)
+    return db.execute(
+        f"SELECT id, to_email, subject, body, attempts FROM mail_outbox WHERE id IN ({placeholders}) ORDER BY id",
+        claimed,
+    ).fetchall()
+
+
+def _mark_sent(db, message_id):
+    db.execute(
+        "UPDATE mail_outbox SET status='sent', sent_at=?, last_error=NULL, attempts=attempts+1 WHERE id=?",
+        (datetime.utcnow().isoformat(), message_id),
+    )
+
+
+def _mark_failed(db, message, error, permanent=False):
+    message_id, to_email, subject, body, attempts = message
+    attempts += 1
+    if permanent or attempts >= OUTBOX_MAX_ATTEMPTS:
+        db.execute(
+            "UPDATE mail_outbox SET status='dead', attempts=?, last_error=? WHERE id=?",
+            (attempts, error, message_id),
+        )
+        print(f"[MAIL_FALLBACK] Could not send mail {message_id} to {to_email} ({error}). Subject: {subject}\n{body}")
+        return
+    delay = min(OUTBOX_MAX_BACKOFF_SECONDS, OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)))
+    db.execute(
+        "UPDATE mail_outbox SET status='pending', attempts=?, last_error=?, next_attempt_at=? WHERE id=?",
+        (attempts, error, (datetime.utcnow() + timedelta(seconds=delay)).isoformat(), message_id),
+    )
+
+
+def send_pending(batch_size=OUTBOX_BATCH_SIZE, settings=None):
+    """Sends every due message over a reused SMTP session. Returns {"sent": n, "failed": n, "connects": n}."""
+    settings = settings or smtp_settings()
+    if OUTBOX_SEND_RATE > 0:
+        # Don't claim more than can be sent well before the claim goes stale.
+        batch_size = max(1, min(batch_size, int(OUTBOX_SEND_RATE * CLAIM_TIMEOUT_SECONDS / 2)))
+    configured = smtp_configured(settings)
+    sent = 0
+    failed = 0
+    session_sent = 0
+    next_send_at = time.monotonic()
+    db = get_db()
+    session = SMTPSession(settings)
+    try:
+        while True:
+            messages = _claim_due(db, batch_size)
+            if not messages:
+                break
+            relay_down = None
+            for message in messages:
+                if not configured:
+                    _mark_failed(db, message, "SMTP not configured", permanent=True)
+                    failed += 1
+                elif relay_down:
+                    _mark_failed(db, message, relay_down)
+                    failed += 1
+                else:
+                    if OUTBOX_SEND_RATE > 0:
+                        delay = next_send_at - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        next_send_at = max(next_send_at, time.monotonic()) + 1.0 / OUTBOX_SEND_RATE
+                    if session_sent >= OUTBOX_MESSAGES_PER_CONNECTION:
+                        session.close()
+                        session_sent = 0
+                    try:
+                        session.send(message[1], message[2], message[3])
+                        _mark_sent(db, message[0])
+                        sent += 1
+                        session_sent += 1
+                    except Exception as e:
+                        failed += 1
+                        if session.server is None:
+                            # Could not (re)connect or log in: back off the rest of the batch
+                            # instead of timing out on each message.
+                            relay_down = f"{type(e).__name__}: {e}"
+                            _mark_failed(db, message, relay_down)
+                        elif isinstance(e, smtplib.SMTPRecipientsRefused):
+                            _mark_failed(db, message, f"recipient refused: {e.recipients}", permanent=True)
+                        elif isinstance(e, smtplib.SMTPResponseException):
+                            # 5xx is a permanent rejection of this message; 4xx is worth retrying.
+                            _mark_failed(db, message, f"{e.smtp_code} {e.smtp_error!r}", permanent=e.smtp_code >= 500)
+                        else:
+                            _mark_failed(db, message, f"{type(e).__name__}: {e}")
+                db.commit()
+            if relay_down:
+                break
+    finally:
+        session.close()
+        db.close()
+    return {"sent": sent, "failed": failed, "connects": session.connects}
+
+
+def outbox_stats(db):
+    counts = dict(db.execute("SELECT status, COUNT(*) FROM mail_outbox GROUP BY status").fetchall())
+    oldest = db.execute("SELECT MIN(created_at) FROM mail_outbox WHERE status IN ('pending', 'sending')").fetchone()[0]
+    return {"counts": counts, "oldest_unsent": oldest}
+
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _worker_loop():
+    while True:
+        _wakeup.wait(OUTBOX_POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            send_pending()
+        except Exception as e:
+            print(f"[OUTBOX] send failed: {e}")
+
+
+def wake_outbox():
+    """Starts this process's sender thread if needed and tells it to flush now."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_worker_loop, name="outbox-sender", daemon=True)
+            _worker.start()
+    _wakeup.set()
+
+
+def reset_after_fork():
+    """Forget the parent's sender thread; the child starts its own with wake_outbox()."""
+    global _wakeup, _worker, _worker_lock
+    _wakeup = threading.Event()
+    _worker = None
+    _worker_lock = threading.Lock()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send queued mail from the outbox.")
+    parser.add_argument("--loop", action="store_true", help="keep polling instead of exiting when the queue is empty")
+    parser.add_argument("--requeue-dead", action="store_true", help="move dead-lettered mail back to pending first")
+    args = parser.parse_args(argv)
+    from app import apply_config
+
+    apply_config()
+
+    if args.requeue_dead:
+        db = get_db()
+        db.execute(
+            "UPDATE mail_outbox SET status='pending', attempts=0, next_attempt_at=? WHERE status='dead'",
+            (datetime.utcnow().isoformat(),),
+        )
+        db.commit()
+        db.close()
+
+    print(json.dumps(send_pending()))
+    if args.loop:
+        wake_outbox()
+        _worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import base64
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+# Nothing in this module touches a request unless PROFILING_ENABLED=1 at
+# startup: init_profiling() registers no hooks and memory_watch() returns the
+# function unchanged.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+# Both set from config by create_app(). The X-Profile header is only honoured
+# when PROFILE_SECRET is set.
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), "interview_bot_profiles")
+PROFILE_SECRET = ""
+PROFILE_HEADER = "X-Profile"
+MEMORY_TOP_N = 15
+
+_ARM_FILE = "armed.json"
+_ARM_RECHECK_SECONDS = 1.0
+
+# cProfile allows one active profiler per process; a request arriving while
+# another is being profiled just runs normally.
+_profile_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_armed = {"checked": 0.0, "state": None}
+
+# List of memory_watch results for the request being profiled on this thread.
+_memory_results = ContextVar("memory_results", default=None)
+
+
+def _sign(expires):
+    key = hashlib.sha256(b"profile:" + PROFILE_SECRET.encode("utf-8")).digest()
+    digest = hmac.new(key, str(expires).encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def issue_profile_token(ttl_seconds=600):
+    """Value for the X-Profile header, valid for ttl_seconds. None when PROFILE_SECRET is unset."""
+    if not PROFILE_SECRET:
+        return None
+    expires = int(time.time()) + int(ttl_seconds)
+    return f"{expires}.{_sign(expires)}"
+
+
+def verify_profile_token(value):
+    if not PROFILE_SECRET or not value:
+        return False
+    expires, _sep, signature = value.strip().partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires)))
+
+
+def arm(minutes, path_prefix=""):
+    """Profiles every request under path_prefix, in every worker, for the next `minutes`."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    state = {"until": time.time() + float(minutes) * 60, "path_prefix": path_prefix.strip()}
+    path = os.path.join(PROFILE_DIR, _ARM_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+    _armed["checked"] = 0.0
+
+
+def disarm():
+    try:
+        os.remove(os.path.join(PROFILE_DIR, _ARM_FILE))
+    except FileNotFoundError:
+        pass
+    _armed["checked"] = 0.0
+
+
+def armed_state():
+    # Re-read at most once a second per worker so the toggle costs nothing per request.
+    now = time.monotonic()
+    if now - _armed["checked"] >= _ARM_RECHECK_SECONDS:
+        _armed["checked"] = now
+        try:
+            with open(os.path.join(PROFILE_DIR, _ARM_FILE)) as f:
+                _armed["state"] = json.load(f)
+        except (OSError, ValueError):
+            _armed["state"] = None
+    state = _armed["state"]
+    if state and state.get("until", 0) > time.time():
+        return state
+    return None
+
+
+def _tracemalloc_acquire():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _tracemalloc_release():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def memory_watch(label):
+    """
+    Snapshots tracemalloc before and after the wrapped call when the current
+    request is being profiled, and records the top allocation growth.
+    """
+
+    def decorator(f):
+        if not PROFILING_ENABLED:
+            return f
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            results = _memory_results.get()
+            if results is None or not tracemalloc.is_tracing():
+                return f(*args, **kwargs)
+            before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                after = tracemalloc.take_snapshot()
+                stats = after.compare_to(before, "lineno")
+                current, peak = tracemalloc.get_traced_memory()
+                results.append(
+                    {
+                        "label": label,
+                        "seconds": round(time.perf_counter() - start, 6),
+                        "size_diff": sum(s.size_diff for s in stats),
+                        "traced_current": current,
+                        "traced_peak": peak,
+                        "top": [
+                            {
+                                "where": str(s.traceback[0]),
+                                "size_diff": s.size_diff,
+                                "count_diff": s.count_diff,
+                            }
+                            for s in stats[:MEMORY_TOP_N]
+                        ],
+                    }
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def _profile_basename(method, rule):
+    route = re.sub(r"[^A-Za-z0-9]+", "_", rule).strip("_") or "root"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{method.lower()}-{route}-{os.getpid()}"
+
+
+def _prune():
+    files = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(".prof"))
+    for name in files[: max(0, len(files) - PROFILE_MAX_FILES)]:
+        for path in (name, name[: -len(".prof")] + ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, path))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".prof"):
+            continue
+        meta = {}
+        try:
+            with open(os.path.join(PROFILE_DIR, name[: -len(".prof")] + ".json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        out.append({"name": name, **meta})
+    return out
+
+
+def profile_path(name):
+    """Absolute path of a stored profile, or None if the name is not one of ours."""
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+\.prof", name or ""):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+def profile_summary(name, sort="cumulative", limit=40):
+    path = profile_path(name)
+    if not path:
+        return None
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def init_profiling(app):
+    if not PROFILING_ENABLED:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        if request.path.startswith("/hr/profiling"):
+            return
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        if verify_profile_token(request.headers.get(PROFILE_HEADER)):
+            trigger = "header"
+        else:
+            state = armed_state()
+            if not state or not request.path.startswith(state.get("path_prefix") or "/"):
+                return
+            trigger = "toggle"
+        if not _profile_lock.acquire(blocking=False):
+            return
+        _tracemalloc_acquire()
+        g.profile = {
+            "profiler": cProfile.Profile(),
+            "memory": [],
+            "rule": rule,
+            "trigger": trigger,
+            "start": time.perf_counter(),
+        }
+        g.profile["memory_token"] = _memory_results.set(g.profile["memory"])
+        g.profile["profiler"].enable()
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return
+        try:
+            profile["profiler"].disable()
+            elapsed = time.perf_counter() - profile["start"]
+            _memory_results.reset(profile["memory_token"])
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            base = os.path.join(PROFILE_DIR, _profile_basename(request.method, profile["rule"]))
+            profile["profiler"].dump_stats(base + ".prof")
+            with open(base + ".json", "w") as f:
+                json.dump(
+                    {
+                        "path": request.path,
+                        "method": request.method,
+                        "route": profile["rule"],
+                        "trigger": profile["trigger"],
+                        "seconds": round(elapsed, 6),
+                        "error": type(exc).__name__ if exc is not None else None,
+                        "pid": os.getpid(),
+                        "created_at": datetime.utcnow().isoformat(),
+                        "memory": profile["memory"],
+                    },
+                    f,
+                )
+            _prune()
+            print(f"[PROFILE] {request.method} {request.path} {elapsed * 1000:.1f}ms -> {base}.prof")
+        except OSError as e:
+            print(f"[PROFILE] could not save profile: {e}")
+        finally:
+            _tracemalloc_release()
+            _profile_lock.release()
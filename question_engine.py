@@ -1,6 +1,11 @@
 import re
 from typing import List
 
+from metrics import timed
+from shared_cache import shared_cache
+
+question_cache = shared_cache.namespace("questions", version=1)
+
 SYSTEM_PROMPT = """You are an experienced technical interviewer.
 
 Generate dynamic and project-specific interview questions based on the candidate's resume and selected JD.
@@ -183,6 +188,8 @@ def _extract_projects_for_questions(resume_text: str) -> List[str]:
     return projects
 
 
+@timed("generate_questions")
+@question_cache.memoize()
 def generate_questions(resume_text, jd_dict, weights, question_count, project_ratio):
     try:
         total_questions = max(1, int(question_count))
@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets. Each rule is (capacity, refill_per_second);
+    a bucket is created per (rule, key) on first use and the least recently
+    used buckets are dropped past max_buckets so scanners cannot grow memory.
+    Per-subject throttle counts are capped the same way.
+    """
+
+    def __init__(self, rules, max_buckets=50000):
+        self.rules = dict(rules)
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = defaultdict(int)
+        self.throttled = OrderedDict()
+        self.throttled_total = 0
+
+    def hit(self, rule, key, subject=None, now=None):
+        """
+        Returns (allowed, retry_after_seconds). subject is what throttled
+        events are counted against (e.g. the candidate id).
+        """
+        capacity, refill_rate = self.rules[rule]
+        now = time.monotonic() if now is None else now
+        bucket_key = (rule, key)
+
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(bucket_key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= 1.0:
+                allowed = True
+                tokens -= 1.0
+                retry_after = 0
+                self.allowed[rule] += 1
+            else:
+                allowed = False
+                retry_after = max(1, int(math.ceil((1.0 - tokens) / refill_rate)))
+                self._count_throttled(subject if subject is not None else key, rule)
+
+            self._buckets[bucket_key] = (tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+        return allowed, retry_after
+
+    def _count_throttled(self, subject, rule):
+        # Caller holds the lock.
+        counts = self.throttled.pop(subject, {})
+        counts[rule] = counts.get(rule, 0) + 1
+        self.throttled[subject] = counts
+        self.throttled_total += 1
+        while len(self.throttled) > self.max_buckets:
+            self.throttled.popitem(last=False)
+
+    def throttled_for(self, subject):
+        with self._lock:
+            return dict(self.throttled.get(subject, {}))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "allowed": dict(self.allowed),
+                "throttled_total": self.throttled_total,
+                "throttled_by_subject": {str(k): dict(v) for k, v in self.throttled.items()},
+            }
+
+
+class Coalescer:
+    """
+    Keeps only the latest payload per key until someone takes it. With
+    on_flush, whatever is still pending flush_seconds after a put is passed
+    to on_flush(key, payload) from a timer thread, so a payload is stored
+    even when no later write comes to take it.
+    """
+
+    def __init__(self, max_keys=50000, on_flush=None, flush_seconds=5.0):
+        self.max_keys = max_keys
+        self.on_flush = on_flush
+        self.flush_seconds = flush_seconds
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer = None
+        self.coalesced = 0
+        self.flushed = 0
+
+    def put(self, key, payload):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._pending[key] = payload
+            self.coalesced += 1
+            while len(self._pending) > self.max_keys:
+                self._pending.popitem(last=False)
+            if self.on_flush is not None and (self._timer is None or not self._timer.is_alive()):
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def take(self, key):
+        with self._lock:
+            return self._pending.pop(key, None)
+
+    def flush(self):
+        with self._lock:
+            pending = list(self._pending.items())
+            self._pending.clear()
+        for key, payload in pending:
+            try:
+                self.on_flush(key, payload)
+                self.flushed += 1
+            except Exception as e:
+                print(f"[COALESCER] flush failed: {e}")
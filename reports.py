@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from cold_storage import with_archived_blobs
+from database import BASE_DIR
+from interview_summary import load_question_timings, load_summary
+from question_engine import generate_questions
+from routes.shared import (
+    _normalize_questions,
+    _parse_json_dict,
+    _parse_json_list,
+    extract_text,
+    get_jd_config_by_id,
+    get_latest_jd_config,
+)
+
+
+# Files that decide the rendered HR candidate view: this module (view-model
+# shape) and the templates. Part of the report ETag, so a deploy that changes
+# them never gets a 304 for markup cached by the previous build.
+_FINGERPRINT_FILES = [
+    os.path.abspath(__file__),
+    os.path.join(BASE_DIR, "templates", "hr_candidate_view.html"),
+    os.path.join(BASE_DIR, "templates", "tables.html"),
+]
+
+
+def _report_fingerprint():
+    digest = hashlib.sha1()
+    for path in _FINGERPRINT_FILES:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(path.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+REPORT_FINGERPRINT = _report_fingerprint()
+
+
+def report_etag(candidate_id, version):
+    return f"report-{REPORT_FINGERPRINT}-{candidate_id}-{version}"
+
+
+def _previous_snapshot(db, candidate_id):
+    row = db.execute(
+        "SELECT version, view_model_json FROM candidate_reports WHERE candidate_id=?",
+        (candidate_id,),
+    ).fetchone()
+    if not row:
+        return 0, {}
+    return int(row[0] or 0), _parse_json_dict(row[1])
+
+
+def build_report(db, candidate_id, resume_text=None):
+    """
+    Assemble the hr_candidate_view view model once and store it with a new
+    version. Generated questions (resume parse + question engine) are carried
+    over from the previous snapshot unless the resume or JD changed.
+    The caller commits.
+    """
+    row = db.execute(
+        """
+        SELECT id, name, email, status, resume_path,
+               jd_config_id, phase1_result_json, questions_json, answers_json,
+               monitoring_json, interview_summary_json, created_at, evaluation_json, archived_at
+        FROM candidates
+        WHERE id=?
+        """,
+        (candidate_id,),
+    ).fetchone()
+    if not row:
+        return None
+
+    blobs = with_archived_blobs(
+        db,
+        candidate_id,
+        row[13],
+        {
+            "phase1_result_json": row[6],
+            "questions_json": row[7],
+            "answers_json": row[8],
+            "monitoring_json": row[9],
+            "interview_summary_json": row[10],
+            "evaluation_json": row[12],
+        },
+    )
+
+    version, previous = _previous_snapshot(db, candidate_id)
+
+    phase1 = {}
+    try:
+        phase1 = json.loads(blobs["phase1_result_json"]) if blobs["phase1_result_json"] else {}
+    except:
+        phase1 = {"raw": blobs["phase1_result_json"]}
+
+    jd_config = None
+    if row[5]:
+        jd_config = get_jd_config_by_id(int(row[5]))
+    if not jd_config:
+        jd_config = get_latest_jd_config()
+
+    resume_path = row[4]
+    source_key = [resume_path, jd_config["id"] if jd_config else None]
+    generated_questions = []
+    if previous.get("generated_source") == source_key and resume_text is None:
+        generated_questions = previous.get("generated_questions", [])
+    elif resume_path and jd_config:
+        if resume_text is None:
+            try:
+                resume_text = extract_text(resume_path)
+            except:
+                resume_text = ""
+        generated_questions = generate_questions(
+            resume_text=resume_text,
+            jd_dict=jd_config.get("jd_dict", {}),
+            weights=jd_config.get("weights", {}),
+            question_count=jd_config.get("question_count", 10),
+            project_ratio=jd_config.get("project_ratio", 80),
+        )
+
+    view_model = {
+        "candidate": {
+            "id": row[0],
+            "name": row[1],
+            "email": row[2],
+            "status": row[3],
+            "resume_path": row[4],
+            "jd_config_id": row[5],
+            "created_at": row[11],
+        },
+        "phase1": phase1,
+        "questions": _normalize_questions(_parse_json_list(blobs["questions_json"])),
+        "generated_questions": generated_questions,
+        "generated_source": source_key,
+        "selected_jd": jd_config,
+        "answers": [a for a in _parse_json_list(blobs["answers_json"]) if isinstance(a, dict)],
+        "monitoring": _parse_json_dict(blobs["monitoring_json"]),
+        "summary": _parse_json_dict(blobs["interview_summary_json"]),
+        "evaluation": _parse_json_dict(blobs["evaluation_json"]),
+        "live_summary": load_summary(db, candidate_id),
+        "question_timings": load_question_timings(db, candidate_id),
+    }
+
+    version += 1
+    db.execute(
+        """
+        INSERT INTO candidate_reports (candidate_id, version, dirty, view_model_json, built_at)
+        VALUES (?, ?, 0, ?, ?)
+        ON CONFLICT(candidate_id) DO UPDATE SET
+            version=excluded.version,
+            dirty=0,
+            view_model_json=excluded.view_model_json,
+            built_at=excluded.built_at
+        """,
+        (candidate_id, version, json.dumps(view_model), datetime.utcnow().isoformat()),
+    )
+    return version, view_model
+
+
+def mark_report_dirty(db, candidate_id):
+    # For high-frequency writes (answers, monitoring): the next HR view rebuilds.
+    db.execute("UPDATE candidate_reports SET dirty=1 WHERE candidate_id=?", (candidate_id,))
+
+
+def refresh_report(db, candidate_id, resume_text=None):
+    try:
+        build_report(db, candidate_id, resume_text=resume_text)
+        db.commit()
+    except Exception as e:
+        print(f"[REPORT] rebuild failed for candidate {candidate_id}: {e}")
+        try:
+            db.rollback()
+            mark_report_dirty(db, candidate_id)
+            db.commit()
+        except Exception:
+            pass
@@ -1,6 +1,8 @@
 # resume_logic.py
 import re
 
+from metrics import timed
+
 # --------- Tunables / Defaults ----------
 # NOTE: HR dashboard will override qualify_score (and optionally min_domain_score) via app.py
 DEFAULT_MIN_DOMAIN_SCORE_FRESHER = 30      # was 60 hard reject → now 30 (demo-friendly)
@@ -178,6 +180,7 @@ def score_jd_domain_match(text: str, jd_dict: dict):
 
 
 # ---------------- RESUME ANALYSIS ----------------
+@timed("resume_analysis")
 def resume_analysis(
     resume_text: str,
     jd_dict: dict,
@@ -1,20 +1,27 @@
 import json
 import os
-import uuid
 
-from flask import Blueprint, current_app, redirect, render_template, request, session
+from flask import Blueprint, current_app, jsonify, redirect, render_template, request, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from candidate_listing import invalidate_counts
+from cold_storage import restore_if_archived
 from database import get_db
+from interview_cache import session_cache
+from interview_tokens import issue_interview_token
+from invitations import cancel_reminders, queue_interview_mails
+from outbox import wake_outbox
+from reports import mark_report_dirty
 from resume_logic import resume_analysis
 from routes.shared import (
     login_required,
     extract_text,
     get_all_jd_configs,
     get_jd_config_by_id,
-    _send_schedule_mail,
     build_interview_link,
 )
+from slots import SLOT_CALENDAR_DAYS, list_slots, release_slot, reserve_slot, slot_calendar, slot_window
+from tracing import span
 
 bp_candidate = Blueprint("candidate", __name__)
 
@@ -44,6 +51,7 @@ def register():
             db.close()
             return f"User already exists / DB error: {e}", 400
         db.close()
+        invalidate_counts()
 
         return redirect("/login")
 
@@ -147,9 +155,11 @@ def candidate_upload():
 
     upload_folder = current_app.config["UPLOAD_FOLDER"]
     path = os.path.join(upload_folder, resume.filename)
-    resume.save(path)
+    with span("save"):
+        resume.save(path)
 
-    resume_text = extract_text(path)
+    with span("extract_text"):
+        resume_text = extract_text(path)
 
     config = get_jd_config_by_id(selected_jd_id)
     if not config:
@@ -158,11 +168,12 @@ def candidate_upload():
     jd_dict = config["jd_dict"]
     qualify_score = int(config.get("qualify_score", 60))
 
-    result = resume_analysis(
-        resume_text,
-        jd_dict,
-        qualify_score=qualify_score,
-    )
+    with span("resume_analysis"):
+        result = resume_analysis(
+            resume_text,
+            jd_dict,
+            qualify_score=qualify_score,
+        )
 
     status = "rejected"
     if result.get("decision") == "Shortlisted":
@@ -170,33 +181,83 @@ def candidate_upload():
 
     email = session["email"]
     db = get_db()
-    db.execute(
-        """
-        UPDATE candidates
-        SET resume_path=?, jd_config_id=?, status=?, phase1_result_json=?, questions_json=?, interview_date=?, interview_link=?, interview_token=?
-        WHERE email=?
-        """,
-        (
-            path,
-            selected_jd_id,
-            status,
-            json.dumps(result),
-            None,
-            None,
-            None,
-            None,
-            email,
-        ),
-    )
-    db.commit()
+    with span("db_write"):
+        candidate_row = db.execute("SELECT id FROM candidates WHERE email=?", (email,)).fetchone()
+        if candidate_row:
+            restore_if_archived(db, candidate_row[0])
+            # A new upload clears the schedule below, so give the slot back and
+            # drop reminders that would carry the dead link.
+            release_slot(db, candidate_row[0])
+            cancel_reminders(db, candidate_row[0])
+        db.execute(
+            """
+            UPDATE candidates
+            SET resume_path=?, jd_config_id=?, status=?, phase1_result_json=?, final_score=?, decision=?, candidate_type=?, questions_json=?, interview_date=?, interview_link=?, interview_token=?, interview_started_at=NULL
+            WHERE email=?
+            """,
+            (
+                path,
+                selected_jd_id,
+                status,
+                json.dumps(result),
+                result.get("final_score"),
+                result.get("decision"),
+                result.get("candidate_type"),
+                None,
+                None,
+                None,
+                None,
+                email,
+            ),
+        )
+        if candidate_row:
+            # Rebuilt (questions included) on the next HR view, not on the candidate's request.
+            mark_report_dirty(db, candidate_row[0])
+        db.commit()
     db.close()
+    invalidate_counts()
 
-    return render_template(
-        "candidate_result.html",
-        result=result,
-        selected_jd=config,
-        qualify_score=qualify_score,
-        can_schedule=status == "shortlisted",
+    with span("render"):
+        return render_template(
+            "candidate_result.html",
+            result=result,
+            selected_jd=config,
+            qualify_score=qualify_score,
+            can_schedule=status == "shortlisted",
+        )
+
+
+def _render_schedule_form(error=None, status=200):
+    db = get_db()
+    days = slot_calendar(list_slots(db, open_only=True))
+    db.close()
+    return render_template("candidate_schedule.html", days=days, error=error), status
+
+
+@bp_candidate.route("/candidate/api/slots")
+@login_required(role="candidate")
+def candidate_slots_api():
+    db = get_db()
+    try:
+        days = min(int(request.args.get("days", SLOT_CALENDAR_DAYS)), 60)
+        slots = list_slots(db, start=request.args.get("from") or None, days=days, open_only=True)
+    except ValueError:
+        return jsonify({"error": "from must be YYYY-MM-DD[THH:MM] and days a number"}), 400
+    finally:
+        db.close()
+    return jsonify(
+        {
+            "days": [
+                {
+                    "date": day["date"],
+                    "slots": [
+                        {"id": s["id"], "starts_at": s["starts_at"], "minutes": s["minutes"], "remaining": s["remaining"]}
+                        for s in day["slots"]
+                    ],
+                }
+                for day in slot_calendar(slots)
+            ]
+        }
     )
 
 
@@ -206,7 +267,7 @@ def candidate_schedule():
     email = session["email"]
     db = get_db()
     row = db.execute(
-        "SELECT id, name, status FROM candidates WHERE email=?",
+        "SELECT id, name, status, interview_token FROM candidates WHERE email=?",
         (email,),
     ).fetchone()
     db.close()
@@ -218,28 +279,51 @@ def candidate_schedule():
         return "Only shortlisted candidates can schedule interviews.", 403
 
     if request.method == "GET":
-        return render_template("candidate_schedule.html")
-
-    interview_date = request.form.get("interview_date", "").strip()
-    if not interview_date:
-        return "Interview date is required", 400
+        return _render_schedule_form()
 
-    interview_token = str(uuid.uuid4())
-    interview_link = build_interview_link(interview_token)
+    slot_id = request.form.get("slot_id", "").strip()
+    if not slot_id.isdigit():
+        return _render_schedule_form("Please pick an interview slot.", 400)
 
     db = get_db()
-    db.execute(
-        """
-        UPDATE candidates
-        SET interview_date=?, interview_link=?, interview_token=?, status=?
-        WHERE email=?
-        """,
-        (interview_date, interview_link, interview_token, "scheduled", email),
-    )
-    db.commit()
-    db.close()
+    # IMMEDIATE takes the write lock up front, so the status check, the
+    # capacity check and the booking cannot interleave with another request.
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        current = db.execute("SELECT status FROM candidates WHERE id=?", (row[0],)).fetchone()
+        if not current or current[0] != "shortlisted":
+            db.rollback()
+            db.close()
+            return "Only shortlisted candidates can schedule interviews.", 403
 
-    _send_schedule_mail(email, interview_date, interview_link)
+        slot = reserve_slot(db, row[0], int(slot_id))
+        if slot is None:
+            db.rollback()
+            db.close()
+            return _render_schedule_form("That slot is no longer available. Please pick another one.", 409)
+
+        interview_date = slot["starts_at"]
+        interview_token = issue_interview_token(row[0], interview_date, window=slot_window(slot))
+        interview_link = build_interview_link(interview_token)
+        db.execute(
+            """
+            UPDATE candidates
+            SET interview_date=?, interview_link=?, interview_token=?, interview_started_at=NULL, status=?
+            WHERE email=?
+            """,
+            (interview_date, interview_link, interview_token, "scheduled", email),
+        )
+        queue_interview_mails(db, row[0], email, interview_date, interview_link)
+        mark_report_dirty(db, row[0])
+        db.commit()
+    except Exception:
+        db.rollback()
+        db.close()
+        raise
+    wake_outbox()
+    db.close()
+    invalidate_counts()
+    session_cache.invalidate(row[3])
 
     return render_template(
         "candidate_schedule_success.html",
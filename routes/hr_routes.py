@@ -1,22 +1,52 @@
 import json
 import os
+from datetime import date
 
-from flask import Blueprint, render_template, request, session, redirect, send_file
+from flask import Blueprint, Response, jsonify, make_response, render_template, request, session, redirect, send_file
 from werkzeug.security import check_password_hash
 
+from candidate_export import stream_export
+from candidate_listing import CANDIDATE_STATUSES, count_candidates, invalidate_counts, jd_leaderboard, list_candidates
 from database import get_db
+from event_bus import bus, sse_stream
+from invitations import BULK_INVITE_MAX, bulk_invite, campaign_report
+from jd_config_cache import jd_config_cache
 from jd_llm_extractor import JDKeywordExtractor
-from question_engine import generate_questions
+from jd_stats import empty_jd_stats, load_jd_stats
+from outbox import wake_outbox
+import profiling
+from profiling import (
+    PROFILE_HEADER,
+    PROFILING_ENABLED,
+    arm,
+    armed_state,
+    disarm,
+    issue_profile_token,
+    list_profiles,
+    memory_watch,
+    profile_path,
+    profile_summary,
+)
+from reports import build_report, report_etag
+from slots import (
+    DEFAULT_SLOT_CAPACITY,
+    DEFAULT_SLOT_MINUTES,
+    SLOT_CALENDAR_DAYS,
+    create_slots,
+    delete_slot,
+    list_slots,
+    peak_concurrency,
+    slot_calendar,
+)
+from slow_query import database_summary, slow_query_report, table_sizes
 from routes.shared import (
     login_required,
     get_latest_jd_config,
     get_all_jd_configs,
     get_jd_config_by_id,
-    extract_text,
-    _normalize_questions,
-    _parse_json_list,
     _parse_json_dict,
 )
+from tracing import TRACE_BUFFER_SIZE, logged_traces, slowest_traces, span
 
 bp_hr = Blueprint("hr", __name__, url_prefix="/hr")
 
@@ -81,7 +111,8 @@ def hr_dashboard():
 
         if action == "extract":
             extractor = JDKeywordExtractor()
-            jd_dict = extractor.extract(jd_text)
+            with span("llm_extract", chars=len(jd_text)):
+                jd_dict = extractor.extract(jd_text)
 
             if not weights:
                 all_skills = []
@@ -136,6 +167,7 @@ def hr_dashboard():
             )
             db.commit()
             db.close()
+            jd_config_cache.invalidate()
 
             return redirect("/hr/dashboard")
 
@@ -152,17 +184,305 @@ def hr_jds():
 @bp_hr.route("/candidates")
 @login_required(role="hr")
 def hr_candidates():
+    return render_template(
+        "hr_candidates.html",
+        jd_rows=get_all_jd_configs(),
+        statuses=CANDIDATE_STATUSES,
+    )
+
+
+# DataTables column index -> sort key (None = not orderable)
+CANDIDATE_TABLE_SORT = ["id", None, None, "status", "final_score", "created_at", None]
+
+
+@bp_hr.route("/api/candidates")
+@login_required(role="hr")
+def hr_candidates_api():
+    """DataTables server-side endpoint; sequential paging passes the previous page's cursor."""
+    args = request.args
+    try:
+        draw = int(args.get("draw", "0"))
+        start = max(0, int(args.get("start", "0")))
+        length = int(args.get("length", "25"))
+        order_column = int(args.get("order[0][column]", "0"))
+    except ValueError:
+        return jsonify({"error": "Invalid paging parameters"}), 400
+
+    sort = CANDIDATE_TABLE_SORT[order_column] if 0 <= order_column < len(CANDIDATE_TABLE_SORT) else None
+    direction = args.get("order[0][dir]", "desc")
+    jd_id = args.get("jd_id", "").strip()
+    jd_config_id = int(jd_id) if jd_id.isdigit() else None
+    status = args.get("status", "").strip()
+    if status not in CANDIDATE_STATUSES:
+        status = None
+
+    db = get_db()
+    rows, next_cursor = list_candidates(
+        db,
+        sort=sort or "id",
+        direction=direction,
+        limit=length,
+        cursor=args.get("cursor") or None,
+        offset=start,
+        jd_config_id=jd_config_id,
+        status=status,
+    )
+    records_total = count_candidates(db)
+    records_filtered = count_candidates(db, jd_config_id, status) if (jd_config_id or status) else records_total
+    db.close()
+
+    return jsonify(
+        {
+            "draw": draw,
+            "recordsTotal": records_total,
+            "recordsFiltered": records_filtered,
+            "next_cursor": next_cursor,
+            "data": [
+                {
+                    "id": r[0],
+                    "name": r[1],
+                    "email": r[2],
+                    "status": r[3],
+                    "final_score": r[4],
+                    "created_at": r[5],
+                }
+                for r in rows
+            ],
+        }
+    )
+
+
+@bp_hr.route("/api/jd/<int:jd_id>/leaderboard")
+@login_required(role="hr")
+def hr_jd_leaderboard(jd_id):
+    limit = request.args.get("limit", "20").strip()
+    db = get_db()
+    rows = jd_leaderboard(db, jd_id, int(limit) if limit.isdigit() else 20)
+    db.close()
+    return jsonify({"jd_config_id": jd_id, "candidates": rows})
+
+
+@bp_hr.route("/api/jd_stats")
+@login_required(role="hr")
+def hr_jd_stats():
+    db = get_db()
+    stats = load_jd_stats(db)
+    db.close()
+    jds = []
+    for row in get_all_jd_configs():
+        item = stats.get(row[0]) or empty_jd_stats(row[0])
+        item["title"] = row[1] or ""
+        jds.append(item)
+    return jsonify({"jds": jds})
+
+
+@bp_hr.route("/invitations/bulk", methods=["GET", "POST"])
+@login_required(role="hr")
+def hr_bulk_invite():
+    jd_rows = get_all_jd_configs()
+    if request.method == "POST":
+        jd_id = request.form.get("jd_id", "").strip()
+        db = get_db()
+        try:
+            campaign_id, _assigned = bulk_invite(
+                db,
+                first_slot=request.form.get("first_slot", ""),
+                count=request.form.get("count", "0"),
+                slot_minutes=request.form.get("slot_minutes", "30"),
+                per_slot=request.form.get("per_slot", "1"),
+                jd_config_id=int(jd_id) if jd_id.isdigit() else None,
+                created_by=session.get("email"),
+            )
+        except ValueError:
+            return render_template(
+                "hr_bulk_invite.html",
+                jd_rows=jd_rows,
+                max_count=BULK_INVITE_MAX,
+                error="Enter a valid first slot, count, slot length and capacity.",
+            ), 400
+        finally:
+            db.close()
+
+        invalidate_counts()
+        wake_outbox()
+        return redirect(f"/hr/invitations/{campaign_id}")
+
+    return render_template("hr_bulk_invite.html", jd_rows=jd_rows, max_count=BULK_INVITE_MAX)
+
+
+@bp_hr.route("/invitations/<int:campaign_id>")
+@login_required(role="hr")
+def hr_invite_campaign(campaign_id):
+    return render_template("hr_invite_campaign.html", campaign_id=campaign_id)
+
+
+@bp_hr.route("/api/invitations/<int:campaign_id>")
+@login_required(role="hr")
+def hr_invite_campaign_status(campaign_id):
+    db = get_db()
+    report = campaign_report(db, campaign_id)
+    db.close()
+    if not report:
+        return jsonify({"error": "campaign not found"}), 404
+    return jsonify(report)
+
+
+@bp_hr.route("/slots", methods=["GET", "POST"])
+@login_required(role="hr")
+def hr_slots():
+    error = None
+    if request.method == "POST":
+        action = request.form.get("action")
+        db = get_db()
+        try:
+            if action == "create":
+                create_slots(
+                    db,
+                    request.form.get("first_start", ""),
+                    request.form.get("count", "1"),
+                    minutes=request.form.get("minutes", str(DEFAULT_SLOT_MINUTES)),
+                    capacity=request.form.get("capacity", str(DEFAULT_SLOT_CAPACITY)),
+                )
+            elif action == "delete":
+                if not delete_slot(db, request.form.get("slot_id", "0")):
+                    error = "Only slots with no bookings can be deleted."
+            db.commit()
+        except ValueError:
+            error = "Enter a valid start time, slot count, length and capacity."
+        finally:
+            db.close()
+        if not error:
+            return redirect("/hr/slots")
+
+    db = get_db()
+    slots = list_slots(db, start=date.today().isoformat(), days=SLOT_CALENDAR_DAYS)
+    db.close()
+    return render_template(
+        "hr_slots.html",
+        days=slot_calendar(slots),
+        peak=peak_concurrency(slots),
+        default_minutes=DEFAULT_SLOT_MINUTES,
+        default_capacity=DEFAULT_SLOT_CAPACITY,
+        calendar_days=SLOT_CALENDAR_DAYS,
+        error=error,
+    ), (400 if error else 200)
+
+
+@bp_hr.route("/api/slots")
+@login_required(role="hr")
+def hr_slots_api():
+    db = get_db()
+    try:
+        days = min(int(request.args.get("days", SLOT_CALENDAR_DAYS)), 366)
+        slots = list_slots(db, start=request.args.get("from") or date.today().isoformat(), days=days)
+    except ValueError:
+        return jsonify({"error": "from must be YYYY-MM-DD[THH:MM] and days a number"}), 400
+    finally:
+        db.close()
+    return jsonify({"peak_concurrency": peak_concurrency(slots), "days": slot_calendar(slots)})
+
+
+@bp_hr.route("/traces")
+@login_required(role="hr")
+def hr_traces():
+    name = request.args.get("name", "").strip() or None
+    # ?source=log reads the JSONL sink, which every worker appends to; the
+    # default ring buffer only holds this worker's traces.
+    source = "log" if request.args.get("source") == "log" else "buffer"
+    try:
+        limit = max(1, min(TRACE_BUFFER_SIZE, int(request.args.get("limit", "50"))))
+    except ValueError:
+        limit = 50
+    traces = logged_traces(limit, name) if source == "log" else slowest_traces(limit, name)
+    if request.args.get("format") == "json":
+        return jsonify({"source": source, "traces": traces})
+    return render_template("hr_traces.html", traces=traces, source=source, name=name or "", limit=limit)
+
+
+@bp_hr.route("/db")
+@login_required(role="hr")
+def hr_db():
     db = get_db()
-    rows = db.execute(
-        """
-        SELECT id, name, email, status, created_at
-        FROM candidates
-        ORDER BY id DESC
-        """
-    ).fetchall()
+    summary = database_summary(db)
+    tables = table_sizes(db)
     db.close()
+    queries = slow_query_report()
+    if request.args.get("format") == "json":
+        return jsonify({"summary": summary, "tables": tables, "slow_queries": queries})
+    return render_template("hr_db.html", summary=summary, tables=tables, queries=queries)
+
+
+@bp_hr.route("/profiling", methods=["GET", "POST"])
+@login_required(role="hr")
+def hr_profiling():
+    token = None
+    if PROFILING_ENABLED and request.method == "POST":
+        action = request.form.get("action")
+        if action == "arm":
+            try:
+                minutes = max(0.1, min(60.0, float(request.form.get("minutes", "5"))))
+            except ValueError:
+                minutes = 5.0
+            arm(minutes, request.form.get("path_prefix", ""))
+        elif action == "disarm":
+            disarm()
+        elif action == "token":
+            token = issue_profile_token()
+        if action != "token":
+            return redirect("/hr/profiling")
+    return render_template(
+        "hr_profiling.html",
+        enabled=PROFILING_ENABLED,
+        armed=armed_state() if PROFILING_ENABLED else None,
+        profile_dir=profiling.PROFILE_DIR,
+        header=PROFILE_HEADER,
+        token=token,
+        profiles=list_profiles(),
+    )
+
 
-    return render_template("hr_candidates.html", rows=rows)
+@bp_hr.route("/profiling/<name>")
+@login_required(role="hr")
+def hr_profile_view(name):
+    sort = request.args.get("sort", "cumulative")
+    if sort not in ("cumulative", "tottime", "calls"):
+        sort = "cumulative"
+    summary = profile_summary(name, sort=sort)
+    if summary is None:
+        return "Profile not found", 404
+    return Response(summary, mimetype="text/plain")
+
+
+@bp_hr.route("/profiling/<name>/download")
+@login_required(role="hr")
+def hr_profile_download(name):
+    path = profile_path(name)
+    if not path:
+        return "Profile not found", 404
+    return send_file(path, as_attachment=True, download_name=name)
+
+
+@bp_hr.route("/export/candidates")
+@login_required(role="hr")
+def hr_export_candidates():
+    fmt = request.args.get("format", "csv").strip().lower()
+    if fmt not in ("csv", "jsonl"):
+        return "format must be csv or jsonl", 400
+    use_gzip = request.args.get("gzip", "") in ("1", "true", "yes")
+    jd_id = request.args.get("jd_id", "").strip()
+    status = request.args.get("status", "").strip()
+    if status and status not in CANDIDATE_STATUSES:
+        return "Invalid status", 400
+
+    filename = f"candidates.{fmt}" + (".gz" if use_gzip else "")
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if use_gzip:
+        mimetype = "application/gzip"
+    return Response(
+        stream_export(fmt, use_gzip, int(jd_id) if jd_id.isdigit() else None, status or None),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}", "X-Accel-Buffering": "no"},
+    )
 
 
 @bp_hr.route("/candidate/<int:candidate_id>/resume")
@@ -189,73 +509,67 @@ def hr_candidate_resume(candidate_id):
 
 @bp_hr.route("/candidate/<int:candidate_id>")
 @login_required(role="hr")
+@memory_watch("hr_candidate_view")
 def hr_candidate_view(candidate_id):
     db = get_db()
     row = db.execute(
-        """
-        SELECT id, name, email, status, resume_path,
-               jd_config_id, phase1_result_json, questions_json, answers_json,
-               monitoring_json, interview_summary_json, created_at
-        FROM candidates
-        WHERE id=?
-        """,
+        "SELECT version, dirty, view_model_json FROM candidate_reports WHERE candidate_id=?",
         (candidate_id,),
     ).fetchone()
+
+    if row and not row[1]:
+        version = int(row[0])
+        etag = report_etag(candidate_id, version)
+        if request.if_none_match.contains(etag):
+            db.close()
+            return _report_response("", etag, 304)
+        view_model = _parse_json_dict(row[2])
+    else:
+        built = build_report(db, candidate_id)
+        if not built:
+            db.close()
+            return "Candidate not found", 404
+        db.commit()
+        version, view_model = built
+        etag = report_etag(candidate_id, version)
     db.close()
 
-    if not row:
-        return "Candidate not found", 404
+    view_model.pop("generated_source", None)
+    return _report_response(render_template("hr_candidate_view.html", **view_model), etag, 200)
 
-    phase1 = {}
-    try:
-        phase1 = json.loads(row[6]) if row[6] else {}
-    except:
-        phase1 = {"raw": row[6]}
-
-    questions = _normalize_questions(_parse_json_list(row[7]))
-    answers = [a for a in _parse_json_list(row[8]) if isinstance(a, dict)]
-    monitoring = _parse_json_dict(row[9])
-    summary = _parse_json_dict(row[10])
-
-    jd_config = None
-    if row[5]:
-        jd_config = get_jd_config_by_id(int(row[5]))
-    if not jd_config:
-        jd_config = get_latest_jd_config()
-
-    generated_questions = []
-    resume_path = row[4]
-    if resume_path and jd_config:
-        try:
-            resume_text = extract_text(resume_path)
-        except:
-            resume_text = ""
-        generated_questions = generate_questions(
-            resume_text=resume_text,
-            jd_dict=jd_config.get("jd_dict", {}),
-            weights=jd_config.get("weights", {}),
-            question_count=jd_config.get("question_count", 10),
-            project_ratio=jd_config.get("project_ratio", 80),
-        )
 
-    candidate = {
-        "id": row[0],
-        "name": row[1],
-        "email": row[2],
-        "status": row[3],
-        "resume_path": row[4],
-        "jd_config_id": row[5],
-        "created_at": row[11],
-    }
+def _report_response(body, etag, status):
+    response = make_response(body, status)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
-    return render_template(
-        "hr_candidate_view.html",
-        candidate=candidate,
-        phase1=phase1,
-        questions=questions,
-        generated_questions=generated_questions,
-        selected_jd=jd_config,
-        answers=answers,
-        monitoring=monitoring,
-        summary=summary,
+
+def _event_stream_response(topic):
+    sub = bus.subscribe(topic)
+    return Response(
+        sse_stream(sub),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@bp_hr.route("/candidate/<int:candidate_id>/events")
+@login_required(role="hr")
+def hr_candidate_events(candidate_id):
+    return _event_stream_response(f"candidate:{candidate_id}")
+
+
+@bp_hr.route("/jd/<int:jd_id>/events")
+@login_required(role="hr")
+def hr_jd_events(jd_id):
+    return _event_stream_response(f"jd:{jd_id}")
+
+
+@bp_hr.route("/jd/<int:jd_id>/live")
+@login_required(role="hr")
+def hr_jd_live(jd_id):
+    config = get_jd_config_by_id(jd_id)
+    if not config:
+        return "JD config not found", 404
+    return render_template("hr_jd_live.html", jd=config)
@@ -1,10 +1,21 @@
 import json
+import time
 from datetime import datetime
 
-from flask import Blueprint, jsonify, render_template, request
+from flask import Blueprint, g, jsonify, render_template, request
 
+from candidate_listing import invalidate_counts
+from cold_storage import restore_candidate, restore_if_archived, with_archived_blobs
 from database import get_db
+from evaluation_engine import schedule_evaluation
+from event_bus import publish_interview_event
+from interview_cache import session_cache
+from interview_summary import finalize_summary, rebuild_summary, record_answer
+from interview_tokens import EARLY_ACCESS_SECONDS, WINDOW_SECONDS, verify_interview_token
+from invitations import cancel_reminders
 from question_engine import generate_questions
+from rate_limit import Coalescer, TokenBucketLimiter
+from reports import mark_report_dirty
 from routes.shared import (
     _fallback_questions_from_jd,
     _normalize_questions,
@@ -14,65 +25,256 @@ from routes.shared import (
     get_latest_jd_config,
     get_jd_config_by_id,
 )
+from tracing import span
 
 bp_interview = Blueprint("interview", __name__, url_prefix="/interview")
 
+MAX_BATCH_ANSWERS = 200
+
+# (burst capacity, refill per second) per token + client IP
+interview_limiter = TokenBucketLimiter(
+    {
+        "answers": (10, 1.0),
+        "monitoring": (5, 0.2),
+        "complete": (3, 0.1),
+    }
+)
+RATE_LIMITED_ENDPOINTS = {
+    "interview.interview_save_answer": "answers",
+    "interview.interview_save_answers_batch": "answers",
+    "interview.interview_monitoring": "monitoring",
+    "interview.interview_complete": "complete",
+}
+
+
+def _started_in_window(claims, token):
+    """
+    The window only gates starting an interview: one whose page was opened
+    in time can keep saving, reloading and complete for up to
+    WINDOW_SECONDS after the link closed. Only expired links get here, so
+    in-window requests still never touch SQLite for this check.
+    """
+    if time.time() > claims["not_after"] + WINDOW_SECONDS:
+        return False
+    db = get_db()
+    row = db.execute(
+        "SELECT interview_started_at FROM candidates WHERE id=? AND interview_token=?",
+        (claims["candidate_id"], token),
+    ).fetchone()
+    db.close()
+    return bool(row and row[0])
+
+
+@bp_interview.before_request
+def _verify_interview_token():
+    # Signature and window checks are pure CPU; bogus or stale links never reach SQLite.
+    token = (request.view_args or {}).get("token")
+    status, claims = verify_interview_token(token)
+    g.token_claims = claims
+    if status in ("ok", "legacy"):
+        return None
+
+    is_page = request.method == "GET"
+    if status == "too_early":
+        starts_at = datetime.fromtimestamp(claims["not_before"] + EARLY_ACCESS_SECONDS).strftime("%Y-%m-%d %H:%M")
+        if is_page:
+            return render_template("too_early.html", interview_date=starts_at), 403
+        return jsonify({"ok": False, "error": "Interview not started", "starts_at": starts_at}), 403
+
+    if status == "expired" and _started_in_window(claims, token):
+        return None
+
+    if status == "expired":
+        # Links booked into a slot expire at the end of the slot (plus grace),
+        # which keeps late joiners from piling onto the next slot's capacity.
+        ends_at = datetime.fromtimestamp(claims["not_after"]).strftime("%Y-%m-%d %H:%M")
+        if is_page:
+            return render_template("too_early.html", ended=True, ends_at=ends_at), 410
+        return jsonify({"ok": False, "error": "Interview link expired", "ends_at": ends_at}), 410
+
+    if is_page:
+        return "Invalid interview link", 404
+    return jsonify({"ok": False, "error": "Invalid token"}), 404
+
+
+@bp_interview.before_request
+def _rate_limit_interview_posts():
+    rule = RATE_LIMITED_ENDPOINTS.get(request.endpoint)
+    if request.method != "POST" or not rule:
+        return None
+
+    token = request.view_args["token"]
+    claims = g.get("token_claims")
+    subject = claims["candidate_id"] if claims else token
+    allowed, retry_after = interview_limiter.hit(rule, (token, request.remote_addr), subject=subject)
+    if allowed:
+        return None
+
+    if rule == "monitoring":
+        # Pings carry cumulative state, so keep the newest and fold it into the next accepted write.
+        payload = request.get_json(silent=True) or {}
+        monitoring_coalescer.put(token, _merge_monitoring_payload(monitoring_coalescer.take(token), payload))
+        return jsonify({"ok": True, "coalesced": True}), 202
+
+    response = jsonify({"ok": False, "error": "Too many requests", "retry_after": retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def _merge_monitoring_payload(pending, payload):
+    if not pending:
+        return dict(payload)
+    merged = dict(pending)
+    merged.update(payload)
+    try:
+        merged["tab_switch_count"] = max(
+            int(pending.get("tab_switch_count", 0)),
+            int(payload.get("tab_switch_count", 0)),
+        )
+    except:
+        pass
+    return merged
+
+
+def _generate_interview_questions(jd_config_id, resume_path):
+    config = get_jd_config_by_id(int(jd_config_id)) if jd_config_id else None
+    if not config:
+        config = get_latest_jd_config() or {}
+    resume_text = ""
+    if resume_path:
+        try:
+            resume_text = extract_text(resume_path)
+        except:
+            resume_text = ""
+
+    questions = generate_questions(
+        resume_text=resume_text,
+        jd_dict=config.get("jd_dict", {}),
+        weights=config.get("weights", {}),
+        question_count=config.get("question_count", 10),
+        project_ratio=config.get("project_ratio", 80),
+    )
+    if not questions:
+        questions = _fallback_questions_from_jd(config.get("jd_dict", {}))
+    return questions
+
+
+def _load_interview_session(token):
+    cached = session_cache.get(token)
+    if cached is not None:
+        return cached
 
-@bp_interview.route("/<token>")
-def interview(token):
     db = get_db()
     row = db.execute(
         """
-        SELECT id, name, interview_date, questions_json, answers_json, monitoring_json, jd_config_id, resume_path
+        SELECT id, name, interview_date, questions_json, jd_config_id, resume_path, archived_at
         FROM candidates
         WHERE interview_token=?
         """,
         (token,),
     ).fetchone()
+
+    if not row:
+        db.close()
+        return None
+
+    claims = g.get("token_claims")
+    if claims and claims.get("candidate_id") != row[0]:
+        db.close()
+        return None
+
+    questions_json = row[3]
+    if row[6]:
+        # The interview is being written to again: bring its blobs back to the hot table.
+        db.execute("BEGIN IMMEDIATE")
+        restore_candidate(db, row[0])
+        db.commit()
+        questions_json = db.execute("SELECT questions_json FROM candidates WHERE id=?", (row[0],)).fetchone()[0]
+
+    questions = _normalize_questions(_parse_json_list(questions_json))
+    if not questions:
+        # Persist the generated set so other workers and completion never regenerate it.
+        with span("generate_questions"):
+            questions = _generate_interview_questions(row[4], row[5])
+        cur = db.execute(
+            "UPDATE candidates SET questions_json=? WHERE id=? AND questions_json IS NULL",
+            (json.dumps(questions), row[0]),
+        )
+        if cur.rowcount:
+            mark_report_dirty(db, row[0])
+        db.commit()
     db.close()
 
+    interview_session = {
+        "candidate_id": row[0],
+        "name": row[1],
+        "interview_date": row[2],
+        "questions": questions,
+        "jd_config_id": row[4],
+    }
+    session_cache.set(token, interview_session)
+    return interview_session
+
+
+@bp_interview.route("/<token>")
+def interview(token):
+    with span("load_session"):
+        interview_session = _load_interview_session(token)
+    if not interview_session:
+        return "Invalid interview link", 404
+
+    with span("db_read"):
+        db = get_db()
+        row = _select_live(
+            db,
+            "answers_json, monitoring_json, COALESCE(answers_seq, 0), interview_started_at",
+            interview_session["candidate_id"],
+            token,
+        )
+        if row and not row[3]:
+            db.execute(
+                "UPDATE candidates SET interview_started_at=? WHERE id=? AND interview_started_at IS NULL",
+                (datetime.utcnow().isoformat(), interview_session["candidate_id"]),
+            )
+        db.commit()
+        db.close()
+
     if not row:
+        session_cache.invalidate(token)
         return "Invalid interview link", 404
 
-    questions = _normalize_questions(_parse_json_list(row[3]))
-    if not questions:
-        config = get_jd_config_by_id(int(row[6])) if row[6] else None
-        if not config:
-            config = get_latest_jd_config() or {}
-        resume_text = ""
-        if row[7]:
-            try:
-                resume_text = extract_text(row[7])
-            except:
-                resume_text = ""
-
-        questions = generate_questions(
-            resume_text=resume_text,
-            jd_dict=config.get("jd_dict", {}),
-            weights=config.get("weights", {}),
-            question_count=config.get("question_count", 10),
-            project_ratio=config.get("project_ratio", 80),
+    existing_answers = _parse_json_list(row[0])
+    monitoring = _parse_json_dict(row[1])
+
+    with span("render"):
+        return render_template(
+            "interview_start.html",
+            token=token,
+            name=interview_session["name"],
+            interview_date=interview_session["interview_date"],
+            questions=interview_session["questions"],
+            existing_answers=existing_answers,
+            monitoring=monitoring,
+            acked_seq=int(row[2]),
         )
-        if not questions:
-            questions = _fallback_questions_from_jd(config.get("jd_dict", {}))
-
-    existing_answers = _parse_json_list(row[4])
-    monitoring = _parse_json_dict(row[5])
-
-    return render_template(
-        "interview_start.html",
-        token=token,
-        name=row[1],
-        interview_date=row[2],
-        questions=questions,
-        existing_answers=existing_answers,
-        monitoring=monitoring,
-    )
 
 
-@bp_interview.route("/<token>/save_answer", methods=["POST"])
-def interview_save_answer(token):
-    payload = request.get_json(silent=True) or {}
+def _select_live(db, columns, candidate_id, token):
+    """
+    Reads columns for a write, first moving archived blobs back to the hot
+    table. A session-cache hit skips the restore in _load_interview_session,
+    so every interview write reads through here. The caller commits.
+    """
+    sql = f"SELECT {columns}, archived_at FROM candidates WHERE id=? AND interview_token=?"
+    row = db.execute(sql, (candidate_id, token)).fetchone()
+    if row and row[-1]:
+        restore_candidate(db, candidate_id)
+        row = db.execute(sql, (candidate_id, token)).fetchone()
+    return row[:-1] if row else None
+
+
+def _parse_answer_payload(payload):
     question_index = int(payload.get("question_index", 0))
     answer = str(payload.get("answer", "")).strip()
     question_text = str(payload.get("question_text", "")).strip()
@@ -80,17 +282,10 @@ def interview_save_answer(token):
         time_taken = float(payload.get("time_taken_seconds", 0))
     except:
         time_taken = 0
+    return question_index, question_text, answer, time_taken
 
-    db = get_db()
-    row = db.execute(
-        "SELECT id, answers_json FROM candidates WHERE interview_token=?",
-        (token,),
-    ).fetchone()
-    if not row:
-        db.close()
-        return jsonify({"ok": False, "error": "Invalid token"}), 404
 
-    answers = _parse_json_list(row[1])
+def _upsert_answer(answers, question_index, question_text, answer, time_taken):
     updated = False
     for item in answers:
         if isinstance(item, dict) and int(item.get("question_index", -1)) == question_index:
@@ -112,139 +307,256 @@ def interview_save_answer(token):
             }
         )
 
-    answers = sorted(
+    return sorted(
         [a for a in answers if isinstance(a, dict)],
         key=lambda x: int(x.get("question_index", 0)),
     )
 
-    db.execute(
-        "UPDATE candidates SET answers_json=? WHERE id=?",
-        (json.dumps(answers), row[0]),
-    )
-    db.commit()
-    db.close()
+
+@bp_interview.route("/<token>/save_answer", methods=["POST"])
+def interview_save_answer(token):
+    payload = request.get_json(silent=True) or {}
+    question_index, question_text, answer, time_taken = _parse_answer_payload(payload)
+
+    with span("load_session"):
+        interview_session = _load_interview_session(token)
+    if not interview_session:
+        return jsonify({"ok": False, "error": "Invalid token"}), 404
+    candidate_id = interview_session["candidate_id"]
+
+    with span("db_write"):
+        db = get_db()
+        db.execute("BEGIN IMMEDIATE")
+        row = _select_live(db, "answers_json", candidate_id, token)
+        if not row:
+            db.rollback()
+            db.close()
+            session_cache.invalidate(token)
+            return jsonify({"ok": False, "error": "Invalid token"}), 404
+
+        answers = _upsert_answer(_parse_json_list(row[0]), question_index, question_text, answer, time_taken)
+
+        db.execute(
+            "UPDATE candidates SET answers_json=? WHERE id=?",
+            (json.dumps(answers), candidate_id),
+        )
+        record_answer(db, candidate_id, len(interview_session["questions"]), question_index, answer, time_taken)
+        mark_report_dirty(db, candidate_id)
+        db.commit()
+        db.close()
+    with span("publish"):
+        publish_interview_event(
+            candidate_id,
+            interview_session["jd_config_id"],
+            "answer_saved",
+            {"question_indexes": [question_index], "saved_count": len(answers)},
+        )
     return jsonify({"ok": True, "saved_count": len(answers)})
 
 
-@bp_interview.route("/<token>/monitoring", methods=["POST"])
-def interview_monitoring(token):
+@bp_interview.route("/<token>/answers/batch", methods=["POST"])
+def interview_save_answers_batch(token):
+    """
+    Body: {"answers": [{"seq": 1, "question_index": 0, "answer": "...", ...}, ...]}
+    Deltas are applied in seq order inside one transaction; any seq at or
+    below the stored answers_seq was already applied and is skipped, so a
+    client can resend its whole queue after a dropped response.
+    """
     payload = request.get_json(silent=True) or {}
-    db = get_db()
-    row = db.execute(
-        "SELECT id, monitoring_json FROM candidates WHERE interview_token=?",
-        (token,),
-    ).fetchone()
-    if not row:
-        db.close()
+    deltas = payload.get("answers")
+    if not isinstance(deltas, list) or len(deltas) > MAX_BATCH_ANSWERS:
+        return jsonify({"ok": False, "error": f"answers must be a list of at most {MAX_BATCH_ANSWERS} items"}), 400
+
+    parsed = []
+    for item in deltas:
+        if not isinstance(item, dict):
+            return jsonify({"ok": False, "error": "Invalid answer item"}), 400
+        try:
+            seq = int(item.get("seq"))
+            parsed.append((seq,) + _parse_answer_payload(item))
+        except:
+            return jsonify({"ok": False, "error": "Invalid answer item"}), 400
+    parsed.sort(key=lambda x: x[0])
+
+    with span("load_session"):
+        interview_session = _load_interview_session(token)
+    if not interview_session:
         return jsonify({"ok": False, "error": "Invalid token"}), 404
+    candidate_id = interview_session["candidate_id"]
+
+    with span("db_write"):
+        db = get_db()
+        db.execute("BEGIN IMMEDIATE")
+        row = _select_live(db, "answers_json, COALESCE(answers_seq, 0)", candidate_id, token)
+        if not row:
+            db.rollback()
+            db.close()
+            session_cache.invalidate(token)
+            return jsonify({"ok": False, "error": "Invalid token"}), 404
+
+        answers = _parse_json_list(row[0])
+        acked_seq = int(row[1])
+        total_questions = len(interview_session["questions"])
+        applied_indexes = []
+        for seq, question_index, question_text, answer, time_taken in parsed:
+            if seq <= acked_seq:
+                continue
+            answers = _upsert_answer(answers, question_index, question_text, answer, time_taken)
+            record_answer(db, candidate_id, total_questions, question_index, answer, time_taken)
+            acked_seq = seq
+            applied_indexes.append(question_index)
+        applied = len(applied_indexes)
+
+        if applied:
+            db.execute(
+                "UPDATE candidates SET answers_json=?, answers_seq=? WHERE id=?",
+                (json.dumps(answers), acked_seq, candidate_id),
+            )
+            mark_report_dirty(db, candidate_id)
+        db.commit()
+        db.close()
+    if applied:
+        with span("publish"):
+            publish_interview_event(
+                candidate_id,
+                interview_session["jd_config_id"],
+                "answer_saved",
+                {"question_indexes": applied_indexes, "saved_count": len(answers)},
+            )
+    return jsonify({"ok": True, "acked_seq": acked_seq, "applied": applied, "saved_count": len(answers)})
 
-    monitoring = _parse_json_dict(row[1])
-    monitoring["camera_granted"] = bool(payload.get("camera_granted", monitoring.get("camera_granted", False)))
-    monitoring["mic_granted"] = bool(payload.get("mic_granted", monitoring.get("mic_granted", False)))
 
-    try:
-        tab_switch_count = int(payload.get("tab_switch_count", monitoring.get("tab_switch_count", 0)))
-    except:
-        tab_switch_count = int(monitoring.get("tab_switch_count", 0))
-    monitoring["tab_switch_count"] = max(int(monitoring.get("tab_switch_count", 0)), tab_switch_count)
-    monitoring["last_updated_at"] = datetime.utcnow().isoformat()
+@bp_interview.route("/<token>/monitoring", methods=["POST"])
+def interview_monitoring(token):
+    payload = _merge_monitoring_payload(monitoring_coalescer.take(token), request.get_json(silent=True) or {})
+    with span("load_session"):
+        interview_session = _load_interview_session(token)
+    if not interview_session:
+        return jsonify({"ok": False, "error": "Invalid token"}), 404
+    candidate_id = interview_session["candidate_id"]
 
-    db.execute(
-        "UPDATE candidates SET monitoring_json=? WHERE id=?",
-        (json.dumps(monitoring), row[0]),
-    )
-    db.commit()
-    db.close()
+    if not _store_monitoring(token, candidate_id, interview_session["jd_config_id"], payload):
+        session_cache.invalidate(token)
+        return jsonify({"ok": False, "error": "Invalid token"}), 404
     return jsonify({"ok": True})
 
 
-@bp_interview.route("/<token>/complete", methods=["POST"])
-def interview_complete(token):
-    payload = request.get_json(silent=True) or {}
+def _store_monitoring(token, candidate_id, jd_config_id, payload):
+    """Merges a monitoring ping into monitoring_json and publishes it. False if the token no longer matches."""
+    with span("db_write"):
+        db = get_db()
+        db.execute("BEGIN IMMEDIATE")
+        row = _select_live(db, "monitoring_json", candidate_id, token)
+        if not row:
+            db.rollback()
+            db.close()
+            return False
+
+        monitoring = _parse_json_dict(row[0])
+        previous_tab_switch_count = int(monitoring.get("tab_switch_count", 0))
+        monitoring["camera_granted"] = bool(payload.get("camera_granted", monitoring.get("camera_granted", False)))
+        monitoring["mic_granted"] = bool(payload.get("mic_granted", monitoring.get("mic_granted", False)))
+
+        try:
+            tab_switch_count = int(payload.get("tab_switch_count", monitoring.get("tab_switch_count", 0)))
+        except:
+            tab_switch_count = int(monitoring.get("tab_switch_count", 0))
+        monitoring["tab_switch_count"] = max(int(monitoring.get("tab_switch_count", 0)), tab_switch_count)
+        monitoring["last_updated_at"] = datetime.utcnow().isoformat()
+
+        db.execute(
+            "UPDATE candidates SET monitoring_json=? WHERE id=?",
+            (json.dumps(monitoring), candidate_id),
+        )
+        mark_report_dirty(db, candidate_id)
+        db.commit()
+        db.close()
+    event_type = "tab_switch" if monitoring["tab_switch_count"] > previous_tab_switch_count else "monitoring"
+    with span("publish"):
+        publish_interview_event(candidate_id, jd_config_id, event_type, monitoring)
+    return True
+
+
+def _flush_monitoring(token, payload):
+    # A coalesced ping that no later monitoring or complete request picked up.
     db = get_db()
     row = db.execute(
-        """
-        SELECT id, questions_json, answers_json, monitoring_json, jd_config_id, resume_path
-        FROM candidates
-        WHERE interview_token=?
-        """,
+        "SELECT id, jd_config_id FROM candidates WHERE interview_token=? AND status != 'interview_completed'",
         (token,),
     ).fetchone()
-    if not row:
-        db.close()
-        return jsonify({"ok": False, "error": "Invalid token"}), 404
-
-    questions = _normalize_questions(_parse_json_list(row[1]))
-    if not questions:
-        config = get_jd_config_by_id(int(row[4])) if row[4] else None
-        if not config:
-            config = get_latest_jd_config() or {}
-        resume_text = ""
-        if row[5]:
-            try:
-                resume_text = extract_text(row[5])
-            except:
-                resume_text = ""
-        questions = generate_questions(
-            resume_text=resume_text,
-            jd_dict=config.get("jd_dict", {}),
-            weights=config.get("weights", {}),
-            question_count=config.get("question_count", 10),
-            project_ratio=config.get("project_ratio", 80),
-        )
-        if not questions:
-            questions = _fallback_questions_from_jd(config.get("jd_dict", {}))
+    db.close()
+    if row:
+        _store_monitoring(token, row[0], row[1], payload)
 
-    answers = [a for a in _parse_json_list(row[2]) if isinstance(a, dict)]
-    monitoring = _parse_json_dict(row[3])
 
-    monitoring["camera_granted"] = bool(payload.get("camera_granted", monitoring.get("camera_granted", False)))
-    monitoring["mic_granted"] = bool(payload.get("mic_granted", monitoring.get("mic_granted", False)))
-    try:
-        monitoring["tab_switch_count"] = int(payload.get("tab_switch_count", monitoring.get("tab_switch_count", 0)))
-    except:
-        monitoring["tab_switch_count"] = int(monitoring.get("tab_switch_count", 0))
-    monitoring["completed_at"] = datetime.utcnow().isoformat()
+# Rejected monitoring pings are kept here and written by the next accepted
+# monitoring/complete request, or after MONITORING_FLUSH_SECONDS at the latest.
+MONITORING_FLUSH_SECONDS = 5.0
+monitoring_coalescer = Coalescer(on_flush=_flush_monitoring, flush_seconds=MONITORING_FLUSH_SECONDS)
 
-    answered = [a for a in answers if str(a.get("answer", "")).strip()]
-    answer_lengths = [len(str(a.get("answer", "")).split()) for a in answered]
-    avg_answer_length = round(sum(answer_lengths) / len(answer_lengths), 2) if answer_lengths else 0
 
-    total_time_seconds = 0.0
-    for a in answered:
+@bp_interview.route("/<token>/complete", methods=["POST"])
+def interview_complete(token):
+    payload = _merge_monitoring_payload(monitoring_coalescer.take(token), request.get_json(silent=True) or {})
+    with span("load_session"):
+        interview_session = _load_interview_session(token)
+    if not interview_session:
+        return jsonify({"ok": False, "error": "Invalid token"}), 404
+    candidate_id = interview_session["candidate_id"]
+
+    with span("db_write"):
+        db = get_db()
+        db.execute("BEGIN IMMEDIATE")
+        restore_if_archived(db, candidate_id)
+        row = db.execute(
+            """
+            SELECT c.monitoring_json, s.candidate_id
+            FROM candidates c
+            LEFT JOIN interview_summaries s ON s.candidate_id = c.id
+            WHERE c.id=? AND c.interview_token=?
+            """,
+            (candidate_id, token),
+        ).fetchone()
+        if not row:
+            db.rollback()
+            db.close()
+            session_cache.invalidate(token)
+            return jsonify({"ok": False, "error": "Invalid token"}), 404
+
+        if row[1] is None:
+            answers_row = db.execute("SELECT answers_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+            rebuild_summary(db, candidate_id, len(interview_session["questions"]), _parse_json_list(answers_row[0]))
+
+        monitoring = _parse_json_dict(row[0])
+
+        monitoring["camera_granted"] = bool(payload.get("camera_granted", monitoring.get("camera_granted", False)))
+        monitoring["mic_granted"] = bool(payload.get("mic_granted", monitoring.get("mic_granted", False)))
         try:
-            total_time_seconds += float(a.get("time_taken_seconds", 0))
+            monitoring["tab_switch_count"] = int(payload.get("tab_switch_count", monitoring.get("tab_switch_count", 0)))
         except:
-            pass
-    total_time_seconds = round(total_time_seconds, 2)
-
-    total_questions = len(questions)
-    answered_count = len(answered)
-    coverage = answered_count / max(1, total_questions)
-    length_factor = min(1.0, avg_answer_length / 30.0)
-    communication_score = int(round(min(10.0, (coverage * 6.0) + (length_factor * 4.0))))
-
-    summary = {
-        "total_questions": total_questions,
-        "answered_count": answered_count,
-        "avg_answer_length": avg_answer_length,
-        "total_time_seconds": total_time_seconds,
-        "tab_switch_count": int(monitoring.get("tab_switch_count", 0)),
-        "camera_granted": bool(monitoring.get("camera_granted", False)),
-        "mic_granted": bool(monitoring.get("mic_granted", False)),
-        "communication_score": communication_score,
-    }
-
-    db.execute(
-        """
-        UPDATE candidates
-        SET monitoring_json=?, interview_summary_json=?, status=?
-        WHERE id=?
-        """,
-        (json.dumps(monitoring), json.dumps(summary), "interview_completed", row[0]),
-    )
-    db.commit()
+            monitoring["tab_switch_count"] = int(monitoring.get("tab_switch_count", 0))
+        monitoring["completed_at"] = datetime.utcnow().isoformat()
+
+        summary = finalize_summary(db, candidate_id, monitoring)
+
+        db.execute(
+            """
+            UPDATE candidates
+            SET monitoring_json=?, interview_summary_json=?, status=?, evaluation_json=NULL
+            WHERE id=?
+            """,
+            (json.dumps(monitoring), json.dumps(summary), "interview_completed", candidate_id),
+        )
+        cancel_reminders(db, candidate_id)
+        # The evaluation worker rebuilds the report once the scores are in.
+        mark_report_dirty(db, candidate_id)
+        db.commit()
     db.close()
+    invalidate_counts()
+    session_cache.invalidate(token)
+    with span("publish"):
+        publish_interview_event(candidate_id, interview_session["jd_config_id"], "completed", summary)
+    schedule_evaluation()
     return jsonify({"ok": True, "done_url": f"/interview/{token}/done"})
 
 
@@ -252,12 +564,14 @@ def interview_complete(token):
 def interview_done(token):
     db = get_db()
     row = db.execute(
-        "SELECT name, interview_summary_json FROM candidates WHERE interview_token=?",
+        "SELECT name, interview_summary_json, id, archived_at FROM candidates WHERE interview_token=?",
         (token,),
     ).fetchone()
-    db.close()
     if not row:
+        db.close()
         return "Invalid interview link", 404
 
-    summary = _parse_json_dict(row[1])
+    blobs = with_archived_blobs(db, row[2], row[3], {"interview_summary_json": row[1]})
+    db.close()
+    summary = _parse_json_dict(blobs["interview_summary_json"])
     return render_template("interview_done.html", name=row[0], summary=summary)
@@ -1,10 +1,14 @@
 import json
+import os
 from functools import wraps
-import PyPDF2
-import docx
 from flask import current_app, redirect, session
 from database import get_db
-from mailer import send_mail
+from jd_config_cache import jd_config_cache
+from metrics import timed
+from profiling import memory_watch
+from shared_cache import shared_cache
+
+resume_text_cache = shared_cache.namespace("resume_text", version=1)
 
 
 def login_required(role=None):
@@ -24,14 +28,31 @@ def login_required(role=None):
     return decorator
 
 
+def _resume_text_key(path):
+    # Re-uploads reuse the same filename, so the file's size and mtime are part of the key.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+@timed("extract_text")
+@memory_watch("extract_text")
+@resume_text_cache.memoize(key_func=_resume_text_key)
 def extract_text(path):
     text = ""
+    # Parser libraries are imported on first use so worker boot doesn't pay for them.
     if path.lower().endswith(".pdf"):
+        import PyPDF2
+
         with open(path, "rb") as f:
             reader = PyPDF2.PdfReader(f)
             for page in reader.pages:
                 text += page.extract_text() or ""
     elif path.lower().endswith(".docx"):
+        import docx
+
         doc = docx.Document(path)
         for para in doc.paragraphs:
             text += para.text + " "
@@ -39,33 +60,8 @@ def extract_text(path):
 
 
 def get_latest_jd_config():
-    db = get_db()
-    cur = db.execute(
-        """
-        SELECT id, COALESCE(title, ''), jd_text, jd_dict_json, skill_weights_json,
-               min_academic_percent, qualify_score, question_count, project_ratio, created_at
-        FROM jd_configs
-        ORDER BY id DESC LIMIT 1
-    """
-    )
-    row = cur.fetchone()
-    db.close()
-
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "title": row[1] or "",
-        "jd_text": row[2] or "",
-        "jd_dict": json.loads(row[3] or "{}"),
-        "weights": json.loads(row[4] or "{}"),
-        "min_academic_percent": int(row[5] or 60),
-        "qualify_score": int(row[6] or 60),
-        "question_count": int(row[7] or 10),
-        "project_ratio": int(row[8] or 80),
-        "created_at": row[9],
-    }
+    config = jd_config_cache.latest()
+    return config.to_dict() if config else None
 
 
 def get_all_jd_configs():
@@ -82,45 +78,8 @@ def get_all_jd_configs():
 
 
 def get_jd_config_by_id(jd_id):
-    db = get_db()
-    row = db.execute(
-        """
-        SELECT id, COALESCE(title, ''), jd_text, jd_dict_json, skill_weights_json,
-               min_academic_percent, qualify_score, question_count, project_ratio, created_at
-        FROM jd_configs
-        WHERE id=?
-        """,
-        (jd_id,),
-    ).fetchone()
-    db.close()
-
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "title": row[1] or "",
-        "jd_text": row[2] or "",
-        "jd_dict": json.loads(row[3] or "{}"),
-        "weights": json.loads(row[4] or "{}"),
-        "min_academic_percent": int(row[5] or 60),
-        "qualify_score": int(row[6] or 60),
-        "question_count": int(row[7] or 10),
-        "project_ratio": int(row[8] or 80),
-        "created_at": row[9],
-    }
-
-
-def _send_schedule_mail(to_email, interview_date, interview_link):
-    subject = "Interview scheduled successfully"
-    body = (
-        "Your interview has been scheduled.\n\n"
-        f"Date and time: {interview_date}\n"
-        f"Interview link: {interview_link}\n"
-    )
-    ok = send_mail(to_email, subject, body)
-    if not ok:
-        print(f"[MAIL_FALLBACK] Could not send interview email to {to_email}. Link: {interview_link}")
+    config = jd_config_cache.get(jd_id)
+    return config.to_dict() if config else None
 
 
 def _parse_json_list(raw):
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from database import BASE_DIR
+
+# Default location; create_app() switches the backend with configure_backend().
+SHARED_CACHE_PATH = os.path.join(BASE_DIR, "cache.db")
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "20000"))
+# accessed_at is only rewritten when older than this, so reads stay reads.
+ACCESS_RESOLUTION_SECONDS = 60
+# Size limits are enforced every N sets per process instead of on every write.
+EVICT_CHECK_EVERY = 50
+MAX_KEY_LENGTH = 200
+
+
+class SQLiteCacheBackend:
+    """
+    LRU cache in its own SQLite file, shared by every worker on the host
+    (point SHARED_CACHE_PATH at /dev/shm to keep it in memory). Entries are
+    disposable, so the file runs with WAL and synchronous=OFF.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH, max_bytes=SHARED_CACHE_MAX_BYTES, max_entries=SHARED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_entries = max(1, int(max_entries))
+        self._local = threading.local()
+        self._sets = 0
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_namespace ON cache_entries(namespace)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE key=?",
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+        if row[1] is not None and row[1] <= now:
+            conn.execute("DELETE FROM cache_entries WHERE key=?", (key,))
+            return None
+        if now - row[2] > ACCESS_RESOLUTION_SECONDS:
+            conn.execute("UPDATE cache_entries SET accessed_at=? WHERE key=?", (now, key))
+        return row[0]
+
+    def set(self, key, namespace, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        self._conn().execute(
+            """
+            INSERT INTO cache_entries (key, namespace, value, size, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value=excluded.value,
+                size=excluded.size,
+                expires_at=excluded.expires_at,
+                accessed_at=excluded.accessed_at
+            """,
+            (key, namespace, value, len(key) + len(value), expires_at, now),
+        )
+        with self._lock:
+            self._sets += 1
+            due = self._sets % EVICT_CHECK_EVERY == 0
+        return self.evict() if due else {}
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache_entries WHERE key=?", (key,))
+
+    def clear_namespace(self, namespace):
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace=?", (namespace,))
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until under both limits. Returns {namespace: count}."""
+        conn = self._conn()
+        evicted = defaultdict(int)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (namespace,) in conn.execute(
+                "SELECT namespace FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).fetchall():
+                evicted[namespace] += 1
+            conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+            total_bytes, total_entries = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM cache_entries").fetchone()
+            # Evict down to 90% so the next few sets don't immediately trigger another pass.
+            excess_bytes = total_bytes - int(self.max_bytes * 0.9)
+            excess_entries = total_entries - int(self.max_entries * 0.9)
+            if total_bytes > self.max_bytes or total_entries > self.max_entries:
+                victims = []
+                for key, namespace, size in conn.execute(
+                    "SELECT key, namespace, size FROM cache_entries ORDER BY accessed_at"
+                ).fetchall():
+                    if excess_bytes <= 0 and excess_entries <= 0:
+                        break
+                    victims.append((key,))
+                    evicted[namespace] += 1
+                    excess_bytes -= size
+                    excess_entries -= 1
+                conn.executemany("DELETE FROM cache_entries WHERE key=?", victims)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return dict(evicted)
+
+    def info(self):
+        total_bytes, total_entries = self._conn().execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM cache_entries"
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "bytes": total_bytes,
+            "entries": total_entries,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+        }
+
+
+class RedisCacheBackend:
+    """
+    Adapter for any redis-py compatible client (redis.Redis, fakeredis, ...).
+    Size limits and LRU eviction are left to the server's maxmemory policy.
+    """
+
+    def __init__(self, client, prefix="interview_bot:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key, namespace, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+        return {}
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear_namespace(self, namespace):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}{namespace}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def evict(self):
+        return {}
+
+    def info(self):
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+class Namespace:
+    def __init__(self, cache, name, version=1, ttl=None):
+        self.cache = cache
+        self.name = name
+        self.version = version
+        self.ttl = ttl
+
+    def _key(self, key):
+        # Bumping version (e.g. when the cached value's shape changes) orphans old entries.
+        key = str(key)
+        if len(key) > MAX_KEY_LENGTH:
+            key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{self.name}:v{self.version}:{key}"
+
+    def get(self, key, default=None):
+        try:
+            raw = self.cache.backend.get(self._key(key))
+        except Exception as e:
+            print(f"[SHARED_CACHE] get failed in {self.name}: {e}")
+            raw = None
+        if raw is None:
+            self.cache._count(self.name, "misses")
+            return default
+        self.cache._count(self.name, "hits")
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        try:
+            evicted = self.cache.backend.set(self._key(key), self.name, json.dumps(value), ttl or self.ttl)
+        except Exception as e:
+            print(f"[SHARED_CACHE] set failed in {self.name}: {e}")
+            return
+        self.cache._count(self.name, "sets")
+        for namespace, count in (evicted or {}).items():
+            self.cache._count(namespace, "evictions", count)
+
+    def delete(self, key):
+        self.cache.backend.delete(self._key(key))
+
+    def clear(self):
+        self.cache.backend.clear_namespace(self.name)
+
+    def memoize(self, key_func=None):
+        """
+        Caches a function's JSON-serializable result. The key is key_func(*args, **kwargs)
+        when given, otherwise a hash of the JSON-encoded arguments.
+        """
+
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if key_func is not None:
+                    key = key_func(*args, **kwargs)
+                else:
+                    raw = json.dumps([f.__name__, args, kwargs], sort_keys=True, default=str)
+                    key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+                if key is None:
+                    return f(*args, **kwargs)
+
+                missing = object()
+                value = self.get(key, missing)
+                if value is not missing:
+                    return value
+                value = f(*args, **kwargs)
+                self.set(key, value)
+                return value
+
+            wrapper.cache_namespace = self
+            return wrapper
+
+        return decorator
+
+
+class SharedCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._metrics = defaultdict(lambda: {"hits": 0, "misses": 0, "sets": 0, "evictions": 0})
+        self._lock = threading.Lock()
+
+    def namespace(self, name, version=1, ttl=None):
+        return Namespace(self, name, version, ttl)
+
+    def _count(self, namespace, metric, amount=1):
+        with self._lock:
+            self._metrics[namespace][metric] += amount
+
+    def counters(self):
+        with self._lock:
+            return {name: dict(m) for name, m in self._metrics.items()}
+
+    def stats(self):
+        namespaces = {}
+        for name, m in self.counters().items():
+            lookups = m["hits"] + m["misses"]
+            namespaces[name] = dict(m, hit_rate=round(m["hits"] / lookups, 4) if lookups else 0.0)
+        try:
+            backend = self.backend.info()
+        except Exception as e:
+            backend = {"error": str(e)}
+        return {"backend": backend, "namespaces": namespaces}
+
+
+def _backend_for(url, path):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+
+            return RedisCacheBackend(redis.Redis.from_url(url))
+        except ImportError:
+            print("[SHARED_CACHE] SHARED_CACHE_URL is set but the redis package is not installed; using SQLite")
+    return SQLiteCacheBackend(path)
+
+
+def configure_backend(url="", path=SHARED_CACHE_PATH):
+    """Points the process-wide cache at Redis (url) or a SQLite file (path). Connections open lazily."""
+    shared_cache.backend = _backend_for(url or "", path or SHARED_CACHE_PATH)
+
+
+shared_cache = SharedCache(SQLiteCacheBackend())
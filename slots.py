@@ -0,0 +1,181 @@
+import os
+from datetime import datetime, timedelta
+
+from interview_tokens import EARLY_ACCESS_SECONDS
+
+# Interviews are booked into slots so peak concurrency is capped by the sum
+# of the capacities of the slots that overlap, not by how many candidates
+# happen to pick the same minute. Slot times are server-local wall time in
+# the same format as candidates.interview_date.
+SLOT_FORMAT = "%Y-%m-%dT%H:%M"
+DEFAULT_SLOT_MINUTES = int(os.getenv("INTERVIEW_SLOT_MINUTES", "30"))
+DEFAULT_SLOT_CAPACITY = int(os.getenv("INTERVIEW_SLOT_CAPACITY", "20"))
+# How long after its slot ends a link still works, so an interview started
+# late in the slot can be finished.
+SLOT_GRACE_SECONDS = int(os.getenv("INTERVIEW_SLOT_GRACE_MINUTES", "30")) * 60
+SLOT_CALENDAR_DAYS = int(os.getenv("INTERVIEW_SLOT_CALENDAR_DAYS", "14"))
+SLOT_CREATE_MAX = 500
+
+_SLOT_COLUMNS = "id, starts_at, minutes, capacity, booked"
+
+
+def _slot_dict(row):
+    slot_id, starts_at, minutes, capacity, booked = row
+    return {
+        "id": slot_id,
+        "starts_at": starts_at,
+        "minutes": minutes,
+        "capacity": capacity,
+        "booked": booked,
+        "remaining": max(0, capacity - booked),
+    }
+
+
+def _now_local():
+    return datetime.now().strftime(SLOT_FORMAT)
+
+
+def parse_slot_time(value):
+    return datetime.fromisoformat(str(value).strip()).replace(second=0, microsecond=0, tzinfo=None)
+
+
+def slot_window(slot):
+    """(not_before, not_after) epoch seconds for an interview link booked into `slot`."""
+    start = parse_slot_time(slot["starts_at"]).timestamp()
+    return int(start) - EARLY_ACCESS_SECONDS, int(start) + int(slot["minutes"]) * 60 + SLOT_GRACE_SECONDS
+
+
+def create_slots(db, first_start, count, minutes=DEFAULT_SLOT_MINUTES, capacity=DEFAULT_SLOT_CAPACITY):
+    """
+    Opens `count` back-to-back slots starting at first_start. An existing slot
+    at the same time keeps its bookings; its capacity is never set below them.
+    The caller commits. Returns the number of slots written.
+    """
+    start = parse_slot_time(first_start)
+    count = max(1, min(SLOT_CREATE_MAX, int(count)))
+    minutes = max(1, int(minutes))
+    capacity = max(1, int(capacity))
+    now = datetime.utcnow().isoformat()
+    rows = [((start + timedelta(minutes=minutes * i)).strftime(SLOT_FORMAT), minutes, capacity, now) for i in range(count)]
+    db.executemany(
+        """
+        INSERT INTO interview_slots (starts_at, minutes, capacity, booked, created_at)
+        VALUES (?, ?, ?, 0, ?)
+        ON CONFLICT(starts_at) DO UPDATE SET
+            minutes = excluded.minutes,
+            capacity = MAX(excluded.capacity, interview_slots.booked)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def delete_slot(db, slot_id):
+    """Removes a slot nobody is booked into. The caller commits. Returns True if it was deleted."""
+    cur = db.execute("DELETE FROM interview_slots WHERE id=? AND booked=0", (int(slot_id),))
+    return cur.rowcount == 1
+
+
+def get_slot(db, slot_id):
+    row = db.execute(f"SELECT {_SLOT_COLUMNS} FROM interview_slots WHERE id=?", (int(slot_id),)).fetchone()
+    return _slot_dict(row) if row else None
+
+
+def list_slots(db, start=None, days=SLOT_CALENDAR_DAYS, open_only=False):
+    """
+    Slots starting from `start` (default now) for `days` days, earliest
+    first. open_only keeps the ones reserve_slot would still accept.
+    """
+    start = parse_slot_time(start) if start else datetime.now()
+    end = start + timedelta(days=max(1, int(days)))
+    where = "starts_at >= ? AND starts_at < ?"
+    params = [start.strftime(SLOT_FORMAT), end.strftime(SLOT_FORMAT)]
+    if open_only:
+        where += " AND booked < capacity AND starts_at > ?"
+        params.append(_now_local())
+    rows = db.execute(
+        f"SELECT {_SLOT_COLUMNS} FROM interview_slots WHERE {where} ORDER BY starts_at",
+        params,
+    ).fetchall()
+    return [_slot_dict(r) for r in rows]
+
+
+def slot_calendar(slots):
+    """Groups slots by local date for the calendar views."""
+    days = []
+    for slot in slots:
+        date, _sep, time_of_day = slot["starts_at"].partition("T")
+        if not days or days[-1]["date"] != date:
+            days.append({"date": date, "slots": []})
+        days[-1]["slots"].append({**slot, "time": time_of_day})
+    return days
+
+
+def peak_concurrency(slots):
+    """Largest sum of capacities over any instant, i.e. the most interviews that can run at once."""
+    events = []
+    for slot in slots:
+        start = parse_slot_time(slot["starts_at"])
+        events.append((start, slot["capacity"]))
+        events.append((start + timedelta(minutes=slot["minutes"]), -slot["capacity"]))
+    # Ends sort before starts at the same instant: back-to-back slots do not overlap.
+    events.sort(key=lambda e: (e[0], e[1]))
+    peak = running = 0
+    for _at, delta in events:
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def reserve_slot(db, candidate_id, slot_id):
+    """
+    Books candidate_id into slot_id and releases the slot it held before.
+    The booking is a single conditional UPDATE, so concurrent requests can
+    never push a slot past its capacity. Call inside BEGIN IMMEDIATE so the
+    candidate's previous slot is read and released in the same transaction;
+    the caller commits. Returns the slot dict, or None if it is full,
+    already started or unknown.
+    """
+    current = db.execute("SELECT slot_id FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    previous = current[0] if current else None
+    if previous == int(slot_id):
+        return get_slot(db, slot_id)
+
+    cur = db.execute(
+        """
+        UPDATE interview_slots SET booked = booked + 1
+        WHERE id=? AND booked < capacity AND starts_at > ?
+        """,
+        (int(slot_id), _now_local()),
+    )
+    if cur.rowcount != 1:
+        return None
+    if previous is not None:
+        db.execute("UPDATE interview_slots SET booked = booked - 1 WHERE id=? AND booked > 0", (previous,))
+    db.execute("UPDATE candidates SET slot_id=? WHERE id=?", (int(slot_id), candidate_id))
+    return get_slot(db, slot_id)
+
+
+def release_slot(db, candidate_id):
+    """Gives back the candidate's booking, if any. The caller commits."""
+    db.execute(
+        """
+        UPDATE interview_slots SET booked = booked - 1
+        WHERE booked > 0 AND id = (SELECT slot_id FROM candidates WHERE id=?)
+        """,
+        (candidate_id,),
+    )
+    db.execute("UPDATE candidates SET slot_id=NULL WHERE id=?", (candidate_id,))
+
+
+def ensure_slot(db, starts_at, minutes, capacity):
+    """Id of the slot at starts_at, opening it with the given size if it does not exist. The caller commits."""
+    db.execute(
+        """
+        INSERT INTO interview_slots (starts_at, minutes, capacity, booked, created_at)
+        VALUES (?, ?, ?, 0, ?)
+        ON CONFLICT(starts_at) DO NOTHING
+        """,
+        (starts_at, int(minutes), int(capacity), datetime.utcnow().isoformat()),
+    )
+    return db.execute("SELECT id FROM interview_slots WHERE starts_at=?", (starts_at,)).fetchone()[0]
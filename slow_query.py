@@ -0,0 +1,195 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+# Statements whose execute + fetch time reaches SLOW_QUERY_MS are printed as
+# [SLOW_QUERY] and appended to SLOW_QUERY_LOG_PATH (set from config by
+# create_app()). A negative value turns the log off; an empty path keeps only
+# the printed line.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_SECONDS = SLOW_QUERY_MS / 1000 if SLOW_QUERY_MS >= 0 else float("inf")
+SLOW_QUERY_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+_SKIP_CALLER_FILES = {os.path.abspath(__file__), os.path.abspath(os.path.join(os.path.dirname(__file__), "database.py"))}
+_REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+# normalized SQL -> plan summary, so EXPLAIN QUERY PLAN runs once per statement per process.
+_plans = {}
+
+
+def normalize_sql(sql):
+    text = re.sub(r"--[^\n]*", " ", sql)
+    text = re.sub(r"'(?:[^']|'')*'", "?", text)
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    # IN (?, ?, ?) lists of any length are the same statement.
+    return re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", text)
+
+
+def parameter_shape(parameters):
+    if parameters is None:
+        return "many"
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    shape = [type(v).__name__ for v in parameters]
+    if len(shape) > 8:
+        return shape[:8] + [f"... {len(shape)} params"]
+    return shape
+
+
+def _caller():
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_REPO_DIR) and filename not in _SKIP_CALLER_FILES:
+            return f"{os.path.relpath(filename, _REPO_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+# "SCAN t" / "SCAN TABLE t" (older SQLite) without an index. SCAN CONSTANT ROW
+# (SELECT without FROM) and scans of subqueries or views are not table scans.
+_FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW\b|SUBQUERY\b|\()\S+")
+_USES_INDEX_RE = re.compile(r"\bUSING (?:COVERING )?INDEX\b|\bUSING INTEGER PRIMARY KEY\b")
+
+
+def _is_full_scan(detail):
+    return bool(_FULL_SCAN_RE.match(detail)) and not _USES_INDEX_RE.search(detail)
+
+
+def _explain(conn, sql, parameters):
+    if parameters is None:
+        return {"plan": [], "error": "not available for executemany"}
+    try:
+        # The base class method skips the timed cursor, so EXPLAIN is never itself logged.
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return {"plan": [], "error": str(e)}
+    details = [row[3] for row in rows]
+    return {
+        "plan": details,
+        "full_scan": any(_is_full_scan(d) for d in details),
+        "temp_btree": any("TEMP B-TREE" in d for d in details),
+    }
+
+
+def log_slow_query(conn, sql, parameters, seconds):
+    normalized = normalize_sql(sql)
+    entry = {
+        "at": datetime.utcnow().isoformat(),
+        "ms": round(seconds * 1000, 3),
+        "sql": normalized,
+        "params": parameter_shape(parameters),
+        "caller": _caller(),
+        "pid": os.getpid(),
+    }
+
+    with _lock:
+        plan = _plans.get(normalized)
+    if plan is None and normalized.split(" ", 1)[0].upper() in _EXPLAINABLE:
+        plan = _explain(conn, sql, parameters)
+        with _lock:
+            _plans[normalized] = plan
+        entry["explain"] = plan
+    flag = " FULL SCAN" if plan and plan.get("full_scan") else ""
+    print(f"[SLOW_QUERY] {entry['ms']:.1f}ms{flag} {entry['caller']}: {normalized[:200]}")
+
+    if not SLOW_QUERY_LOG_PATH:
+        return
+    try:
+        with _lock:
+            if os.path.exists(SLOW_QUERY_LOG_PATH) and os.path.getsize(SLOW_QUERY_LOG_PATH) > SLOW_QUERY_LOG_MAX_BYTES:
+                os.replace(SLOW_QUERY_LOG_PATH, SLOW_QUERY_LOG_PATH + ".1")
+            with open(SLOW_QUERY_LOG_PATH, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"[SLOW_QUERY] log write failed: {e}")
+
+
+def slow_query_report(tail=5000):
+    """Slow statements from the log (all workers), grouped by normalized SQL, worst total time first."""
+    if not SLOW_QUERY_LOG_PATH or not os.path.exists(SLOW_QUERY_LOG_PATH):
+        return []
+    entries = deque(maxlen=tail)
+    with open(SLOW_QUERY_LOG_PATH) as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+    grouped = {}
+    for e in entries:
+        item = grouped.setdefault(
+            e["sql"],
+            {"sql": e["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0, "params": e["params"], "callers": {}, "explain": None},
+        )
+        item["count"] += 1
+        item["total_ms"] += e["ms"]
+        item["max_ms"] = max(item["max_ms"], e["ms"])
+        item["last_at"] = e["at"]
+        if e.get("caller"):
+            item["callers"][e["caller"]] = item["callers"].get(e["caller"], 0) + 1
+        if e.get("explain"):
+            item["explain"] = e["explain"]
+
+    out = []
+    for item in grouped.values():
+        item["total_ms"] = round(item["total_ms"], 3)
+        item["avg_ms"] = round(item["total_ms"] / item["count"], 3)
+        item["callers"] = sorted(item["callers"].items(), key=lambda kv: kv[1], reverse=True)
+        out.append(item)
+    out.sort(key=lambda i: i["total_ms"], reverse=True)
+    return out
+
+
+def table_sizes(db):
+    """Row count, index names and on-disk bytes (when SQLite has dbstat) for every table."""
+    tables = [
+        r[0]
+        for r in db.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+    ]
+    bytes_by_name = {}
+    try:
+        for name, size in db.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall():
+            bytes_by_name[name] = size
+    except sqlite3.Error:
+        pass
+
+    out = []
+    for table in tables:
+        quoted = '"' + table.replace('"', '""') + '"'
+        indexes = [r[1] for r in db.execute(f"PRAGMA index_list({quoted})").fetchall()]
+        out.append(
+            {
+                "table": table,
+                "rows": db.execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0],
+                "bytes": bytes_by_name.get(table),
+                "index_bytes": sum(bytes_by_name.get(i) or 0 for i in indexes) if bytes_by_name else None,
+                "indexes": indexes,
+                "columns": [r[1] for r in db.execute(f"PRAGMA table_info({quoted})").fetchall()],
+            }
+        )
+    return out
+
+
+def database_summary(db):
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    freelist = db.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "journal_mode": db.execute("PRAGMA journal_mode").fetchone()[0],
+        "threshold_ms": SLOW_QUERY_MS,
+    }
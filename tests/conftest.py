@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="interview_bot_test_")
+os.environ.update(
+    DB_PATH=os.path.join(WORKDIR, "test.db"),
+    UPLOAD_FOLDER=os.path.join(WORKDIR, "uploads"),
+    SHARED_CACHE_PATH=os.path.join(WORKDIR, "cache.db"),
+    METRICS_DIR=os.path.join(WORKDIR, "metrics"),
+    JINJA_CACHE_DIR="",
+    TRACE_LOG_PATH="",
+    SLOW_QUERY_LOG_PATH="",
+    # Tests that need the sender start it themselves.
+    OUTBOX_SENDER="0",
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from app import create_app  # noqa: E402
+from interview_tokens import issue_interview_token  # noqa: E402
+
+QUESTIONS = ["Tell us about a project.", "How do you test Flask code?"]
+
+
+@pytest.fixture()
+def app():
+    app = create_app()
+    database.init_db()
+    return app
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def interview_token(app):
+    """Factory: a scheduled candidate with QUESTIONS; returns (candidate_id, token)."""
+
+    def make(window=None):
+        db = database.get_db()
+        cur = db.execute(
+            "INSERT INTO candidates (name, email, status, questions_json) VALUES (?, ?, 'scheduled', ?)",
+            ("Test", f"c{time.time_ns()}@example.test", json.dumps(QUESTIONS)),
+        )
+        candidate_id = cur.lastrowid
+        token = issue_interview_token(candidate_id, None, window=window)
+        db.execute("UPDATE candidates SET interview_token=? WHERE id=?", (token, candidate_id))
+        db.commit()
+        db.close()
+        return candidate_id, token
+
+    return make
@@ -0,0 +1,19 @@
+import database
+from candidate_listing import count_candidates
+
+
+def _count(status):
+    db = database.get_db()
+    total = count_candidates(db, status=status)
+    db.close()
+    return total
+
+
+def test_completing_an_interview_refreshes_status_counts(client, interview_token):
+    _candidate_id, token = interview_token()
+    completed = _count("interview_completed")
+    scheduled = _count("scheduled")
+
+    assert client.post(f"/interview/{token}/complete", json={}).status_code == 200
+    assert _count("interview_completed") == completed + 1
+    assert _count("scheduled") == scheduled - 1
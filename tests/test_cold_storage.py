@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timedelta
+
+import database
+from cold_storage import archive_candidate, compact
+from conftest import QUESTIONS
+
+LONG_AGO = (datetime.utcnow() - timedelta(days=60)).isoformat()
+CUTOFF = (datetime.utcnow() - timedelta(days=7)).isoformat()
+
+
+def _rejected_candidate():
+    db = database.get_db()
+    candidate_id = db.execute(
+        """
+        INSERT INTO candidates (name, email, status, phase1_result_json, created_at)
+        VALUES ('Old', ?, 'rejected', '{"score": 10}', ?)
+        """,
+        (f"old{datetime.utcnow().timestamp()}@example.test", LONG_AGO),
+    ).lastrowid
+    db.commit()
+    db.close()
+    return candidate_id
+
+
+def _archived_at(db, candidate_id):
+    return db.execute("SELECT archived_at FROM candidates WHERE id=?", (candidate_id,)).fetchone()[0]
+
+
+def test_compact_archives_idle_rejected_candidates(app):
+    candidate_id = _rejected_candidate()
+    assert compact(older_than_days=7)["archived"] >= 1
+    db = database.get_db()
+    assert _archived_at(db, candidate_id)
+    db.close()
+
+
+def test_archive_rechecks_eligibility(app):
+    candidate_id = _rejected_candidate()
+    db = database.get_db()
+    # Resumed after compact() selected it.
+    db.execute("UPDATE candidates SET status='scheduled' WHERE id=?", (candidate_id,))
+    db.commit()
+    db.execute("BEGIN IMMEDIATE")
+    assert archive_candidate(db, candidate_id, cutoff=CUTOFF) == (0, 0)
+    db.commit()
+    row = db.execute("SELECT archived_at, phase1_result_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    assert row == (None, '{"score": 10}')
+    assert db.execute("SELECT COUNT(*) FROM candidate_archive WHERE candidate_id=?", (candidate_id,)).fetchone()[0] == 0
+    db.close()
+
+
+def test_write_restores_archive_on_session_cache_hit(client, interview_token):
+    candidate_id, token = interview_token()
+    assert client.get(f"/interview/{token}").status_code == 200  # caches the session
+    answer = {"question_index": 0, "question_text": QUESTIONS[0], "answer": "First.", "time_taken_seconds": 5}
+    assert client.post(f"/interview/{token}/save_answer", json=answer).status_code == 200
+
+    db = database.get_db()
+    db.execute("BEGIN IMMEDIATE")
+    archive_candidate(db, candidate_id)
+    db.commit()
+    assert _archived_at(db, candidate_id)
+
+    answer = {"question_index": 1, "question_text": QUESTIONS[1], "answer": "Second.", "time_taken_seconds": 5}
+    assert client.post(f"/interview/{token}/save_answer", json=answer).status_code == 200
+    assert _archived_at(db, candidate_id) is None
+    answers = json.loads(db.execute("SELECT answers_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()[0])
+    assert [a["answer"] for a in answers] == ["First.", "Second."]
+    assert json.loads(db.execute("SELECT questions_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()[0])
+    db.close()
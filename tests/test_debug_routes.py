@@ -0,0 +1,28 @@
+import pytest
+
+DEBUG_ROUTES = [
+    "/debug/interview_cache",
+    "/debug/jd_cache",
+    "/debug/shared_cache",
+    "/debug/outbox",
+    "/debug/events",
+    "/debug/rate_limits",
+    "/debug/routes",
+]
+
+
+@pytest.mark.parametrize("path", DEBUG_ROUTES)
+def test_debug_routes_need_hr_login(client, path):
+    response = client.get(path)
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/login")
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 2
+        sess["role"] = "candidate"
+    assert client.get(path).status_code == 403
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "hr"
+    assert client.get(path).status_code == 200
@@ -0,0 +1,45 @@
+import pytest
+
+import interview_tokens
+from interview_tokens import issue_interview_token, set_signing_keys, verify_interview_token
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture(autouse=True)
+def _restore_keys():
+    keys = interview_tokens.SIGNING_KEYS
+    yield
+    interview_tokens.SIGNING_KEYS = keys
+    interview_tokens.ACTIVE_KEY_ID = keys[0][0]
+    interview_tokens._KEYS_BY_ID = dict(keys)
+
+
+def test_token_is_valid_only_inside_its_window():
+    token = issue_interview_token(7, None, window=(NOW, NOW + 60))
+    assert verify_interview_token(token, now=NOW - 1)[0] == "too_early"
+    status, claims = verify_interview_token(token, now=NOW + 30)
+    assert status == "ok"
+    assert claims["candidate_id"] == 7
+    assert verify_interview_token(token, now=NOW + 61)[0] == "expired"
+
+
+def test_rotated_out_key_is_rejected():
+    set_signing_keys("k1:old-secret", "unused")
+    token = issue_interview_token(7, None, window=(NOW, NOW + 60))
+
+    set_signing_keys("k2:new-secret,k1:old-secret", "unused")
+    assert verify_interview_token(token, now=NOW)[0] == "ok"
+    assert issue_interview_token(7, None, window=(NOW, NOW + 60)).split(".")[1] == "k2"
+
+    set_signing_keys("k2:new-secret", "unused")
+    assert verify_interview_token(token, now=NOW) == ("unknown_key", None)
+
+
+def test_wrong_kid_or_tampered_payload_fails_the_signature():
+    set_signing_keys("k1:one,k2:two", "unused")
+    version, kid, payload, signature = issue_interview_token(7, None, window=(NOW, NOW + 60)).split(".")
+    assert verify_interview_token(".".join([version, "k2", payload, signature]), now=NOW)[0] == "bad_signature"
+
+    other_payload = issue_interview_token(8, None, window=(NOW, NOW + 60)).split(".")[2]
+    assert verify_interview_token(".".join([version, kid, other_payload, signature]), now=NOW)[0] == "bad_signature"
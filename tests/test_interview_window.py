@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+import interview_tokens
+from conftest import QUESTIONS
+from routes import interview_routes
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = _Clock(int(time.time()))
+    monkeypatch.setattr(interview_tokens, "time", clock)
+    monkeypatch.setattr(interview_routes, "time", clock)
+    return clock
+
+
+def test_started_interview_can_complete_after_window(client, interview_token, clock):
+    now = clock.now
+    _candidate_id, token = interview_token((now - 60, now + 60))
+    assert client.get(f"/interview/{token}").status_code == 200
+
+    clock.now = now + 120  # past not_after
+    answer = {"question_index": 0, "question_text": QUESTIONS[0], "answer": "An API.", "time_taken_seconds": 5}
+    assert client.post(f"/interview/{token}/save_answer", json=answer).status_code == 200
+    assert client.post(f"/interview/{token}/monitoring", json={"tab_switch_count": 0}).status_code == 200
+    response = client.post(f"/interview/{token}/complete", json={})
+    assert response.status_code == 200
+    assert response.get_json()["ok"] is True
+
+
+def test_started_interview_is_closed_after_window_hours(client, interview_token, clock):
+    now = clock.now
+    _candidate_id, token = interview_token((now - 60, now + 60))
+    assert client.get(f"/interview/{token}").status_code == 200
+
+    clock.now = now + 61 + interview_tokens.WINDOW_SECONDS
+    assert client.post(f"/interview/{token}/complete", json={}).status_code == 410
+
+
+def test_unstarted_interview_is_closed_after_window(client, interview_token, clock):
+    now = clock.now
+    _candidate_id, token = interview_token((now - 120, now - 60))
+    response = client.get(f"/interview/{token}")
+    assert response.status_code == 410
+    assert b"Window Closed" in response.data
+    assert client.post(f"/interview/{token}/complete", json={}).status_code == 410
+
+
+def test_interview_before_window_shows_too_early(client, interview_token, clock):
+    now = clock.now
+    _candidate_id, token = interview_token((now + 600, now + 3600))
+    response = client.get(f"/interview/{token}")
+    assert response.status_code == 403
+    assert b"Not Started" in response.data
@@ -0,0 +1,104 @@
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+
+import database
+import outbox
+from app import create_app
+
+
+class _FakeSession:
+    sent = []
+    delivered = threading.Event()
+
+    def __init__(self, settings=None):
+        self.server = object()
+        self.connects = 1
+
+    def send(self, to_email, subject, body):
+        self.sent.append(to_email)
+        self.delivered.set()
+
+    def close(self):
+        pass
+
+
+class _FlakySession(_FakeSession):
+    sent = []
+    delivered = threading.Event()
+    failures = 1
+
+    def send(self, to_email, subject, body):
+        if _FlakySession.failures:
+            _FlakySession.failures -= 1
+            raise smtplib.SMTPResponseException(451, b"try again later")
+        super().send(to_email, subject, body)
+
+
+class _TwoHoursLater(datetime):
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + timedelta(hours=2)
+
+
+def test_deferred_mail_is_sent_without_new_scheduling(app, monkeypatch):
+    db = database.get_db()
+    message_id = outbox.enqueue_mail(
+        db,
+        "reminder@example.test",
+        "Reminder",
+        "Soon.",
+        kind="reminder_1h",
+        send_after=datetime.utcnow() + timedelta(hours=1),
+    )
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(outbox, "SMTPSession", _FakeSession)
+    monkeypatch.setattr(outbox, "smtp_configured", lambda settings=None: True)
+    monkeypatch.setattr(outbox, "OUTBOX_POLL_SECONDS", 0.05)
+    outbox.reset_after_fork()
+    create_app({"OUTBOX_SENDER": True})
+    assert not _FakeSession.delivered.wait(0.2)
+
+    # The reminder becomes due; nothing calls wake_outbox() after startup.
+    monkeypatch.setattr(outbox, "datetime", _TwoHoursLater)
+
+    assert _FakeSession.delivered.wait(5)
+    assert _FakeSession.sent == ["reminder@example.test"]
+    assert _status_when_settled(message_id) == "sent"
+
+
+def _status_when_settled(message_id, timeout=5):
+    # The sender commits after the batch, just after the send itself.
+    deadline = time.monotonic() + timeout
+    while True:
+        db = database.get_db()
+        status = db.execute("SELECT status FROM mail_outbox WHERE id=?", (message_id,)).fetchone()[0]
+        db.close()
+        if status != "sending" or time.monotonic() > deadline:
+            return status
+        time.sleep(0.02)
+
+
+def test_failed_send_is_retried_by_the_sender(app, monkeypatch):
+    monkeypatch.setattr(outbox, "SMTPSession", _FlakySession)
+    monkeypatch.setattr(outbox, "smtp_configured", lambda settings=None: True)
+    monkeypatch.setattr(outbox, "OUTBOX_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(outbox, "OUTBOX_BACKOFF_SECONDS", 0)
+    outbox.reset_after_fork()
+    create_app({"OUTBOX_SENDER": True})
+
+    db = database.get_db()
+    message_id = outbox.enqueue_mail(db, "retry@example.test", "Invitation", "Hello.", kind="invitation")
+    db.commit()
+    db.close()
+
+    # No wake_outbox(): the 451 is retried on the sender's own poll.
+    assert _FlakySession.delivered.wait(5)
+    assert _status_when_settled(message_id) == "sent"
+    db = database.get_db()
+    attempts = db.execute("SELECT attempts FROM mail_outbox WHERE id=?", (message_id,)).fetchone()[0]
+    db.close()
+    assert attempts == 2
@@ -0,0 +1,42 @@
+import json
+
+import database
+from rate_limit import Coalescer, TokenBucketLimiter
+from routes.interview_routes import monitoring_coalescer
+
+
+def test_throttled_subjects_are_capped():
+    limiter = TokenBucketLimiter({"r": (1, 0.001)}, max_buckets=3)
+    for subject in range(10):
+        limiter.hit("r", subject, now=0)
+        limiter.hit("r", subject, now=0)
+    stats = limiter.stats()
+    assert len(limiter.throttled) == 3
+    assert list(stats["throttled_by_subject"]) == ["7", "8", "9"]
+    assert stats["throttled_total"] == 10
+
+
+def test_coalescer_flushes_what_nobody_took():
+    flushed = []
+    coalescer = Coalescer(on_flush=lambda key, payload: flushed.append((key, payload)), flush_seconds=60)
+    coalescer.put("a", {"n": 1})
+    coalescer.put("a", {"n": 2})
+    coalescer.put("b", {"n": 3})
+    assert coalescer.take("b") == {"n": 3}
+    coalescer.flush()
+    assert flushed == [("a", {"n": 2})]
+    assert coalescer.take("a") is None
+
+
+def test_coalesced_monitoring_ping_is_stored(client, interview_token):
+    candidate_id, token = interview_token()
+    responses = [
+        client.post(f"/interview/{token}/monitoring", json={"tab_switch_count": n}).status_code for n in range(7)
+    ]
+    assert responses[-1] == 202
+
+    monitoring_coalescer.flush()
+    db = database.get_db()
+    monitoring = json.loads(db.execute("SELECT monitoring_json FROM candidates WHERE id=?", (candidate_id,)).fetchone()[0])
+    db.close()
+    assert monitoring["tab_switch_count"] == 6
@@ -0,0 +1,16 @@
+import database
+from reports import build_report
+
+
+def test_first_load_marks_report_dirty(client, interview_token):
+    candidate_id, token = interview_token()
+    db = database.get_db()
+    db.execute("UPDATE candidates SET questions_json=NULL WHERE id=?", (candidate_id,))
+    build_report(db, candidate_id)
+    db.commit()
+    assert db.execute("SELECT dirty FROM candidate_reports WHERE candidate_id=?", (candidate_id,)).fetchone()[0] == 0
+
+    assert client.get(f"/interview/{token}").status_code == 200
+    assert db.execute("SELECT questions_json IS NOT NULL FROM candidates WHERE id=?", (candidate_id,)).fetchone()[0]
+    assert db.execute("SELECT dirty FROM candidate_reports WHERE candidate_id=?", (candidate_id,)).fetchone()[0] == 1
+    db.close()
@@ -0,0 +1,79 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from slots import SLOT_FORMAT, create_slots, get_slot, reserve_slot
+
+
+def _candidates(n):
+    db = database.get_db()
+    ids = [
+        db.execute(
+            "INSERT INTO candidates (name, email, status) VALUES ('Slot', ?, 'shortlisted')",
+            (f"slot{time.time_ns()}.{i}@example.test",),
+        ).lastrowid
+        for i in range(n)
+    ]
+    db.commit()
+    db.close()
+    return ids
+
+
+_slot_offsets = itertools.count()
+
+
+@pytest.fixture()
+def slot_id(app):
+    # Each test gets its own slot a few days ahead, so reserve_slot accepts it.
+    start = datetime.now().replace(second=0, microsecond=0) + timedelta(days=3, hours=next(_slot_offsets))
+    db = database.get_db()
+    create_slots(db, start.strftime(SLOT_FORMAT), 1, minutes=30, capacity=2)
+    slot_id = db.execute("SELECT id FROM interview_slots WHERE starts_at=?", (start.strftime(SLOT_FORMAT),)).fetchone()[0]
+    db.commit()
+    db.close()
+    return slot_id
+
+
+def _reserve(candidate_id, slot_id):
+    db = database.get_db()
+    db.execute("BEGIN IMMEDIATE")
+    slot = reserve_slot(db, candidate_id, slot_id)
+    db.commit()
+    db.close()
+    return slot
+
+
+def test_full_slot_refuses_booking(slot_id):
+    first, second, third = _candidates(3)
+    assert _reserve(first, slot_id)["booked"] == 1
+    assert _reserve(second, slot_id)["booked"] == 2
+    assert _reserve(third, slot_id) is None
+
+    db = database.get_db()
+    assert get_slot(db, slot_id)["booked"] == 2
+    assert db.execute("SELECT slot_id FROM candidates WHERE id=?", (third,)).fetchone()[0] is None
+    db.close()
+
+
+def test_concurrent_bookings_never_exceed_capacity(slot_id):
+    results = []
+    start = threading.Barrier(8)
+
+    def book(candidate_id):
+        start.wait()
+        results.append(_reserve(candidate_id, slot_id))
+
+    threads = [threading.Thread(target=book, args=(cid,)) for cid in _candidates(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(1 for r in results if r) == 2
+    db = database.get_db()
+    assert get_slot(db, slot_id)["booked"] == 2
+    db.close()
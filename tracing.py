@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from database import BASE_DIR
+
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+# Set from config by create_app(); empty disables the JSONL sink.
+TRACE_LOG_PATH = os.path.join(BASE_DIR, "traces.jsonl")
+TRACE_LOG_MAX_BYTES = int(os.getenv("TRACE_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_ID_HEADER = "X-Trace-Id"
+_TRACE_ID_RE = re.compile(r"^[0-9a-f]{8,32}$")
+
+
+class Trace:
+    def __init__(self, name, trace_id=None):
+        self.trace_id = trace_id or secrets.token_hex(8)
+        self.name = name
+        self.started_at = datetime.utcnow().isoformat()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.stack = []
+        self.attrs = {}
+
+    def to_dict(self, duration_ms):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(duration_ms, 3),
+            "attrs": self.attrs,
+            "spans": self.spans,
+        }
+
+
+_current = ContextVar("trace", default=None)
+
+_buffer = deque(maxlen=TRACE_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_sink_lock = threading.Lock()
+
+
+def current_trace_id():
+    trace = _current.get()
+    return trace.trace_id if trace else None
+
+
+def start_trace(name, trace_id=None):
+    if trace_id and not _TRACE_ID_RE.match(trace_id):
+        trace_id = None
+    trace = Trace(name, trace_id)
+    return trace, _current.set(trace)
+
+
+def finish_trace(trace, token, **attrs):
+    duration_ms = (time.perf_counter() - trace.start) * 1000
+    try:
+        _current.reset(token)
+    except ValueError:
+        _current.set(None)
+    trace.attrs.update(attrs)
+    record = trace.to_dict(duration_ms)
+    with _buffer_lock:
+        _buffer.append(record)
+    _write_sink(record)
+    return record
+
+
+@contextmanager
+def span(name, **attrs):
+    """Times a stage of the current trace; a no-op outside a trace."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    parent = trace.stack[-1] if trace.stack else None
+    span_id = len(trace.spans)
+    entry = {"id": span_id, "parent": parent, "depth": len(trace.stack), "name": name, "attrs": attrs}
+    trace.spans.append(entry)
+    trace.stack.append(span_id)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        entry["error"] = type(e).__name__
+        raise
+    finally:
+        entry["offset_ms"] = round((start - trace.start) * 1000, 3)
+        entry["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        trace.stack.pop()
+
+
+def _write_sink(record):
+    if not TRACE_LOG_PATH:
+        return
+    line = json.dumps(record) + "\n"
+    try:
+        with _sink_lock:
+            if os.path.exists(TRACE_LOG_PATH) and os.path.getsize(TRACE_LOG_PATH) > TRACE_LOG_MAX_BYTES:
+                os.replace(TRACE_LOG_PATH, TRACE_LOG_PATH + ".1")
+            with open(TRACE_LOG_PATH, "a") as f:
+                f.write(line)
+    except OSError as e:
+        print(f"[TRACE] sink write failed: {e}")
+
+
+def _slowest(records, limit, name):
+    if name:
+        records = [r for r in records if r["name"] == name]
+    records.sort(key=lambda r: r["duration_ms"], reverse=True)
+    return records[:limit]
+
+
+def slowest_traces(limit=50, name=None):
+    """Slowest traces in this worker's ring buffer."""
+    with _buffer_lock:
+        records = list(_buffer)
+    return _slowest(records, limit, name)
+
+
+def logged_traces(limit=50, name=None, tail=TRACE_BUFFER_SIZE * 4):
+    """Slowest of the last `tail` traces in the JSONL sink (all workers)."""
+    if not TRACE_LOG_PATH or not os.path.exists(TRACE_LOG_PATH):
+        return []
+    records = deque(maxlen=tail)
+    with open(TRACE_LOG_PATH) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return _slowest(list(records), limit, name)
+
+
+def init_tracing(app, endpoints):
+    """Opens a trace around requests to the given endpoints; spans inside them attach to it."""
+    from flask import g, request
+
+    traced = set(endpoints)
+
+    @app.before_request
+    def _start_request_trace():
+        if request.endpoint not in traced:
+            return
+        g.trace, g.trace_token = start_trace(
+            request.url_rule.rule,
+            request.headers.get(TRACE_ID_HEADER, "").strip().lower() or None,
+        )
+        g.trace.attrs["method"] = request.method
+
+    @app.after_request
+    def _tag_response(response):
+        trace = g.get("trace")
+        if trace is not None:
+            trace.attrs["status"] = response.status_code
+            response.headers[TRACE_ID_HEADER] = trace.trace_id
+        return response
+
+    @app.teardown_request
+    def _finish_request_trace(exc):
+        # teardown runs even when the view raised, so a pooled thread never
+        # keeps a stale trace in its context.
+        trace = g.pop("trace", None)
+        if trace is None:
+            return
+        if exc is not None:
+            trace.attrs.setdefault("status", 500)
+            trace.attrs["error"] = type(exc).__name__
+        finish_trace(trace, g.pop("trace_token"))